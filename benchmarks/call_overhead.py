@@ -0,0 +1,39 @@
+'''
+Call overhead benchmark
+=======================
+
+Measures the time of a call from Python to Java methods taking 0, 1, 4 and
+16 int arguments, in nanoseconds per call. Run it from the top of the
+repository, after `make`::
+
+    CLASSPATH=build/test-classes:build/classes python benchmarks/call_overhead.py
+'''
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+import sys
+import timeit
+
+from jnius import autoclass
+
+
+def measure(method, args, number, repeat=5):
+    """ Returns the best time of a call of `method` with `args`, in ns.
+    """
+    timer = timeit.Timer(lambda: method(*args))
+    return min(timer.repeat(repeat, number)) / number * 1e9
+
+
+def main(number=100000):
+    CallBenchmark = autoclass('org.jnius.CallBenchmark')
+    obj = CallBenchmark()
+    for nargs in (0, 1, 4, 16):
+        method = getattr(obj, 'args{0}'.format(nargs))
+        args = tuple(range(nargs))
+        assert method(*args) == sum(args)
+        print('{0:2d} arguments: {1:8.0f} ns/call'.format(
+            nargs, measure(method, args, number)))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
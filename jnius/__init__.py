@@ -55,3 +55,10 @@ if "ANDROID_ARGUMENT" in os.environ:
             jnius.detach()
 
     threading.Thread.run = jnius_thread_hook
+
+
+# make the Java runtime packages importable, as in: from jnius.java.util
+# import Stack. The packages of the classpath need importer.install(), which
+# indexes the whole classpath on first use
+from . import importer
+importer.install(packages=importer.RUNTIME_PACKAGES)
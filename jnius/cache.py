@@ -0,0 +1,199 @@
+'''
+Spec cache
+==========
+
+Store for the class specs made by :func:`jnius.reflect.dump_spec`, so that
+autoclass() doesn't need to introspect again the classes already seen in a
+previous run.
+
+The store lives in the directory returned by
+:func:`jnius_config.get_cache_dir`, in a subdirectory named after a
+fingerprint of the classpath (paths, sizes and modification times of the
+entries, and the Java installation). Upgrading a jar changes the
+fingerprint, and the old specs are simply not looked at anymore. The classes
+of the directory entries are not cached: recompiling one of them would not
+change the fingerprint, unless all the directories were scanned at startup.
+
+Each class is stored in its own file, whose name is derived from the class
+name: loading a class reads only that file, and adding a class never
+rewrites the others. Files are written in a temporary file first, then
+renamed, so concurrent processes can share the same store without ever
+reading a partial spec.
+'''
+from __future__ import absolute_import
+from __future__ import unicode_literals
+from __future__ import print_function
+from __future__ import division
+__all__ = ('SpecCache', 'classpath_fingerprint', 'get_spec_cache')
+
+import hashlib
+import os
+import sys
+import tempfile
+import warnings
+from os.path import dirname, exists, isdir, join, realpath
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+import jnius_config
+
+#: Bump when the format of the specs changes
+CACHE_VERSION = 1
+
+
+def _hash(value):
+    return hashlib.sha1(value.encode('utf-8')).hexdigest()
+
+
+def _stat(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return '{0}\0missing\n'.format(path)
+    return '{0}\0{1}\0{2!r}\n'.format(path, st.st_size, st.st_mtime)
+
+
+def classpath_fingerprint(paths=None, java_home=None):
+    """ Returns a fingerprint of the classpath `paths` (defaults to the
+        classpath of the JVM) and of the Java installation in `java_home`
+        (defaults to the JAVA_HOME environment variable).
+
+        Directories are fingerprinted by their own modification time only:
+        the classes found in them are not cached (see :class:`SpecCache`).
+    """
+    if paths is None:
+        paths = _classpath()
+    if java_home is None:
+        java_home = os.environ.get('JAVA_HOME', '')
+
+    parts = ['pyjnius-spec-{0}-py{1}\n'.format(
+        CACHE_VERSION, sys.version_info[0])]
+    for path in paths:
+        if path:
+            path = realpath(path)
+            parts.append(_stat(path))
+    if java_home:
+        java_home = realpath(java_home)
+        parts.append(_stat(java_home))
+        parts.append(_stat(join(java_home, 'release')))
+    return _hash(''.join(parts))
+
+
+def _classpath():
+    return jnius_config.expand_classpath().split(jnius_config.split_char)
+
+
+class SpecCache(object):
+    """ Per-class store of specs, in `directory`.
+
+        The classes found in the directories `class_dirs` are never stored:
+        a class recompiled there doesn't change the fingerprint of the
+        classpath, which would need to scan the whole directories.
+    """
+
+    def __init__(self, directory, class_dirs=()):
+        super(SpecCache, self).__init__()
+        self.directory = directory
+        self.class_dirs = list(class_dirs)
+
+    def in_class_dirs(self, clsname):
+        """ Returns True if the class file of `clsname` is in one of the
+            directories `class_dirs`.
+        """
+        filename = join(*_dotted(clsname).split('.')) + '.class'
+        for directory in self.class_dirs:
+            if exists(join(directory, filename)):
+                return True
+        return False
+
+    def path(self, clsname):
+        # the hash keeps classes differing only by case apart on
+        # case-insensitive filesystems
+        clsname = _dotted(clsname)
+        return join(self.directory, '{0}-{1}.spec'.format(
+            clsname, _hash(clsname)[:8]))
+
+    def get(self, clsname):
+        """ Returns the spec of `clsname`, or None if it is not in the store.
+        """
+        clsname = _dotted(clsname)
+        path = self.path(clsname)
+        if not exists(path) or self.in_class_dirs(clsname):
+            return None
+        try:
+            with open(path, 'rb') as fd:
+                name, spec = pickle.load(fd)
+        except Exception as e:
+            warnings.warn('Ignoring the invalid spec cache file {0}: '
+                          '{1}'.format(path, e))
+            return None
+        if name != clsname:
+            warnings.warn('Ignoring the spec cache file {0}: it contains '
+                          '{1}'.format(path, name))
+            return None
+        return spec
+
+    def put(self, clsname, spec):
+        """ Stores the spec of `clsname`, atomically, unless it is in one of
+            the directories `class_dirs`.
+        """
+        clsname = _dotted(clsname)
+        if self.in_class_dirs(clsname):
+            return
+        if not isdir(self.directory):
+            try:
+                os.makedirs(self.directory)
+            except OSError:
+                # created by another process in the meantime?
+                if not isdir(self.directory):
+                    raise
+        fd, tmp = tempfile.mkstemp(
+            prefix='.{0}-'.format(clsname), dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump((clsname, spec), f, protocol=2)
+            _replace(tmp, self.path(clsname))
+        except Exception:
+            os.unlink(tmp)
+            raise
+
+
+def _dotted(clsname):
+    # the classes can be named with slashes ('java/lang/String'), which
+    # can't be in the file names
+    return clsname.replace('/', '.')
+
+
+def _replace(src, dst):
+    if hasattr(os, 'replace'):
+        os.replace(src, dst)
+    elif os.name != 'nt':
+        os.rename(src, dst)
+    else:
+        # Python 2 on Windows cannot rename over an existing file
+        if exists(dst):
+            os.unlink(dst)
+        os.rename(src, dst)
+
+
+_spec_cache = None
+
+
+def get_spec_cache():
+    """ Returns the SpecCache matching the directory configured in
+        jnius_config and the current classpath, or None if the cache is
+        disabled.
+    """
+    global _spec_cache
+    directory = jnius_config.get_cache_dir()
+    if not directory:
+        return None
+    if _spec_cache is None or dirname(_spec_cache.directory) != directory:
+        paths = [realpath(path) for path in _classpath() if path]
+        _spec_cache = SpecCache(
+            join(directory, classpath_fingerprint(paths)),
+            [path for path in paths if isdir(path)])
+    return _spec_cache
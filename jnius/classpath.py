@@ -0,0 +1,133 @@
+'''
+Classpath index
+===============
+
+Index of the classes found in the jars and directories of a classpath,
+without starting the JVM. It is used to expand package wildcards in
+:mod:`jnius.pregen`, and by the import hook to tell whether a name can be a
+Java class without a JNI call.
+
+The classes of the Java runtime are indexed only when it ships them in a jar
+(`rt.jar`, up to Java 8). Since Java 9 they are in a module image that can't
+be read from Python, and the packages of the runtime are unknown to the
+index.
+'''
+from __future__ import absolute_import
+from __future__ import unicode_literals
+from __future__ import print_function
+from __future__ import division
+__all__ = ('ClasspathIndex', )
+
+import os
+import zipfile
+from os.path import exists, isdir, join, relpath
+
+import jnius_config
+
+
+def runtime_jars(java_home=None):
+    """ Returns the jars holding the classes of the Java runtime in
+        `java_home` (defaults to the JAVA_HOME environment variable), or an
+        empty list for a modular runtime (Java 9 and later).
+    """
+    if java_home is None:
+        java_home = os.environ.get('JAVA_HOME')
+    if not java_home:
+        return []
+    for path in (join(java_home, 'jre', 'lib', 'rt.jar'),
+                 join(java_home, 'lib', 'rt.jar')):
+        if exists(path):
+            return [path]
+    return []
+
+
+class ClasspathIndex(object):
+    """ Index of the classes in `paths` (defaults to the classpath of the JVM
+        and the runtime jars), by package.
+    """
+
+    def __init__(self, paths=None):
+        super(ClasspathIndex, self).__init__()
+        #: package name -> set of class names, nested classes included
+        self.packages = {}
+        #: all the package names, and their parents
+        self.prefixes = set()
+        self.runtime = False
+        if paths is None:
+            jars = runtime_jars()
+            self.runtime = bool(jars)
+            paths = jars + jnius_config.expand_classpath().split(
+                jnius_config.split_char)
+        for path in paths:
+            if path:
+                self.add(path)
+
+    def add(self, path):
+        """ Adds the classes of the jar or directory `path`.
+        """
+        if isdir(path):
+            for root, dirs, files in os.walk(path):
+                for name in files:
+                    self.add_entry(relpath(join(root, name), path).replace(
+                        os.sep, '/'))
+        elif zipfile.is_zipfile(path):
+            with zipfile.ZipFile(path) as zf:
+                for name in zf.namelist():
+                    self.add_entry(name)
+
+    def add_entry(self, entry):
+        """ Adds the class of the jar entry `entry`, in the a/b/C.class form.
+        """
+        if not entry.endswith('.class') or entry.startswith('META-INF/'):
+            return
+        package, _, name = entry[:-6].rpartition('/')
+        if not package or name in ('package-info', 'module-info'):
+            return
+        package = package.replace('/', '.')
+        self.packages.setdefault(package, set()).add(name)
+        while package and package not in self.prefixes:
+            self.prefixes.add(package)
+            package = package.rpartition('.')[0]
+
+    def has_package(self, package):
+        """ Returns True if `package` or one of its subpackages has classes.
+        """
+        return package in self.prefixes
+
+    def has_class(self, clsname):
+        """ Returns True if the class `clsname` (dotted, nested classes
+            separated with $) is in the index.
+        """
+        package, _, name = clsname.rpartition('.')
+        return name in self.packages.get(package, ())
+
+    def knows(self, clsname):
+        """ Returns True if the index is authoritative for `clsname`: its
+            package is in the index, or the runtime classes were indexed.
+        """
+        return self.runtime or clsname.rpartition('.')[0] in self.packages
+
+    def classes(self, package, recursive=False):
+        """ Returns the sorted names of the classes of `package`, and of its
+            subpackages with `recursive`.
+        """
+        names = ['{0}.{1}'.format(package, name)
+                 for name in self.packages.get(package, ())]
+        if recursive:
+            prefix = package + '.'
+            for p, classes in self.packages.items():
+                if p.startswith(prefix):
+                    names.extend(['{0}.{1}'.format(p, name)
+                                  for name in classes])
+        return sorted(names)
+
+    def expand(self, pattern):
+        """ Returns the classes matching `pattern`: a class name, `a.b.*` for
+            the classes of the a.b package, or `a.b.**` to include its
+            subpackages.
+        """
+        if pattern.endswith('.**'):
+            return self.classes(pattern[:-3], recursive=True)
+        if pattern.endswith('.*'):
+            return self.classes(pattern[:-2])
+        return [pattern]
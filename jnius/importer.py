@@ -0,0 +1,170 @@
+'''
+Java packages import hook
+=========================
+
+Makes the Java packages importable as Python modules, below a root package
+(`jnius` by default)::
+
+    from jnius.java.util import ArrayList, HashMap
+
+`import jnius` installs it for the packages of the Java runtime only, so that
+a missing submodule of jnius doesn't index the classpath; install() makes the
+packages of the whole classpath importable.
+
+A Java package module is empty when imported; its classes are loaded with
+autoclass() on first access only. When the package is in the classpath
+index (see :mod:`jnius.classpath`), a name that isn't a class of the package
+fails without any JNI call.
+'''
+from __future__ import absolute_import
+from __future__ import unicode_literals
+from __future__ import print_function
+from __future__ import division
+__all__ = ('install', 'uninstall', 'RUNTIME_PACKAGES')
+
+import sys
+import types
+
+from jnius.classpath import ClasspathIndex, runtime_jars
+from jnius.jnius import JavaException
+
+#: top-level packages of the Java runtime, importable even when the runtime
+#: classes can't be indexed
+RUNTIME_PACKAGES = ('java', 'javax', 'jdk', 'sun', 'com.sun', 'org.ietf',
+                    'org.omg', 'org.w3c', 'org.xml')
+
+
+class JavaPackage(types.ModuleType):
+    """ Module of a Java package, loading its classes on first access.
+    """
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        package = self.__javapackage__
+        cls = self.__loader__.load_class(
+            '{0}.{1}'.format(package, name) if package else name)
+        if cls is None:
+            raise AttributeError('Java package {0} has no class {1}'.format(
+                self.__javapackage__, name))
+        setattr(self, name, cls)
+        return cls
+
+
+class JavaPackageFinder(object):
+    """ Finder and loader of the Java packages below `root`, for
+        sys.meta_path.
+    """
+
+    def __init__(self, root, lazy=False, packages=None):
+        super(JavaPackageFinder, self).__init__()
+        self.root = root
+        self.lazy = lazy
+        self.packages = packages
+        self.runtime_indexed = bool(runtime_jars())
+        self._index = None
+
+    @property
+    def index(self):
+        # built on first use only, it reads all the jars of the classpath
+        if self._index is None:
+            self._index = ClasspathIndex()
+        return self._index
+
+    def java_package(self, fullname):
+        """ Returns the Java package of the module `fullname`, '' for the
+            root, or None if it is not one of our modules.
+        """
+        if fullname == self.root:
+            return ''
+        if not fullname.startswith(self.root + '.'):
+            return None
+        package = fullname[len(self.root) + 1:]
+        if self.packages is not None and \
+                not _in_packages(package, self.packages):
+            return None
+        # Java packages are lowercase by convention: an uppercase name is a
+        # missing class, as in `from jnius.java.util import Nope`
+        last = package.rpartition('.')[2]
+        if not self.runtime_indexed and not last[:1].isupper() and \
+                _in_packages(package, RUNTIME_PACKAGES):
+            return package
+        if self.index.has_package(package):
+            return package
+        return None
+
+    def load_class(self, clsname):
+        index = self.index
+        if index.knows(clsname) and not index.has_class(clsname):
+            return None
+        from jnius.reflect import autoclass
+        try:
+            return autoclass(clsname, lazy=self.lazy)
+        except JavaException:
+            return None
+
+    # Python 2 protocol
+
+    def find_module(self, fullname, path=None):
+        if self.java_package(fullname) is None:
+            return None
+        return self
+
+    def load_module(self, fullname):
+        if fullname in sys.modules:
+            return sys.modules[fullname]
+        module = self.create_module(None, fullname)
+        sys.modules[fullname] = module
+        return module
+
+    # Python 3 protocol
+
+    def find_spec(self, fullname, path=None, target=None):
+        if self.java_package(fullname) is None:
+            return None
+        from importlib.machinery import ModuleSpec
+        return ModuleSpec(fullname, self, is_package=True)
+
+    def create_module(self, spec, fullname=None):
+        fullname = spec.name if spec is not None else fullname
+        module = JavaPackage(str(fullname))
+        module.__javapackage__ = self.java_package(fullname)
+        module.__loader__ = self
+        module.__package__ = str(fullname)
+        module.__path__ = []
+        return module
+
+    def exec_module(self, module):
+        pass
+
+
+def _in_packages(package, prefixes):
+    for prefix in prefixes:
+        if package == prefix or package.startswith(prefix + '.'):
+            return True
+    return False
+
+
+def install(root='jnius', lazy=False, packages=None):
+    """ Makes the Java packages importable below the `root` package. The
+        classes are created with autoclass(name, lazy=lazy).
+
+        @param packages: the Java packages importable, with their
+                         subpackages, or None for all the packages of the
+                         classpath
+    """
+    uninstall(root)
+    sys.meta_path.append(JavaPackageFinder(root, lazy, packages))
+
+
+def uninstall(root='jnius'):
+    """ Removes the import hook of the `root` package, and the modules it
+        created.
+    """
+    for finder in list(sys.meta_path):
+        if isinstance(finder, JavaPackageFinder) and finder.root == root:
+            sys.meta_path.remove(finder)
+            for name, module in list(sys.modules.items()):
+                if isinstance(module, JavaPackage) and \
+                        module.__loader__ is finder:
+                    del sys.modules[name]
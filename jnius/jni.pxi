@@ -59,6 +59,11 @@ cdef extern from "jni.h":
         JNIGlobalRefType = 2,
         JNIWeakGlobalRefType = 3
 
+    # modes of the Release<Type>ArrayElements functions
+    enum:
+        JNI_COMMIT
+        JNI_ABORT
+
 
     # some opaque definitions
     ctypedef void *jmethodID
@@ -108,7 +113,7 @@ cdef extern from "jni.h":
         jobject     (*AllocObject)(JNIEnv*, jclass)
         jobject     (*NewObject)(JNIEnv*, jclass, jmethodID, ...)
         jobject     (*NewObjectV)(JNIEnv*, jclass, jmethodID, va_list)
-        jobject     (*NewObjectA)(JNIEnv*, jclass, jmethodID, jvalue*)
+        jobject     (*NewObjectA)(JNIEnv*, jclass, jmethodID, jvalue*) nogil
 
         jclass      (*GetObjectClass)(JNIEnv*, jobject)
         jboolean    (*IsInstanceOf)(JNIEnv*, jobject, jclass)
@@ -390,7 +395,7 @@ cdef extern from "jni.h":
         jweak       (*NewWeakGlobalRef)(JNIEnv*, jobject)
         void        (*DeleteWeakGlobalRef)(JNIEnv*, jweak)
 
-        jboolean    (*ExceptionCheck)(JNIEnv*)
+        jboolean    (*ExceptionCheck)(JNIEnv*) nogil
 
         jobject     (*NewDirectByteBuffer)(JNIEnv*, void*, jlong)
         void*       (*GetDirectBufferAddress)(JNIEnv*, jobject)
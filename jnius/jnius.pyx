@@ -87,15 +87,34 @@ Python::
 
 __all__ = ('JavaObject', 'JavaClass', 'JavaMethod', 'JavaField',
            'MetaJavaClass', 'JavaException', 'cast', 'find_javaclass',
-           'PythonJavaClass', 'java_method', 'detach')
-
+           'PythonJavaClass', 'java_method', 'detach', 'batch',
+           'exception_class', 'PrimitiveArray', 'BooleanArray', 'ByteArray',
+           'CharArray', 'ShortArray', 'IntArray', 'LongArray', 'FloatArray',
+           'DoubleArray', 'JavaObjectArray', 'set_lazy_object_arrays',
+           'as_direct_buffer', 'release_direct_buffer',
+           'direct_buffer_memoryview',
+           'set_string_cache')
+
+cimport cython
 from libc.stdlib cimport malloc, free
+from libc.string cimport memcpy
+from cpython.buffer cimport (PyObject_CheckBuffer, PyObject_GetBuffer,
+    PyBuffer_Release, PyBUF_FORMAT, PyBUF_C_CONTIGUOUS, PyBUF_WRITABLE)
+from cpython.memoryview cimport PyMemoryView_GET_BUFFER, PyMemoryView_GET_BASE
+from cpython.dict cimport PyDict_GetItem
+from cpython.pystate cimport PyThreadState_GetDict
+from cpython.ref cimport PyObject, Py_INCREF
+from cpython.sequence cimport PySequence_Fast_ITEMS
+from cpython.tuple cimport PyTuple_New, PyTuple_SET_ITEM
+from cpython.unicode cimport PyUnicode_DecodeUTF16, PyUnicode_AsEncodedString
 from functools import partial
+from itertools import islice
 import sys
 import traceback
 
 include "jni.pxi"
 include "config.pxi"
+include "jnius_capi.pxi"
 
 IF JNIUS_PLATFORM == "android":
     include "jnius_jvm_android.pxi"
@@ -108,6 +127,10 @@ include "jnius_env.pxi"
 include "jnius_utils.pxi"
 include "jnius_conversion.pxi"
 include "jnius_localref.pxi"
+include "jnius_strings.pxi"
+include "jnius_arrays.pxi"
+include "jnius_buffers.pxi"
+include "jnius_collections.pxi"
 IF JNIUS_PYTHON3:
     include "jnius_nativetypes3.pxi"
 ELSE:    
@@ -117,3 +140,6 @@ include "jnius_export_func.pxi"
 include "jnius_export_class.pxi"
 
 include "jnius_proxy.pxi"
+include "jnius_vectorcall.pxi"
+include "jnius_batch.pxi"
+include "jnius_export_capi.pxi"
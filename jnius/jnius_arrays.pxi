@@ -0,0 +1,692 @@
+# Typed views of the Java arrays of primitives returned by the methods. The
+# elements are fetched with one Get<Type>ArrayElements call, and exposed with
+# the buffer protocol (memoryview, array.array, numpy.frombuffer), instead of
+# being converted to a list of Python objects. The arrays given to Java are
+# copied from the buffers, or from a C copy of the lists, with one
+# Set<Type>ArrayRegion call.
+
+
+cdef python_op(int op, object a, object b):
+    if op == 0:
+        return a < b
+    elif op == 1:
+        return a <= b
+    elif op == 2:
+        return a == b
+    elif op == 3:
+        return a >= b
+    elif op == 4:
+        return a > b
+    elif op == 5:
+        return a != b
+
+
+cdef class PrimitiveArray(object):
+    '''Elements of a Java array of primitives. Changes are written back to
+    the Java array on commit(), release() or when the view is deleted; abort()
+    discards them.
+    '''
+    cdef LocalRef _jobject
+    cdef long _size
+    cdef void *_buf
+    # the type of the elements, in the signature and buffer formats
+    cdef readonly object definition
+    cdef const char *format
+    cdef Py_ssize_t itemsize
+    cdef Py_ssize_t shape[1]
+    cdef Py_ssize_t strides[1]
+    # number of buffers exported and not released
+    cdef int exports
+    # the elements are a copy of the Java array
+    cdef jboolean iscopy
+    # the elements may have been changed from Python since they were fetched
+    # or written back: a clean view is released without writing them, so the
+    # changes done by Java meanwhile are kept
+    cdef bint dirty
+
+    def __cinit__(self):
+        self._jobject = None
+        self._size = 0
+        self._buf = NULL
+        self.exports = 0
+        self.dirty = False
+        self.definition = 'B'
+        self.format = 'B'
+        self.itemsize = sizeof(jbyte)
+
+    def __dealloc__(self):
+        if self._buf != NULL:
+            self.release_elements(0 if self.dirty else JNI_ABORT)
+
+    cdef void set_elements(self, JNIEnv *j_env, jobject j_object) except *:
+        # fetch the elements of the Java array j_object
+        cdef jboolean iscopy = 1
+        cdef int r = ord(self.definition)
+        if self._buf != NULL:
+            raise Exception('Cannot call set_elements() twice.')
+        if r == c'Z':
+            self._buf = j_env[0].GetBooleanArrayElements(
+                    j_env, j_object, &iscopy)
+        elif r == c'B':
+            self._buf = j_env[0].GetByteArrayElements(
+                    j_env, j_object, &iscopy)
+        elif r == c'C':
+            self._buf = j_env[0].GetCharArrayElements(
+                    j_env, j_object, &iscopy)
+        elif r == c'S':
+            self._buf = j_env[0].GetShortArrayElements(
+                    j_env, j_object, &iscopy)
+        elif r == c'I':
+            self._buf = j_env[0].GetIntArrayElements(
+                    j_env, j_object, &iscopy)
+        elif r == c'J':
+            self._buf = j_env[0].GetLongArrayElements(
+                    j_env, j_object, &iscopy)
+        elif r == c'F':
+            self._buf = j_env[0].GetFloatArrayElements(
+                    j_env, j_object, &iscopy)
+        elif r == c'D':
+            self._buf = j_env[0].GetDoubleArrayElements(
+                    j_env, j_object, &iscopy)
+        if self._buf == NULL:
+            raise MemoryError('Unable to get the elements of the array')
+        self._jobject = create_local_ref(j_env, j_object)
+        self._size = j_env[0].GetArrayLength(j_env, j_object)
+        self.iscopy = iscopy
+
+    cdef jobject java_array(self) except NULL:
+        # the Java array with the changes of the view, to give it to a method
+        if self._buf == NULL:
+            raise JavaException('The {0} is released'.format(
+                self.__class__.__name__))
+        if self.dirty:
+            self.release_elements(JNI_COMMIT)
+        return self._jobject.obj
+
+    cdef void refresh(self, JNIEnv *j_env):
+        # read the changes done by Java in the array, after java_array()
+        cdef int r = ord(self.definition)
+        if self._buf == NULL or not self.iscopy:
+            return
+        self.dirty = True
+        get_java_region(j_env, r, self._jobject.obj, self._size, self._buf)
+
+    cdef void release_elements(self, int mode):
+        cdef JNIEnv *j_env = get_jnienv()
+        cdef jobject j_object = self._jobject.obj
+        cdef int r = ord(self.definition)
+        if r == c'Z':
+            j_env[0].ReleaseBooleanArrayElements(
+                    j_env, j_object, <jboolean *>self._buf, mode)
+        elif r == c'B':
+            j_env[0].ReleaseByteArrayElements(
+                    j_env, j_object, <jbyte *>self._buf, mode)
+        elif r == c'C':
+            j_env[0].ReleaseCharArrayElements(
+                    j_env, j_object, <jchar *>self._buf, mode)
+        elif r == c'S':
+            j_env[0].ReleaseShortArrayElements(
+                    j_env, j_object, <jshort *>self._buf, mode)
+        elif r == c'I':
+            j_env[0].ReleaseIntArrayElements(
+                    j_env, j_object, <jint *>self._buf, mode)
+        elif r == c'J':
+            j_env[0].ReleaseLongArrayElements(
+                    j_env, j_object, <jlong *>self._buf, mode)
+        elif r == c'F':
+            j_env[0].ReleaseFloatArrayElements(
+                    j_env, j_object, <jfloat *>self._buf, mode)
+        elif r == c'D':
+            j_env[0].ReleaseDoubleArrayElements(
+                    j_env, j_object, <jdouble *>self._buf, mode)
+        # a buffer still exported can write again
+        self.dirty = self.exports > 0
+        if mode != JNI_COMMIT:
+            self._buf = NULL
+            self._size = 0
+            self._jobject = None
+
+    def commit(self):
+        '''Writes the changes back to the Java array, and keeps the view.
+        '''
+        if self._buf != NULL and self.dirty:
+            self.release_elements(JNI_COMMIT)
+
+    def release(self):
+        '''Writes the changes back to the Java array, and empties the view.
+        '''
+        if self.exports:
+            raise BufferError('The array is used by a buffer')
+        if self._buf != NULL:
+            self.release_elements(0 if self.dirty else JNI_ABORT)
+
+    def abort(self):
+        '''Empties the view without writing its changes back to the Java
+        array. The JVM may have given the array itself instead of a copy, in
+        which case the changes are already done.
+        '''
+        if self.exports:
+            raise BufferError('The array is used by a buffer')
+        if self._buf != NULL:
+            self.release_elements(JNI_ABORT)
+
+    def __getbuffer__(self, Py_buffer *buffer, int flags):
+        self.shape[0] = self._size
+        self.strides[0] = self.itemsize
+        buffer.buf = self._buf
+        buffer.obj = self
+        buffer.len = self._size * self.itemsize
+        buffer.readonly = 0
+        buffer.itemsize = self.itemsize
+        buffer.format = <char *>self.format if flags & PyBUF_FORMAT else NULL
+        buffer.ndim = 1
+        buffer.shape = self.shape
+        buffer.strides = self.strides
+        buffer.suboffsets = NULL
+        buffer.internal = NULL
+        self.exports += 1
+        # the buffers are writable, even when not asked to be
+        self.dirty = True
+
+    def __releasebuffer__(self, Py_buffer *buffer):
+        self.exports -= 1
+
+    def __repr__(self):
+        return '<{0} size={1} at 0x{2:x}>'.format(
+                self.__class__.__name__, self._size, id(self))
+
+    def __len__(self):
+        return self._size
+
+    cdef long check_index(self, long index) except -1:
+        if index < 0:
+            index += self._size
+        if index < 0 or index >= self._size:
+            raise IndexError('array index out of range')
+        return index
+
+    cdef object get_item(self, long index):
+        cdef int r = ord(self.definition)
+        if r == c'Z':
+            return True if (<jboolean *>self._buf)[index] else False
+        elif r == c'B':
+            return (<unsigned char *>self._buf)[index]
+        elif r == c'C':
+            return <Py_UCS4>(<jchar *>self._buf)[index]
+        elif r == c'S':
+            return (<jshort *>self._buf)[index]
+        elif r == c'I':
+            return (<jint *>self._buf)[index]
+        elif r == c'J':
+            return (<jlong *>self._buf)[index]
+        elif r == c'F':
+            return (<jfloat *>self._buf)[index]
+        return (<jdouble *>self._buf)[index]
+
+    cdef void set_item(self, long index, value) except *:
+        cdef int r = ord(self.definition)
+        cdef int byte
+        self.dirty = True
+        if r == c'Z':
+            (<jboolean *>self._buf)[index] = 1 if value else 0
+        elif r == c'B':
+            # the bytes are read unsigned, and written signed or unsigned
+            byte = value
+            if byte < -128 or byte > 255:
+                raise OverflowError('value out of range for a byte')
+            (<jbyte *>self._buf)[index] = <jbyte>(byte & 0xff)
+        elif r == c'C':
+            (<jchar *>self._buf)[index] = ord(value)
+        elif r == c'S':
+            (<jshort *>self._buf)[index] = value
+        elif r == c'I':
+            (<jint *>self._buf)[index] = value
+        elif r == c'J':
+            (<jlong *>self._buf)[index] = value
+        elif r == c'F':
+            (<jfloat *>self._buf)[index] = value
+        else:
+            (<jdouble *>self._buf)[index] = value
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.get_item(i) for i in
+                    range(*index.indices(self._size))]
+        return self.get_item(self.check_index(index))
+
+    def __setitem__(self, index, value):
+        cdef long i
+        if isinstance(index, slice):
+            indices = range(*index.indices(self._size))
+            value = list(value)
+            if len(value) != len(indices):
+                raise ValueError('Cannot resize a Java array')
+            for i, item in zip(indices, value):
+                self.set_item(i, item)
+            return
+        self.set_item(self.check_index(index), value)
+
+    def __richcmp__(self, other, op):
+        if isinstance(other, (list, tuple)):
+            return python_op(op, self.tolist(), list(other))
+        elif isinstance(other, PrimitiveArray):
+            return python_op(op, self.tolist(), other.tolist())
+        else:
+            return False
+
+    def tolist(self):
+        return self[:]
+
+
+cdef class BooleanArray(PrimitiveArray):
+    def __cinit__(self):
+        self.definition = 'Z'
+        self.format = '?'
+        self.itemsize = sizeof(jboolean)
+
+
+cdef class CharArray(PrimitiveArray):
+    def __cinit__(self):
+        self.definition = 'C'
+        self.format = 'H'
+        self.itemsize = sizeof(jchar)
+
+
+cdef class ShortArray(PrimitiveArray):
+    def __cinit__(self):
+        self.definition = 'S'
+        self.format = 'h'
+        self.itemsize = sizeof(jshort)
+
+
+cdef class IntArray(PrimitiveArray):
+    def __cinit__(self):
+        self.definition = 'I'
+        self.format = 'i'
+        self.itemsize = sizeof(jint)
+
+
+cdef class LongArray(PrimitiveArray):
+    def __cinit__(self):
+        self.definition = 'J'
+        self.format = 'q'
+        self.itemsize = sizeof(jlong)
+
+
+cdef class FloatArray(PrimitiveArray):
+    def __cinit__(self):
+        self.definition = 'F'
+        self.format = 'f'
+        self.itemsize = sizeof(jfloat)
+
+
+cdef class DoubleArray(PrimitiveArray):
+    def __cinit__(self):
+        self.definition = 'D'
+        self.format = 'd'
+        self.itemsize = sizeof(jdouble)
+
+
+cdef PrimitiveArray new_primitive_array(JNIEnv *j_env, definition,
+        jobject j_object):
+    # view of the Java array j_object, of elements of type definition
+    cdef PrimitiveArray ret
+    cdef int r = ord(definition[0])
+    if r == c'Z':
+        ret = BooleanArray()
+    elif r == c'B':
+        ret = ByteArray()
+    elif r == c'C':
+        ret = CharArray()
+    elif r == c'S':
+        ret = ShortArray()
+    elif r == c'I':
+        ret = IntArray()
+    elif r == c'J':
+        ret = LongArray()
+    elif r == c'F':
+        ret = FloatArray()
+    else:
+        ret = DoubleArray()
+    ret.set_elements(j_env, j_object)
+    return ret
+
+
+cdef Py_ssize_t primitive_size(int r):
+    if r == c'Z':
+        return sizeof(jboolean)
+    elif r == c'B':
+        return sizeof(jbyte)
+    elif r == c'C':
+        return sizeof(jchar)
+    elif r == c'S':
+        return sizeof(jshort)
+    elif r == c'I':
+        return sizeof(jint)
+    elif r == c'J':
+        return sizeof(jlong)
+    elif r == c'F':
+        return sizeof(jfloat)
+    return sizeof(jdouble)
+
+
+cdef bint buffer_matches(int r, Py_buffer *view):
+    # the items of the buffer have the memory layout of the Java type r
+    cdef int one = 1
+    cdef const char *fmt = view.format
+    cdef char c
+    if view.ndim > 1 or view.itemsize != primitive_size(r):
+        return False
+    if fmt == NULL:
+        fmt = 'B'
+    if fmt[0] == c'@' or fmt[0] == c'=' or (
+            fmt[0] == c'<' and (<char *>&one)[0] == 1):
+        fmt += 1
+    if fmt[0] == 0 or fmt[1] != 0:
+        return False
+    c = fmt[0]
+    if r == c'Z':
+        return c == c'?'
+    elif r == c'B':
+        return c == c'b' or c == c'B' or c == c'c'
+    elif r == c'C':
+        return c == c'H' or c == c'u'
+    elif r == c'F' or r == c'D':
+        return c == c'f' or c == c'd'
+    # the unsigned integers would change sign in Java
+    return c == c'h' or c == c'i' or c == c'l' or c == c'q' or c == c'n'
+
+
+cdef object buffer_key(obj):
+    # what the score of a buffer depends on
+    cdef Py_buffer view
+    try:
+        PyObject_GetBuffer(obj, &view, PyBUF_FORMAT | PyBUF_C_CONTIGUOUS)
+    except BufferError:
+        return None
+    try:
+        return (view.format if view.format != NULL else None,
+                view.itemsize, view.ndim)
+    finally:
+        PyBuffer_Release(&view)
+
+
+cdef int buffer_score(definition, obj) except *:
+    # score of a buffer given for an array of the Java type definition
+    cdef Py_buffer view
+    if not PyObject_CheckBuffer(obj) or len(definition) != 1 or \
+            definition not in 'ZBCSIJFD':
+        return -1
+    try:
+        PyObject_GetBuffer(obj, &view, PyBUF_FORMAT | PyBUF_C_CONTIGUOUS)
+    except BufferError:
+        return 1
+    try:
+        return 10 if buffer_matches(ord(definition), &view) else 5
+    finally:
+        PyBuffer_Release(&view)
+
+
+cdef void get_java_region(JNIEnv *j_env, int r, jobject j_object,
+        jsize size, void *buf):
+    # copy the size first elements of the Java array j_object of the Java
+    # type r in buf
+    if r == c'Z':
+        j_env[0].GetBooleanArrayRegion(j_env, j_object, 0, size, <jboolean *>buf)
+    elif r == c'B':
+        j_env[0].GetByteArrayRegion(j_env, j_object, 0, size, <jbyte *>buf)
+    elif r == c'C':
+        j_env[0].GetCharArrayRegion(j_env, j_object, 0, size, <jchar *>buf)
+    elif r == c'S':
+        j_env[0].GetShortArrayRegion(j_env, j_object, 0, size, <jshort *>buf)
+    elif r == c'I':
+        j_env[0].GetIntArrayRegion(j_env, j_object, 0, size, <jint *>buf)
+    elif r == c'J':
+        j_env[0].GetLongArrayRegion(j_env, j_object, 0, size, <jlong *>buf)
+    elif r == c'F':
+        j_env[0].GetFloatArrayRegion(j_env, j_object, 0, size, <jfloat *>buf)
+    elif r == c'D':
+        j_env[0].GetDoubleArrayRegion(j_env, j_object, 0, size, <jdouble *>buf)
+
+
+cdef void write_back_buffer(JNIEnv *j_env, int r, jobject j_object,
+        obj) except *:
+    # copy the Java array j_object of the Java type r, given for the buffer
+    # obj, back in obj when it is writable with the same layout; the other
+    # buffers were converted item by item, and are left as they are
+    cdef Py_buffer view
+    cdef jsize size = j_env[0].GetArrayLength(j_env, j_object)
+    try:
+        PyObject_GetBuffer(obj, &view,
+                PyBUF_WRITABLE | PyBUF_FORMAT | PyBUF_C_CONTIGUOUS)
+    except (BufferError, TypeError, ValueError):
+        # read-only
+        return
+    try:
+        if buffer_matches(r, &view) and \
+                view.len == size * primitive_size(r):
+            get_java_region(j_env, r, j_object, size, view.buf)
+    finally:
+        PyBuffer_Release(&view)
+
+
+cdef jobject new_java_array(JNIEnv *j_env, int r, jsize size,
+        void *buf) except NULL:
+    # a Java array of the Java type r, with the size elements of buf
+    cdef jobject ret
+    if r == c'Z':
+        ret = j_env[0].NewBooleanArray(j_env, size)
+        if ret != NULL:
+            j_env[0].SetBooleanArrayRegion(
+                    j_env, ret, 0, size, <const_jboolean *>buf)
+    elif r == c'B':
+        ret = j_env[0].NewByteArray(j_env, size)
+        if ret != NULL:
+            j_env[0].SetByteArrayRegion(
+                    j_env, ret, 0, size, <const_jbyte *>buf)
+    elif r == c'C':
+        ret = j_env[0].NewCharArray(j_env, size)
+        if ret != NULL:
+            j_env[0].SetCharArrayRegion(
+                    j_env, ret, 0, size, <const_jchar *>buf)
+    elif r == c'S':
+        ret = j_env[0].NewShortArray(j_env, size)
+        if ret != NULL:
+            j_env[0].SetShortArrayRegion(
+                    j_env, ret, 0, size, <const_jshort *>buf)
+    elif r == c'I':
+        ret = j_env[0].NewIntArray(j_env, size)
+        if ret != NULL:
+            j_env[0].SetIntArrayRegion(
+                    j_env, ret, 0, size, <const_jint *>buf)
+    elif r == c'J':
+        ret = j_env[0].NewLongArray(j_env, size)
+        if ret != NULL:
+            j_env[0].SetLongArrayRegion(
+                    j_env, ret, 0, size, <const_jlong *>buf)
+    elif r == c'F':
+        ret = j_env[0].NewFloatArray(j_env, size)
+        if ret != NULL:
+            j_env[0].SetFloatArrayRegion(
+                    j_env, ret, 0, size, <const_jfloat *>buf)
+    else:
+        ret = j_env[0].NewDoubleArray(j_env, size)
+        if ret != NULL:
+            j_env[0].SetDoubleArrayRegion(
+                    j_env, ret, 0, size, <const_jdouble *>buf)
+    if ret == NULL:
+        check_exception(j_env)
+        raise MemoryError('Unable to create a Java array')
+    return ret
+
+
+cdef jobject convert_primitives_to_java(JNIEnv *j_env, definition,
+        pyarray) except NULL:
+    # a Java array of the Java type definition, from a buffer or a sequence
+    cdef Py_buffer view
+    cdef int r = ord(definition)
+    cdef Py_ssize_t i, size
+    cdef PyObject **items
+    cdef unsigned char c_tmp
+    cdef void *buf
+
+    if PyObject_CheckBuffer(pyarray):
+        try:
+            PyObject_GetBuffer(pyarray, &view,
+                    PyBUF_FORMAT | PyBUF_C_CONTIGUOUS)
+        except BufferError:
+            pass
+        else:
+            try:
+                if buffer_matches(r, &view):
+                    return new_java_array(j_env, r,
+                            view.len // view.itemsize, view.buf)
+            finally:
+                PyBuffer_Release(&view)
+
+    # convert the items in a C array, and copy it at once
+    if not isinstance(pyarray, (list, tuple)):
+        pyarray = list(pyarray)
+    size = len(pyarray)
+    items = PySequence_Fast_ITEMS(pyarray)
+    buf = malloc(size * primitive_size(r) + 1)
+    if buf == NULL:
+        raise MemoryError()
+    try:
+        if r == c'Z':
+            for i in range(size):
+                (<jboolean *>buf)[i] = 1 if <object>items[i] else 0
+        elif r == c'B':
+            for i in range(size):
+                c_tmp = <object>items[i]
+                (<jbyte *>buf)[i] = <signed char>c_tmp
+        elif r == c'C':
+            for i in range(size):
+                (<jchar *>buf)[i] = ord(<object>items[i])
+        elif r == c'S':
+            for i in range(size):
+                (<jshort *>buf)[i] = <object>items[i]
+        elif r == c'I':
+            for i in range(size):
+                (<jint *>buf)[i] = <object>items[i]
+        elif r == c'J':
+            for i in range(size):
+                (<jlong *>buf)[i] = <object>items[i]
+        elif r == c'F':
+            for i in range(size):
+                (<jfloat *>buf)[i] = <object>items[i]
+        else:
+            for i in range(size):
+                (<jdouble *>buf)[i] = <object>items[i]
+        return new_java_array(j_env, r, size, buf)
+    finally:
+        free(buf)
+
+
+# the Java arrays of objects are returned as JavaObjectArray views instead of
+# lists when enabled by set_lazy_object_arrays()
+cdef bint lazy_object_arrays = False
+
+
+def set_lazy_object_arrays(enabled=True):
+    '''Return the Java arrays of objects as :class:`JavaObjectArray` views,
+    converting their elements when accessed, instead of lists.
+    '''
+    global lazy_object_arrays
+    lazy_object_arrays = bool(enabled)
+
+
+cdef class JavaObjectArray(object):
+    '''Elements of a Java array of objects or of arrays, converted when
+    accessed. A slice is a view of the same Java array.
+    '''
+    cdef LocalRef _jobject
+    # the type of the elements, in the signature format
+    cdef readonly object definition
+    cdef Py_ssize_t start
+    cdef Py_ssize_t step
+    cdef Py_ssize_t size
+
+    def __repr__(self):
+        return '<{0} {1!r} size={2} at 0x{3:x}>'.format(
+                self.__class__.__name__, self.definition, self.size, id(self))
+
+    def __len__(self):
+        return self.size
+
+    cdef bint is_whole(self, JNIEnv *j_env):
+        # if the view is the whole Java array
+        return self.start == 0 and self.step == 1 and self.size == \
+            j_env[0].GetArrayLength(j_env, self._jobject.obj)
+
+    cdef object get_item(self, JNIEnv *j_env, Py_ssize_t index):
+        cdef jobject j_item = j_env[0].GetObjectArrayElement(
+                j_env, self._jobject.obj, self.start + index * self.step)
+        if j_item == NULL:
+            check_exception(j_env)
+            return None
+        try:
+            if self.definition[0] == '[':
+                return convert_jarray_to_python(
+                        j_env, self.definition[1:], j_item)
+            return convert_jobject_to_python(j_env, self.definition, j_item)
+        finally:
+            j_env[0].DeleteLocalRef(j_env, j_item)
+
+    def __getitem__(self, index):
+        cdef JavaObjectArray ret
+        cdef Py_ssize_t start, stop, step
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.size)
+            ret = JavaObjectArray()
+            ret._jobject = self._jobject
+            ret.definition = self.definition
+            ret.start = self.start + start * self.step
+            ret.step = self.step * step
+            ret.size = len(range(start, stop, step))
+            return ret
+        if index < 0:
+            index += self.size
+        if index < 0 or index >= self.size:
+            raise IndexError('array index out of range')
+        return self.get_item(get_jnienv(), index)
+
+    def __iter__(self):
+        cdef Py_ssize_t index
+        for index in range(self.size):
+            yield self.get_item(get_jnienv(), index)
+
+    def __richcmp__(self, other, op):
+        if isinstance(other, (list, tuple)):
+            return python_op(op, self.tolist(), list(other))
+        elif isinstance(other, JavaObjectArray):
+            return python_op(op, self.tolist(), other.tolist())
+        else:
+            return False
+
+    def tolist(self):
+        return list(self)
+
+
+cdef JavaObjectArray new_object_array(JNIEnv *j_env, definition,
+        jobject j_object):
+    # a view of the Java array j_object of elements of type definition
+    cdef JavaObjectArray ret = JavaObjectArray()
+    ret._jobject = create_local_ref(j_env, j_object)
+    ret.definition = definition
+    ret.start = 0
+    ret.step = 1
+    ret.size = j_env[0].GetArrayLength(j_env, j_object)
+    return ret
+
+
+cdef jobject object_array_of(JNIEnv *j_env, obj) except? NULL:
+    # a new local reference to the Java array of a whole JavaObjectArray
+    # view, or NULL
+    cdef JavaObjectArray view
+    if not isinstance(obj, JavaObjectArray):
+        return NULL
+    view = obj
+    if not view.is_whole(j_env):
+        return NULL
+    return j_env[0].NewLocalRef(j_env, view._jobject.obj)
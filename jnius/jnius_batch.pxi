@@ -0,0 +1,533 @@
+# Command buffers: a sequence of Java calls recorded from Python, and done at
+# once without the GIL when the batch is run.
+#
+#     with batch() as b:
+#         sb = b(StringBuilder)('hello')
+#         sb.append(' world')
+#         text = sb.toString()
+#     print(text.value)
+#
+# Each recorded call returns a BatchResult, that later calls can take as their
+# receiver or as an argument: the steps exchange their results as JNI
+# references, and a result is only converted to Python when its value is
+# asked. The Java exceptions are checked after each step without going back
+# to Python, and the first one is raised with the index of its step.
+
+cdef enum:
+    BATCH_NEW = 0
+    BATCH_CALL
+    BATCH_STATIC
+
+ctypedef struct batch_step:
+    int kind
+    # type code of the result
+    int code
+    jclass j_cls
+    jmethodID j_method
+    # the receiver of a BATCH_CALL, or the index of the step giving it
+    jobject j_self
+    int self_step
+    jvalue *j_args
+    int nargs
+    # the arguments taken from the results of previous steps, in
+    # patches[first_patch:last_patch]
+    int first_patch
+    int last_patch
+
+ctypedef struct batch_patch:
+    int arg
+    int src
+
+
+def batch():
+    '''Returns a batch recording the Java calls done through it, and doing
+    them at the end of the `with` block.
+    '''
+    return JavaBatch()
+
+
+cdef inline bint is_object_code(int code):
+    return code == JT_STRINGY or code == JT_OBJECT or code == JT_ARRAY
+
+
+cdef object java_class_of(definition):
+    # the Python class of a Ljava/lang/Name; definition
+    r = definition[1:-1]
+    cls = jclass_register.get(r)
+    if cls is None:
+        from .reflect import autoclass
+        cls = autoclass(r.replace('/', '.'))
+    return cls
+
+
+cdef int run_steps(JNIEnv *j_env, batch_step *steps, int count,
+        batch_patch *patches, jvalue *j_rets) nogil:
+    # does the steps in order, with the result of the step i in j_rets[i].
+    # Stops on the first Java exception or null receiver, and returns the
+    # number of steps that succeeded
+    cdef int index, p
+    cdef batch_step *step
+    cdef jobject j_self
+    for index in range(count):
+        step = &steps[index]
+        for p in range(step.first_patch, step.last_patch):
+            step.j_args[patches[p].arg] = j_rets[patches[p].src]
+        if step.kind == BATCH_NEW:
+            j_rets[index].l = j_env[0].NewObjectA(
+                    j_env, step.j_cls, step.j_method, step.j_args)
+            if j_env[0].ExceptionCheck(j_env):
+                return index
+            continue
+        j_self = step.j_self
+        if step.self_step >= 0:
+            j_self = j_rets[step.self_step].l
+        if step.kind == BATCH_CALL and j_self == NULL:
+            return index
+        if call_many(j_env, j_self, step.j_cls, step.j_method,
+                step.kind == BATCH_STATIC, step.code, step.j_args,
+                step.nargs, 1, &j_rets[index]) == 0:
+            return index
+    return count
+
+
+cdef class JavaBatch(object):
+    '''Recorder of Java calls, see batch(). Calling it with a Java object, a
+    Java class or a BatchResult returns a target whose calls are recorded.
+    '''
+    cdef list steps
+    cdef bint done
+
+    def __cinit__(self):
+        self.steps = []
+        self.done = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.run()
+        else:
+            self.done = True
+        return False
+
+    def __call__(self, target):
+        return BatchTarget(self, target)
+
+    def __len__(self):
+        return len(self.steps)
+
+    cdef BatchResult add_step(self):
+        if self.done:
+            raise JavaException('The batch has already been run')
+        cdef BatchResult step = BatchResult()
+        step.batch = self
+        step.index = len(self.steps)
+        return step
+
+    cdef tuple standins(self, tuple args):
+        # the arguments, with the results of the steps replaced by values of
+        # their type, for choosing the signature
+        cdef BatchResult result
+        standins = []
+        for arg in args:
+            if isinstance(arg, BatchResult):
+                result = arg
+                if result.batch is not self:
+                    raise JavaException('The result of another batch'
+                            ' cannot be used')
+                arg = result.standin
+            standins.append(arg)
+        return tuple(standins)
+
+    cdef tuple link_args(self, BatchResult step, tuple args):
+        # records the arguments coming from previous steps in step.patches,
+        # and returns the arguments to convert, with placeholders for those
+        cdef BatchResult result
+        cdef int index, code
+        cdef const unsigned char *codes = step.codes
+        placeholders = []
+        for index in range(len(args)):
+            arg = args[index]
+            if not isinstance(arg, BatchResult):
+                placeholders.append(arg)
+                continue
+            result = arg
+            code = codes[index]
+            if is_object_code(code) and is_object_code(result.code):
+                if (code == JT_ARRAY or result.code == JT_ARRAY) and \
+                        step.d_args[index] != result.definition:
+                    raise JavaException('Batch step {0} gives {1}, not'
+                            ' {2}'.format(result.index, result.definition,
+                                          step.d_args[index]))
+                if code != JT_ARRAY and result.code != JT_ARRAY:
+                    check_assignable_from(get_jnienv(), result.standin,
+                            step.d_args[index][1:-1])
+                placeholders.append(None)
+            elif code == result.code:
+                placeholders.append(result.standin)
+            else:
+                raise JavaException('Batch step {0} gives {1}, not'
+                        ' {2}'.format(result.index, result.definition,
+                                      step.d_args[index]))
+            step.patches.append((index, result.index))
+
+        if step.is_varargs and len(args) and \
+                isinstance(args[len(args) - 1], tuple):
+            for arg in args[len(args) - 1]:
+                if isinstance(arg, BatchResult):
+                    raise JavaException('The result of a batch step cannot'
+                            ' be given as a variable argument')
+        return tuple(placeholders)
+
+    cdef bint has_primitive_results(self, tuple args):
+        for arg in args:
+            if isinstance(arg, BatchResult) and \
+                    not is_object_code((<BatchResult>arg).code):
+                return True
+        return False
+
+    cdef JavaMethod select(self, dict methods, tuple args, tuple standins):
+        # like JavaMultipleMethod.select(), for the calls taking the
+        # primitive results of previous steps: these are passed as is, and
+        # need a signature of their exact type
+        cdef JavaMethod jm
+        cdef JavaMethod best = None
+        cdef int index, score, best_score = 0
+        cdef const unsigned char *codes
+        for signature, jm in sorted(items_compat(methods)):
+            if jm.is_varargs or len(jm.definition_args) != len(args):
+                continue
+            codes = jm.args_codes
+            for index in range(len(args)):
+                arg = args[index]
+                if isinstance(arg, BatchResult) and \
+                        not is_object_code((<BatchResult>arg).code) and \
+                        codes[index] != (<BatchResult>arg).code:
+                    break
+            else:
+                score = calculate_score(jm.definition_args, standins)
+                if score > 0 and score >= best_score:
+                    best_score, best = score, jm
+        if best is None:
+            raise JavaException('No methods matching your arguments')
+        return best
+
+    cdef BatchResult record_call(self, target, cls, name, bint static,
+            tuple args):
+        cdef JavaMethod jm
+        cdef JavaMultipleMethod jmm
+        cdef BatchResult step = self.add_step()
+        cdef tuple standins = self.standins(args)
+
+        member = getattr(cls, name)
+        if isinstance(member, JavaMultipleMethod):
+            jmm = member
+            methods = jmm.static_methods if static else jmm.instance_methods
+            if self.has_primitive_results(args):
+                jm = self.select(methods, args, standins)
+            elif static:
+                jm = jmm.select(methods, jmm.static_by_arity, standins)
+            else:
+                jm = jmm.select(methods, jmm.instance_by_arity, standins)
+        elif isinstance(member, JavaMethod):
+            jm = member
+            if static and not jm.is_static:
+                raise JavaException('Cannot call instance method on a'
+                        ' un-instanciated class')
+        else:
+            raise JavaException('{0} is not a Java method'.format(name))
+
+        d_args = jm.definition_args
+        if jm.is_varargs:
+            args = args[:len(d_args) - 1] + (args[len(d_args) - 1:],)
+        if len(args) != len(d_args):
+            raise JavaException('Invalid call, number of argument mismatch')
+        jm.ensure_method()
+
+        step.kind = BATCH_STATIC if jm.is_static else BATCH_CALL
+        if step.kind == BATCH_CALL and isinstance(target, JavaClass) and \
+                (<JavaClass>target).j_self is None:
+            raise JavaException('Cannot call instance method on a'
+                    ' un-instanciated class')
+        step.receiver = target
+        step.j_cls = jm.j_cls
+        step.j_method = jm.j_method
+        step.d_args = d_args
+        step.codes = jm.args_codes
+        step.is_varargs = jm.is_varargs
+        step.set_result(jm.return_code, jm.definition_return)
+        step.args = self.link_args(step, args)
+        self.steps.append(step)
+        return step
+
+    cdef BatchResult record_new(self, cls, tuple args):
+        cdef JavaClass jc = cls(noinstance=True)
+        cdef JavaClassStorage jcs = getattr(cls, '__cls_storage')
+        cdef BatchResult step = self.add_step()
+        cdef JNIEnv *j_env = get_jnienv()
+
+        definition, d_args, is_varargs, codes = \
+                jc.select_constructor(jcs, self.standins(args))
+        if is_varargs:
+            args = args[:len(d_args) - 1] + (args[len(d_args) - 1:],)
+
+        defstr = str_for_c(definition)
+        step.j_method = j_env[0].GetMethodID(
+                j_env, jcs.j_cls, '<init>', <char *><bytes>defstr)
+        if step.j_method == NULL:
+            raise JavaException('Unable to found the constructor'
+                    ' for {0}'.format(cls.__javaclass__))
+
+        step.kind = BATCH_NEW
+        step.j_cls = jcs.j_cls
+        step.d_args = d_args
+        step.codes = codes
+        step.is_varargs = is_varargs
+        step.set_result(JT_OBJECT, 'L{0};'.format(cls.__javaclass__))
+        step.result_cls = cls
+        step.standin = jc
+        step.args = self.link_args(step, args)
+        self.steps.append(step)
+        return step
+
+    cdef void run(self) except *:
+        cdef BatchResult step
+        cdef batch_step *c_step
+        cdef int count = len(self.steps)
+        cdef int nargs = 0, npatches = 0
+        cdef int index, p, offset = 0, populated = 0, done
+        cdef JNIEnv *j_env = get_jnienv()
+        cdef batch_step *c_steps
+        cdef batch_patch *c_patches
+        cdef jvalue *j_args
+        cdef jvalue *j_rets
+
+        self.done = True
+        for step in self.steps:
+            nargs += len(step.d_args)
+            npatches += len(step.patches)
+
+        c_steps = <batch_step *>malloc(sizeof(batch_step) * (count + 1))
+        c_patches = <batch_patch *>malloc(sizeof(batch_patch) * (npatches + 1))
+        j_args = <jvalue *>malloc(sizeof(jvalue) * (nargs + 1))
+        j_rets = <jvalue *>malloc(sizeof(jvalue) * (count + 1))
+
+        try:
+            if c_steps == NULL or c_patches == NULL or j_args == NULL or \
+                    j_rets == NULL:
+                raise MemoryError('Unable to allocate memory for the batch')
+
+            # convert the arguments of all the steps first
+            p = 0
+            for index in range(count):
+                step = self.steps[index]
+                c_step = &c_steps[index]
+                c_step.kind = step.kind
+                c_step.code = step.code
+                c_step.j_cls = step.j_cls
+                c_step.j_method = step.j_method
+                c_step.j_self = NULL
+                c_step.self_step = -1
+                if step.kind == BATCH_CALL:
+                    if isinstance(step.receiver, BatchResult):
+                        c_step.self_step = (<BatchResult>step.receiver).index
+                    else:
+                        c_step.j_self = (<JavaClass>step.receiver).j_self.obj
+                c_step.j_args = j_args + offset
+                c_step.nargs = len(step.d_args)
+                c_step.first_patch = p
+                for arg, src in step.patches:
+                    c_patches[p].arg = arg
+                    c_patches[p].src = src
+                    p += 1
+                c_step.last_patch = p
+                j_rets[index].j = 0
+                # populate_args() releases the arguments of the step itself
+                # when one of them can't be converted
+                if c_step.nargs:
+                    populate_args(j_env, step.d_args, step.codes,
+                            c_step.j_args, PySequence_Fast_ITEMS(step.args))
+                populated = index + 1
+                offset += c_step.nargs
+
+            with nogil:
+                done = run_steps(j_env, c_steps, count, c_patches, j_rets)
+
+            if done < count:
+                # drop the results, and raise the Java exception before any
+                # other JNI call
+                for index in range(done):
+                    if is_object_code(c_steps[index].code):
+                        j_env[0].DeleteLocalRef(j_env, j_rets[index].l)
+                try:
+                    check_exception(j_env)
+                    raise JavaException('Cannot call instance method on'
+                            ' null')
+                except JavaException as e:
+                    e.step = done
+                    e.args = ('Batch step {0} failed: {1}'.format(
+                        done, e.args[0] if e.args else ''), )
+                    raise
+
+            for index in range(count):
+                step = self.steps[index]
+                if is_object_code(step.code):
+                    if j_rets[index].l != NULL:
+                        step.j_result = create_local_ref(
+                                j_env, j_rets[index].l)
+                        j_env[0].DeleteLocalRef(j_env, j_rets[index].l)
+                else:
+                    step.value_ = convert_jvalue_to_python(
+                            j_env, step.code, step.definition,
+                            &j_rets[index])
+                step.converted = step.code != JT_VOID and not \
+                        is_object_code(step.code)
+                step.available = True
+        finally:
+            for index in range(populated):
+                step = self.steps[index]
+                c_step = &c_steps[index]
+                # the results given as arguments belong to their steps
+                for p in range(c_step.first_patch, c_step.last_patch):
+                    c_step.j_args[c_patches[p].arg].j = 0
+                release_args(j_env, step.d_args, step.codes, c_step.j_args,
+                        PySequence_Fast_ITEMS(step.args))
+            free(c_steps)
+            free(c_patches)
+            free(j_args)
+            free(j_rets)
+
+
+cdef class BatchResult(object):
+    '''Result of a call recorded in a batch. It can be given as an argument to
+    the next calls of the batch, or be their receiver. Its value is available
+    once the batch has run.
+    '''
+    cdef JavaBatch batch
+    cdef readonly int index
+    cdef int kind
+    cdef object receiver
+    cdef jclass j_cls
+    cdef jmethodID j_method
+    cdef tuple d_args
+    cdef bytes codes
+    cdef bint is_varargs
+    cdef tuple args
+    # (argument index, step index) of the arguments given by previous steps
+    cdef list patches
+    # type of the result, the Python class to record calls on it, and a value
+    # of its type for choosing signatures
+    cdef int code
+    cdef object definition
+    cdef object result_cls
+    cdef object standin
+    cdef LocalRef j_result
+    cdef object value_
+    cdef bint converted
+    cdef bint available
+
+    def __cinit__(self):
+        self.patches = []
+        self.j_cls = NULL
+        self.j_method = NULL
+        self.j_result = None
+        self.converted = False
+        self.available = False
+
+    cdef void set_result(self, int code, definition) except *:
+        self.code = code
+        self.definition = definition
+        if code == JT_STRINGY or code == JT_OBJECT:
+            self.result_cls = java_class_of(definition)
+            self.standin = self.result_cls(noinstance=True)
+        elif code == JT_BOOLEAN:
+            self.standin = False
+        elif code == JT_CHAR:
+            self.standin = ' '
+        elif code == JT_FLOAT or code == JT_DOUBLE:
+            self.standin = 0.
+        elif code != JT_VOID and code != JT_ARRAY:
+            self.standin = 0
+
+    property value:
+        def __get__(self):
+            if not self.available:
+                raise JavaException('The batch has not run')
+            if not self.converted:
+                if self.j_result is not None:
+                    j_env = get_jnienv()
+                    if self.code == JT_ARRAY:
+                        self.value_ = convert_jarray_to_python(j_env,
+                                self.definition[1:], self.j_result.obj)
+                    else:
+                        self.value_ = convert_jobject_to_python(j_env,
+                                self.definition, self.j_result.obj)
+                self.converted = True
+            return self.value_
+
+    def __getattr__(self, name):
+        if name.startswith('__') or self.result_cls is None:
+            raise AttributeError(name)
+        return BatchMethod(self.batch, self, self.result_cls, name, False)
+
+    def __repr__(self):
+        return '<BatchResult of step {0}: {1}>'.format(
+            self.index, self.definition)
+
+
+cdef class BatchTarget(object):
+    '''Java object, class or BatchResult whose calls are recorded in a batch.
+    Calling the target of a class records the creation of an object.
+    '''
+    cdef JavaBatch batch
+    cdef object target
+    cdef object cls
+    cdef bint static
+
+    def __cinit__(self, JavaBatch batch, target):
+        self.batch = batch
+        self.target = target
+        if isinstance(target, MetaJavaClass):
+            self.cls = target
+            self.static = True
+        elif isinstance(target, JavaClass):
+            self.cls = type(target)
+            self.static = False
+        elif isinstance(target, BatchResult) and \
+                (<BatchResult>target).result_cls is not None:
+            self.cls = (<BatchResult>target).result_cls
+            self.static = False
+        else:
+            raise JavaException('Cannot record the calls on {0!r}'.format(
+                target))
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return BatchMethod(self.batch, self.target, self.cls, name,
+                           self.static)
+
+    def __call__(self, *args):
+        if not self.static:
+            raise JavaException('Only a Java class can be called')
+        return self.batch.record_new(self.cls, args)
+
+
+cdef class BatchMethod(object):
+    cdef JavaBatch batch
+    cdef object target
+    cdef object cls
+    cdef object name
+    cdef bint static
+
+    def __cinit__(self, JavaBatch batch, target, cls, name, bint static):
+        self.batch = batch
+        self.target = target
+        self.cls = cls
+        self.name = name
+        self.static = static
+
+    def __call__(self, *args):
+        return self.batch.record_call(self.target, self.cls, self.name,
+                                      self.static, args)
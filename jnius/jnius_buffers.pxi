@@ -0,0 +1,220 @@
+# Memory shared with java.nio: as_direct_buffer() gives a Python buffer to
+# Java as a direct ByteBuffer, released by release_direct_buffer() or once
+# Java collected the ByteBuffer, and the memoryview() method of the direct
+# ByteBuffers gives their memory to Python.
+
+# the classes of the objects that can be direct byte buffers, which get a
+# memoryview() method
+direct_buffer_classes = (
+    'java/nio/ByteBuffer', 'java/nio/MappedByteBuffer',
+    'java/nio/DirectByteBuffer', 'java/nio/DirectByteBufferR')
+
+cdef jobject j_buffer_queue = NULL
+cdef jclass j_phantom_class = NULL
+cdef jclass j_system_class = NULL
+cdef jmethodID mid_phantom_init = NULL
+cdef jmethodID mid_queue_poll = NULL
+cdef jmethodID mid_identityHashCode = NULL
+cdef jmethodID mid_isReadOnly = NULL
+
+# the Python buffers given to Java, by the identity hash code of the phantom
+# reference telling that their ByteBuffer was collected
+cdef dict buffer_exports = {}
+
+
+cdef void init_buffer_ids(JNIEnv *j_env) except *:
+    global j_buffer_queue, j_phantom_class, j_system_class
+    global mid_phantom_init, mid_queue_poll, mid_identityHashCode
+    global mid_isReadOnly
+    cdef jclass cls_queue
+    cdef jclass cls_buffer
+    cdef jobject j_queue
+    if j_buffer_queue != NULL:
+        return
+
+    cls_queue = j_env[0].FindClass(j_env, "java/lang/ref/ReferenceQueue")
+    cls_buffer = j_env[0].FindClass(j_env, "java/nio/Buffer")
+    j_phantom_class = j_env[0].FindClass(j_env, "java/lang/ref/PhantomReference")
+    j_system_class = j_env[0].FindClass(j_env, "java/lang/System")
+    if cls_queue == NULL or cls_buffer == NULL or j_phantom_class == NULL or \
+            j_system_class == NULL:
+        j_env[0].ExceptionClear(j_env)
+        raise JavaException('Unable to find the java.nio classes')
+    j_phantom_class = j_env[0].NewGlobalRef(j_env, j_phantom_class)
+    j_system_class = j_env[0].NewGlobalRef(j_env, j_system_class)
+
+    mid_phantom_init = j_env[0].GetMethodID(j_env, j_phantom_class, "<init>", "(Ljava/lang/Object;Ljava/lang/ref/ReferenceQueue;)V")
+    mid_queue_poll = j_env[0].GetMethodID(j_env, cls_queue, "poll", "()Ljava/lang/ref/Reference;")
+    mid_identityHashCode = j_env[0].GetStaticMethodID(j_env, j_system_class, "identityHashCode", "(Ljava/lang/Object;)I")
+    mid_isReadOnly = j_env[0].GetMethodID(j_env, cls_buffer, "isReadOnly", "()Z")
+
+    j_queue = j_env[0].NewObjectA(j_env, cls_queue,
+        j_env[0].GetMethodID(j_env, cls_queue, "<init>", "()V"), NULL)
+    check_exception(j_env)
+    j_buffer_queue = j_env[0].NewGlobalRef(j_env, j_queue)
+
+    j_env[0].DeleteLocalRef(j_env, j_queue)
+    j_env[0].DeleteLocalRef(j_env, cls_queue)
+    j_env[0].DeleteLocalRef(j_env, cls_buffer)
+
+
+cdef class BufferExport(object):
+    # a Python buffer used by a direct ByteBuffer, and the phantom reference
+    # of the ByteBuffer
+    cdef Py_buffer view
+    cdef bint exported
+    cdef LocalRef j_reference
+
+    def __dealloc__(self):
+        if self.exported:
+            PyBuffer_Release(&self.view)
+
+
+cdef void release_buffer_exports(JNIEnv *j_env) except *:
+    # release the Python buffers whose ByteBuffer was collected by Java
+    cdef jobject j_reference
+    cdef BufferExport export
+    while True:
+        j_reference = j_env[0].CallObjectMethod(
+                j_env, j_buffer_queue, mid_queue_poll)
+        if j_reference == NULL:
+            break
+        key = j_env[0].CallStaticIntMethod(
+                j_env, j_system_class, mid_identityHashCode, j_reference)
+        exports = buffer_exports.get(key, [])
+        for export in exports:
+            if j_env[0].IsSameObject(j_env, export.j_reference.obj, j_reference):
+                exports.remove(export)
+                break
+        if not exports:
+            buffer_exports.pop(key, None)
+        j_env[0].DeleteLocalRef(j_env, j_reference)
+
+
+def as_direct_buffer(obj):
+    '''Return a direct java.nio.ByteBuffer using the memory of obj, a writable
+    and contiguous Python buffer (bytearray, mmap, numpy array...). obj is
+    kept alive, and exported, until Java collects the ByteBuffer and a later
+    call of as_direct_buffer() or release_direct_buffer() notices it, or
+    until release_direct_buffer() is called with the ByteBuffer.
+    '''
+    cdef JNIEnv *j_env = get_jnienv()
+    cdef BufferExport export = BufferExport()
+    cdef jobject j_buffer
+    cdef jobject j_reference
+    cdef jvalue j_args[2]
+
+    init_buffer_ids(j_env)
+    release_buffer_exports(j_env)
+
+    PyObject_GetBuffer(obj, &export.view, PyBUF_WRITABLE | PyBUF_C_CONTIGUOUS)
+    export.exported = 1
+    j_buffer = j_env[0].NewDirectByteBuffer(
+            j_env, export.view.buf, export.view.len)
+    if j_buffer == NULL:
+        check_exception(j_env)
+        raise JavaException('The JVM does not support direct buffers')
+    try:
+        j_args[0].l = j_buffer
+        j_args[1].l = j_buffer_queue
+        j_reference = j_env[0].NewObjectA(
+                j_env, j_phantom_class, mid_phantom_init, j_args)
+        check_exception(j_env)
+        export.j_reference = create_local_ref(j_env, j_reference)
+        key = j_env[0].CallStaticIntMethod(
+                j_env, j_system_class, mid_identityHashCode, j_reference)
+        j_env[0].DeleteLocalRef(j_env, j_reference)
+        buffer_exports.setdefault(key, []).append(export)
+        return wrap_java_object(j_env, 'java/nio/ByteBuffer', j_buffer)
+    finally:
+        j_env[0].DeleteLocalRef(j_env, j_buffer)
+
+
+def release_direct_buffer(JavaClass bytebuffer=None):
+    '''Release the Python buffer given to Java by as_direct_buffer() for
+    bytebuffer (or a duplicate of it) at once: Java must not use the
+    ByteBuffer afterwards. Without bytebuffer, only release the Python buffers
+    whose ByteBuffer was collected by Java.
+    '''
+    cdef JNIEnv *j_env = get_jnienv()
+    cdef BufferExport export
+    cdef void *address
+    init_buffer_ids(j_env)
+    release_buffer_exports(j_env)
+    if bytebuffer is None:
+        return
+    address = j_env[0].GetDirectBufferAddress(j_env, bytebuffer.j_self.obj)
+    if address == NULL:
+        raise ValueError('The ByteBuffer is not direct')
+    for key, exports in buffer_exports.items():
+        for export in exports:
+            if export.view.buf == address:
+                exports.remove(export)
+                if not exports:
+                    del buffer_exports[key]
+                PyBuffer_Release(&export.view)
+                export.exported = 0
+                return
+    raise ValueError('The ByteBuffer was not given by as_direct_buffer()')
+
+
+cdef class DirectBuffer(object):
+    # the memory of a direct ByteBuffer, exported to memoryview
+    cdef LocalRef j_buffer
+    cdef void *address
+    cdef Py_ssize_t shape[1]
+    cdef bint readonly
+
+    def __getbuffer__(self, Py_buffer *buffer, int flags):
+        if self.readonly and flags & PyBUF_WRITABLE:
+            raise BufferError('The ByteBuffer is read-only')
+        buffer.buf = self.address
+        buffer.obj = self
+        buffer.len = self.shape[0]
+        buffer.readonly = self.readonly
+        buffer.itemsize = 1
+        buffer.format = <char *>'B' if flags & PyBUF_FORMAT else NULL
+        buffer.ndim = 1
+        buffer.shape = self.shape
+        buffer.strides = NULL
+        buffer.suboffsets = NULL
+        buffer.internal = NULL
+
+
+def direct_buffer_memoryview(JavaClass bytebuffer):
+    '''Return a memoryview of the memory of a direct ByteBuffer, from 0 to
+    its capacity, read-only if the ByteBuffer is. This is the memoryview()
+    method of the ByteBuffer classes.
+    '''
+    cdef JNIEnv *j_env = get_jnienv()
+    cdef jobject j_object = bytebuffer.j_self.obj
+    cdef DirectBuffer ret
+    cdef void *address = j_env[0].GetDirectBufferAddress(j_env, j_object)
+    if address == NULL:
+        raise ValueError('The ByteBuffer is not direct')
+    init_buffer_ids(j_env)
+    ret = DirectBuffer()
+    ret.j_buffer = create_local_ref(j_env, j_object)
+    ret.address = address
+    ret.shape[0] = j_env[0].GetDirectBufferCapacity(j_env, j_object)
+    ret.readonly = j_env[0].CallBooleanMethod(j_env, j_object, mid_isReadOnly)
+    return memoryview(ret)
+
+
+cdef jobject direct_buffer_of(obj):
+    # the ByteBuffer of a memoryview returned by direct_buffer_memoryview(),
+    # or NULL
+    cdef Py_buffer *view
+    cdef PyObject *exporter
+    cdef DirectBuffer base
+    if not isinstance(obj, memoryview):
+        return NULL
+    view = PyMemoryView_GET_BUFFER(obj)
+    exporter = <PyObject *>PyMemoryView_GET_BASE(obj)
+    if exporter == NULL or not isinstance(<object>exporter, DirectBuffer):
+        return NULL
+    base = <DirectBuffer>exporter
+    # a slice of the memoryview is not the ByteBuffer
+    if view.buf != base.address or view.len != base.shape[0]:
+        return NULL
+    return base.j_buffer.obj
@@ -0,0 +1,32 @@
+# C API of the jnius module, for the extensions generated by
+# python -m jnius.pregen --cython. The jnius module exports a JniusCAPI
+# struct in the jnius.jnius._C_API capsule; this file is included by both
+# sides, and copied next to the generated extensions.
+#
+# Bump JNIUS_CAPI_VERSION on any change of the struct.
+
+DEF JNIUS_CAPI_VERSION = 2
+
+ctypedef struct JniusCAPI:
+    int version
+    # JNIEnv of the current thread
+    JNIEnv *(*get_jnienv)() except NULL
+    # global reference to the Java class of a MetaJavaClass class
+    jclass (*get_j_cls)(object tp) except NULL
+    # Java object wrapped by a JavaClass instance
+    jobject (*get_j_self)(object obj) except NULL
+    # the type codes of the definitions of a tuple, computed once for the
+    # calls of convert_arg and release_arg
+    bytes (*signature_codes)(tuple definitions)
+    # convert a Python argument to j_arg, then release it after the call,
+    # for any non-primitive type definition, given as a tuple of one
+    # definition with its type code
+    int (*convert_arg)(JNIEnv *j_env, tuple definition, const char *code,
+                       object arg, jvalue *j_arg) except -1
+    int (*release_arg)(JNIEnv *j_env, tuple definition, const char *code,
+                       object arg, jvalue *j_arg) except -1
+    # convert a returned object or array, and delete the local reference
+    object (*convert_result)(JNIEnv *j_env, object definition,
+                             jobject j_object)
+    # raise the pending Java exception as a JavaException
+    int (*check_exception)(JNIEnv *j_env) except -1
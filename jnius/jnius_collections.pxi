@@ -0,0 +1,147 @@
+# The Python dicts, sets and lists given for a java.util.Map, Set or List are
+# converted to a HashMap, HashSet or ArrayList: their keys and values are
+# converted to arrays of primitives or of strings when possible, and the
+# collection is built from the arrays in one call to org.jnius.Flatten.
+
+# the kind of the Python collections accepted by the Java types: 'M' for the
+# dicts, 'S' for the sets, 'L' for the lists and tuples, 'C' for the sets,
+# lists and tuples, 'O' for the dicts and sets
+collection_types = {
+    'java/util/Map': 'M', 'java/util/HashMap': 'M',
+    'java/util/AbstractMap': 'M',
+    'java/util/Set': 'S', 'java/util/HashSet': 'S',
+    'java/util/AbstractSet': 'S',
+    'java/util/List': 'L', 'java/util/ArrayList': 'L',
+    'java/util/AbstractList': 'L',
+    'java/util/Collection': 'C', 'java/util/AbstractCollection': 'C',
+    'java/lang/Iterable': 'C',
+    'java/lang/Object': 'O'}
+
+cdef jclass j_flatten_class = NULL
+cdef jmethodID mid_flatten_toList = NULL
+cdef jmethodID mid_flatten_toSet = NULL
+cdef jmethodID mid_flatten_toMap = NULL
+
+
+cdef void init_flatten_ids(JNIEnv *j_env) except *:
+    global j_flatten_class
+    global mid_flatten_toList, mid_flatten_toSet, mid_flatten_toMap
+    cdef jclass j_class
+    if j_flatten_class != NULL:
+        return
+    j_class = j_env[0].FindClass(j_env, "org/jnius/Flatten")
+    if j_class == NULL:
+        j_env[0].ExceptionClear(j_env)
+        raise JavaException('Unable to find org.jnius.Flatten, the pyjnius '
+                'classes must be in the classpath to convert a collection')
+    mid_flatten_toList = j_env[0].GetStaticMethodID(j_env, j_class, "toList", "(Ljava/lang/Object;)Ljava/util/ArrayList;")
+    mid_flatten_toSet = j_env[0].GetStaticMethodID(j_env, j_class, "toSet", "(Ljava/lang/Object;)Ljava/util/HashSet;")
+    mid_flatten_toMap = j_env[0].GetStaticMethodID(j_env, j_class, "toMap", "(Ljava/lang/Object;Ljava/lang/Object;)Ljava/util/HashMap;")
+    check_exception(j_env)
+    j_flatten_class = j_env[0].NewGlobalRef(j_env, j_class)
+    j_env[0].DeleteLocalRef(j_env, j_class)
+
+
+cdef bint collection_accepts(r, obj):
+    # if the Python collection obj can be converted for the Java type r
+    cdef object kind
+    if isinstance(obj, dict):
+        kind = collection_types.get(r)
+        return kind == 'M' or kind == 'O'
+    elif isinstance(obj, (set, frozenset)):
+        kind = collection_types.get(r)
+        return kind == 'S' or kind == 'C' or kind == 'O'
+    elif isinstance(obj, (list, tuple)):
+        kind = collection_types.get(r)
+        return kind == 'L' or kind == 'C'
+    return False
+
+
+cdef bint borrowed_jobject(obj):
+    # if convert_python_to_jobject() gives the reference of obj itself
+    # instead of a new local reference
+    return isinstance(obj, (JavaClass, JavaObject, MetaJavaClass,
+        PythonJavaClass, type)) or direct_buffer_of(obj) != NULL
+
+
+cdef jobject convert_pyvalues_to_java(JNIEnv *j_env, list values) except NULL:
+    # a new local reference to an array of the values: a boolean[], long[] or
+    # double[] if they are all of this type, a String[] if they are all
+    # strings or None, or else an Object[] of the converted values
+    cdef bint booleans = True, ints = True, floats = True, strings = True
+    cdef jclass j_class
+    cdef jobject ret, j_item
+    cdef Py_ssize_t i
+    for value in values:
+        if not isinstance(value, bool):
+            booleans = False
+            if not isinstance(value, (int, long)):
+                ints = False
+        else:
+            ints = False
+        if not isinstance(value, float):
+            floats = False
+        if value is not None and not isinstance(value, basestring):
+            strings = False
+        if not (booleans or ints or floats or strings):
+            break
+
+    if values:
+        if booleans:
+            return convert_primitives_to_java(j_env, 'Z', values)
+        elif ints:
+            return convert_primitives_to_java(j_env, 'J', values)
+        elif floats:
+            return convert_primitives_to_java(j_env, 'D', values)
+        elif strings:
+            return convert_pyarray_to_java(
+                    j_env, 'Ljava/lang/String;', values)
+
+    j_class = j_env[0].FindClass(j_env, "java/lang/Object")
+    ret = j_env[0].NewObjectArray(j_env, len(values), j_class, NULL)
+    j_env[0].DeleteLocalRef(j_env, j_class)
+    if ret == NULL:
+        check_exception(j_env)
+        raise MemoryError('Unable to create an array')
+    try:
+        for i, value in enumerate(values):
+            j_item = convert_python_to_jobject(
+                    j_env, 'Ljava/lang/Object;', value)
+            j_env[0].SetObjectArrayElement(j_env, ret, i, j_item)
+            if j_item != NULL and not borrowed_jobject(value):
+                j_env[0].DeleteLocalRef(j_env, j_item)
+    except:
+        j_env[0].DeleteLocalRef(j_env, ret)
+        raise
+    return ret
+
+
+cdef jobject convert_pycollection_to_java(JNIEnv *j_env, obj) except NULL:
+    # a new local reference to a HashMap of a dict, a HashSet of a set, or an
+    # ArrayList of a list or tuple
+    cdef jvalue j_args[2]
+    cdef jmethodID j_method
+    cdef jobject ret
+    init_flatten_ids(j_env)
+    j_args[1].l = NULL
+    if isinstance(obj, dict):
+        j_method = mid_flatten_toMap
+        j_args[0].l = convert_pyvalues_to_java(j_env, list(obj.keys()))
+        try:
+            j_args[1].l = convert_pyvalues_to_java(j_env, list(obj.values()))
+        except:
+            j_env[0].DeleteLocalRef(j_env, j_args[0].l)
+            raise
+    else:
+        if isinstance(obj, (set, frozenset)):
+            j_method = mid_flatten_toSet
+        else:
+            j_method = mid_flatten_toList
+        j_args[0].l = convert_pyvalues_to_java(j_env, list(obj))
+    ret = j_env[0].CallStaticObjectMethodA(
+            j_env, j_flatten_class, j_method, j_args)
+    j_env[0].DeleteLocalRef(j_env, j_args[0].l)
+    if j_args[1].l != NULL:
+        j_env[0].DeleteLocalRef(j_env, j_args[1].l)
+    check_exception(j_env)
+    return ret
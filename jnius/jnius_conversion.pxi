@@ -1,126 +1,305 @@
 from cpython.version cimport PY_MAJOR_VERSION
 
+# type codes of the Java types of a signature: the definitions of the methods
+# and fields are compiled once with signature_codes(), and their conversions
+# switch over these codes instead of comparing strings on each call
+cdef enum:
+    JT_INVALID = 0
+    JT_VOID
+    JT_BOOLEAN
+    JT_BYTE
+    JT_CHAR
+    JT_SHORT
+    JT_INT
+    JT_LONG
+    JT_FLOAT
+    JT_DOUBLE
+    JT_STRINGY      # String, CharSequence or Object: accepts a Python string
+    JT_OBJECT
+    JT_ARRAY
+
 cdef jstringy_arg(argtype):
     return argtype in ('Ljava/lang/String;',
                        'Ljava/lang/CharSequence;',
                        'Ljava/lang/Object;')
 
-cdef void release_args(JNIEnv *j_env, tuple definition_args, jvalue *j_args, args) except *:
+cdef int signature_code(argtype):
+    # the type code of a single type of a signature
+    if not argtype:
+        return JT_INVALID
+    c = argtype[0]
+    if c == 'L':
+        return JT_STRINGY if jstringy_arg(argtype) else JT_OBJECT
+    if c == '[':
+        return JT_ARRAY
+    return {'V': JT_VOID, 'Z': JT_BOOLEAN, 'B': JT_BYTE, 'C': JT_CHAR,
+            'S': JT_SHORT, 'I': JT_INT, 'J': JT_LONG, 'F': JT_FLOAT,
+            'D': JT_DOUBLE}.get(c, JT_INVALID)
+
+cdef bytes signature_codes(definition_args):
+    # the type codes of the arguments of a signature, as a C array of bytes
+    return bytes(bytearray([signature_code(argtype)
+                            for argtype in definition_args or ()]))
+
+cdef tuple argv_tuple(PyObject **argv, Py_ssize_t nargs):
+    # the arguments of a vectorcall, or from PySequence_Fast_ITEMS(), as a
+    # tuple
+    cdef tuple args = PyTuple_New(nargs)
+    cdef Py_ssize_t index
+    for index in range(nargs):
+        arg = <object>argv[index]
+        Py_INCREF(arg)
+        PyTuple_SET_ITEM(args, index, arg)
+    return args
+
+cdef void release_args(JNIEnv *j_env, tuple definition_args,
+        const unsigned char *codes, jvalue *j_args, PyObject **argv) except *:
     # do the conversion from a Python object to Java from a Java definition
-    cdef JavaObject jo
-    cdef JavaClass jc
-    cdef int index
-    for index, argtype in enumerate(definition_args):
-        py_arg = args[index]
-        if argtype[0] == 'L':
+    cdef int index, code
+    for index in range(len(definition_args)):
+        code = codes[index]
+        if code == JT_STRINGY or code == JT_OBJECT:
+            # java/lang/Object is stringy: anything but a string is given as
+            # for the other objects
+            py_arg = <object>argv[index]
             if py_arg is None:
                 j_args[index].l = NULL
-            if isinstance(py_arg, basestring) and \
-                    jstringy_arg(argtype):
+            elif isinstance(py_arg, PrimitiveArray):
+                (<PrimitiveArray>py_arg).refresh(j_env)
+            elif (code == JT_STRINGY and isinstance(py_arg, basestring)) or \
+                    isinstance(py_arg, (tuple, list, JavaObjectArray)) or \
+                    collection_accepts(definition_args[index][1:-1], py_arg):
+                # a new local reference to the converted string, collection
+                # or array
+                j_env[0].DeleteLocalRef(j_env, j_args[index].l)
+        elif code == JT_ARRAY:
+            py_arg = <object>argv[index]
+            if isinstance(py_arg, PrimitiveArray):
+                # the view was given as the Java array
+                (<PrimitiveArray>py_arg).refresh(j_env)
+                continue
+            if isinstance(py_arg, JavaObjectArray):
                 j_env[0].DeleteLocalRef(j_env, j_args[index].l)
-        elif argtype[0] == '[':
-            ret = convert_jarray_to_python(j_env, argtype[1:], j_args[index].l)
-            try:
-                args[index][:] = ret
-            except TypeError:
-                pass
+                continue
+            argtype = definition_args[index]
+            if j_args[index].l == NULL:
+                continue
+            # give back the changes done by Java to the lists, and to the
+            # writable buffers of the same layout
+            if isinstance(py_arg, list):
+                ret = convert_jarray_to_python(
+                    j_env, argtype[1:], j_args[index].l)
+                py_arg[:] = ret
+            elif len(argtype) == 2 and argtype[1] in 'ZBCSIJFD' and \
+                    PyObject_CheckBuffer(py_arg):
+                write_back_buffer(j_env, ord(argtype[1]), j_args[index].l,
+                        py_arg)
             j_env[0].DeleteLocalRef(j_env, j_args[index].l)
 
-cdef void populate_args(JNIEnv *j_env, tuple definition_args, jvalue *j_args, args) except *:
+cdef void populate_args(JNIEnv *j_env, tuple definition_args,
+        const unsigned char *codes, jvalue *j_args, PyObject **argv) except *:
     # do the conversion from a Python object to Java from a Java definition
     cdef JavaClassStorage jcs
     cdef JavaObject jo
     cdef JavaClass jc
     cdef PythonJavaClass pc
-    cdef int index
-    cdef bytes py_str
-    for index, argtype in enumerate(definition_args):
-        py_arg = args[index]
-        if argtype == 'Z':
-            j_args[index].z = py_arg
-        elif argtype == 'B':
-            j_args[index].b = py_arg
-        elif argtype == 'C':
-            j_args[index].c = ord(py_arg)
-        elif argtype == 'S':
-            j_args[index].s = py_arg
-        elif argtype == 'I':
-            j_args[index].i = py_arg
-        elif argtype == 'J':
-            j_args[index].j = py_arg
-        elif argtype == 'F':
-            j_args[index].f = py_arg
-        elif argtype == 'D':
-            j_args[index].d = py_arg
-        elif argtype[0] == 'L':
-            if py_arg is None:
-                j_args[index].l = NULL
-            elif (isinstance(py_arg, basestring) or (PY_MAJOR_VERSION >=3 and isinstance(py_arg, str))) \
-                  and jstringy_arg(argtype):
-                try:
-                    py_str = <bytes>py_arg
-                    j_args[index].l = j_env[0].NewStringUTF(j_env, <char *>py_str)
-                except (UnicodeEncodeError, TypeError):
-                    py_str = <bytes>py_arg.encode('utf-8')
-                    j_args[index].l = j_env[0].NewStringUTF(j_env, <char *>py_str)
-            elif isinstance(py_arg, JavaClass):
-                jc = py_arg
-                check_assignable_from(j_env, jc, argtype[1:-1])
-                j_args[index].l = jc.j_self.obj
-            elif isinstance(py_arg, JavaObject):
-                jo = py_arg
-                j_args[index].l = jo.obj
-            elif isinstance(py_arg, MetaJavaClass):
-                jcs = py_arg.__cls_storage
-                j_args[index].l = jcs.j_cls
-            elif isinstance(py_arg, PythonJavaClass):
-                # from python class, get the proxy/python class
-                pc = py_arg
-                # get the java class
-                jc = pc.j_self
-                # get the localref
-                j_args[index].l = jc.j_self.obj
-            elif isinstance(py_arg, type):
-                jc = py_arg
-                j_args[index].l = jc.j_cls
-            elif isinstance(py_arg, (tuple, list)):
-                j_args[index].l = convert_pyarray_to_java(j_env, argtype, py_arg)
-            else:
-                raise JavaException('Invalid python object for this '
-                        'argument. Want {0!r}, got {1!r}'.format(
-                            argtype[1:-1], py_arg))
-        elif argtype[0] == '[':
-            if py_arg is None:
-                j_args[index].l = NULL
-                continue
-            if isinstance(py_arg, basestring) and PY_MAJOR_VERSION < 3:
-                if argtype == '[B':
-                    py_arg = map(ord, py_arg)
-                elif argtype == '[C':
+    cdef int index = 0, code
+    try:
+        for index in range(len(definition_args)):
+            py_arg = <object>argv[index]
+            code = codes[index]
+            if code == JT_BOOLEAN:
+                j_args[index].z = py_arg
+            elif code == JT_BYTE:
+                j_args[index].b = py_arg
+            elif code == JT_CHAR:
+                j_args[index].c = ord(py_arg)
+            elif code == JT_SHORT:
+                j_args[index].s = py_arg
+            elif code == JT_INT:
+                j_args[index].i = py_arg
+            elif code == JT_LONG:
+                j_args[index].j = py_arg
+            elif code == JT_FLOAT:
+                j_args[index].f = py_arg
+            elif code == JT_DOUBLE:
+                j_args[index].d = py_arg
+            elif code == JT_STRINGY or code == JT_OBJECT:
+                argtype = definition_args[index]
+                if py_arg is None:
+                    j_args[index].l = NULL
+                elif code == JT_STRINGY and (isinstance(py_arg, basestring) or
+                        (PY_MAJOR_VERSION >=3 and isinstance(py_arg, str))):
+                    j_args[index].l = convert_pystring_to_java(j_env, py_arg)
+                elif isinstance(py_arg, JavaClass):
+                    jc = py_arg
+                    check_assignable_from(j_env, jc, argtype[1:-1])
+                    j_args[index].l = jc.j_self.obj
+                elif isinstance(py_arg, JavaObject):
+                    jo = py_arg
+                    j_args[index].l = jo.obj
+                elif isinstance(py_arg, MetaJavaClass):
+                    jcs = py_arg.__cls_storage
+                    j_args[index].l = jcs.j_cls
+                elif isinstance(py_arg, PythonJavaClass):
+                    # from python class, get the proxy/python class
+                    pc = py_arg
+                    # get the java class
+                    jc = pc.j_self
+                    # get the localref
+                    j_args[index].l = jc.j_self.obj
+                elif isinstance(py_arg, type):
+                    jc = py_arg
+                    j_args[index].l = jc.j_cls
+                elif isinstance(py_arg, PrimitiveArray):
+                    j_args[index].l = (<PrimitiveArray>py_arg).java_array()
+                elif direct_buffer_of(py_arg) != NULL:
+                    j_args[index].l = direct_buffer_of(py_arg)
+                elif collection_accepts(argtype[1:-1], py_arg):
+                    j_args[index].l = convert_pycollection_to_java(j_env, py_arg)
+                elif isinstance(py_arg, (tuple, list, JavaObjectArray)):
+                    j_args[index].l = convert_pyarray_to_java(j_env, argtype, py_arg)
+                else:
+                    raise JavaException('Invalid python object for this '
+                            'argument. Want {0!r}, got {1!r}'.format(
+                                argtype[1:-1], py_arg))
+            elif code == JT_ARRAY:
+                argtype = definition_args[index]
+                if py_arg is None:
+                    j_args[index].l = NULL
+                    continue
+                if isinstance(py_arg, basestring) and PY_MAJOR_VERSION < 3:
+                    if argtype == '[B':
+                        py_arg = map(ord, py_arg)
+                    elif argtype == '[C':
+                        py_arg = list(py_arg)
+                if isinstance(py_arg, str) and PY_MAJOR_VERSION >= 3 and argtype == '[C':
                     py_arg = list(py_arg)
-            if isinstance(py_arg, str) and PY_MAJOR_VERSION >= 3 and argtype == '[C':
-                py_arg = list(py_arg)
-            if isinstance(py_arg, ByteArray) and argtype != '[B':
-                raise JavaException(
-                    'Cannot use ByteArray for signature {}'.format(argtype))
-            if not isinstance(py_arg, (list, tuple, ByteArray, bytes, bytearray)):
-                raise JavaException('Expecting a python list/tuple, got '
-                        '{0!r}'.format(py_arg))
-            j_args[index].l = convert_pyarray_to_java(
-                    j_env, argtype[1:], py_arg)
+                if isinstance(py_arg, PrimitiveArray):
+                    if argtype[1:] != py_arg.definition:
+                        raise JavaException('Cannot use {0} for signature '
+                            '{1}'.format(py_arg.__class__.__name__, argtype))
+                    j_args[index].l = (<PrimitiveArray>py_arg).java_array()
+                    continue
+                if not isinstance(py_arg, (list, tuple, bytes, bytearray,
+                        JavaObjectArray)) and not PyObject_CheckBuffer(py_arg):
+                    raise JavaException('Expecting a python list/tuple, got '
+                            '{0!r}'.format(py_arg))
+                j_args[index].l = convert_pyarray_to_java(
+                        j_env, argtype[1:], py_arg)
+    except:
+        # the callers release the arguments only once they are all converted:
+        # release the ones converted before the failing one
+        release_args(j_env, definition_args[:index], codes, j_args, argv)
+        raise
+
+
+# the box classes of the primitive types, with the ids of their valueOf and
+# <type>Value methods: they are looked up once, and the boxing goes through
+# valueOf to use the caches of the small values
+box_types = (
+    ('java/lang/Boolean', 'Z', 'booleanValue'),
+    ('java/lang/Byte', 'B', 'byteValue'),
+    ('java/lang/Character', 'C', 'charValue'),
+    ('java/lang/Short', 'S', 'shortValue'),
+    ('java/lang/Integer', 'I', 'intValue'),
+    ('java/lang/Long', 'J', 'longValue'),
+    ('java/lang/Float', 'F', 'floatValue'),
+    ('java/lang/Double', 'D', 'doubleValue'))
+
+# the index in box_types of the box classes, and of the primitive types
+box_class_index = dict((box[0], index) for index, box in enumerate(box_types))
+box_code_index = dict((box[1], index) for index, box in enumerate(box_types))
+
+cdef jclass box_class[8]
+cdef jmethodID box_value_of[8]
+cdef jmethodID box_unbox[8]
+cdef bint box_ids_ready = False
+
+
+cdef void init_box_ids(JNIEnv *j_env) except *:
+    global box_ids_ready
+    cdef jclass j_class
+    cdef int index
+    if box_ids_ready:
+        return
+    for index, (name, code, unbox) in enumerate(box_types):
+        j_class = j_env[0].FindClass(j_env, <bytes>str_for_c(name))
+        if j_class == NULL:
+            j_env[0].ExceptionClear(j_env)
+            raise JavaException('Unable to find the class {0}'.format(name))
+        box_class[index] = j_env[0].NewGlobalRef(j_env, j_class)
+        j_env[0].DeleteLocalRef(j_env, j_class)
+        box_value_of[index] = j_env[0].GetStaticMethodID(
+                j_env, box_class[index], 'valueOf',
+                <bytes>str_for_c('({0})L{1};'.format(code, name)))
+        box_unbox[index] = j_env[0].GetMethodID(
+                j_env, box_class[index], <bytes>str_for_c(unbox),
+                <bytes>str_for_c('(){0}'.format(code)))
+        if box_value_of[index] == NULL or box_unbox[index] == NULL:
+            j_env[0].ExceptionClear(j_env)
+            raise JavaException('Unable to find the methods of {0}'.format(
+                name))
+    box_ids_ready = True
+
+
+cdef jobject box_value(JNIEnv *j_env, int index, obj) except *:
+    # a new local reference to the box of obj, as the primitive type of the
+    # box class at index
+    cdef jvalue j_ret[1]
+    init_box_ids(j_env)
+    if index == 0:
+        j_ret[0].z = 1 if obj else 0
+    elif index == 1:
+        j_ret[0].b = obj
+    elif index == 2:
+        j_ret[0].c = ord(obj)
+    elif index == 3:
+        j_ret[0].s = obj
+    elif index == 4:
+        j_ret[0].i = int(obj)
+    elif index == 5:
+        j_ret[0].j = obj
+    elif index == 6:
+        j_ret[0].f = obj
+    else:
+        j_ret[0].d = obj
+    return j_env[0].CallStaticObjectMethodA(
+            j_env, box_class[index], box_value_of[index], j_ret)
+
+
+cdef object unbox_value(JNIEnv *j_env, int index, jobject j_object):
+    # the primitive value of the box j_object of the box class at index
+    cdef jmethodID j_method
+    init_box_ids(j_env)
+    j_method = box_unbox[index]
+    if index == 0:
+        return j_env[0].CallBooleanMethod(j_env, j_object, j_method)
+    elif index == 1:
+        return j_env[0].CallByteMethod(j_env, j_object, j_method)
+    elif index == 2:
+        return ord(j_env[0].CallCharMethod(j_env, j_object, j_method))
+    elif index == 3:
+        return j_env[0].CallShortMethod(j_env, j_object, j_method)
+    elif index == 4:
+        return j_env[0].CallIntMethod(j_env, j_object, j_method)
+    elif index == 5:
+        return j_env[0].CallLongMethod(j_env, j_object, j_method)
+    elif index == 6:
+        return j_env[0].CallFloatMethod(j_env, j_object, j_method)
+    return j_env[0].CallDoubleMethod(j_env, j_object, j_method)
 
 
 cdef convert_jobject_to_python(JNIEnv *j_env, definition, jobject j_object):
     # Convert a Java Object to a Python object, according to the definition.
     # If the definition is a java/lang/Object, then try to determine what is it
     # exactly.
-    cdef char *c_str
-    cdef bytes py_str
     r = definition[1:-1]
     cdef JavaObject ret_jobject
     cdef JavaClass ret_jc
     cdef jclass retclass
     cdef jmethodID retmeth
+    cdef jstring string
 
     # we got a generic object -> lookup for the real name instead.
     if r == 'java/lang/Object':
@@ -144,51 +323,23 @@ cdef convert_jobject_to_python(JNIEnv *j_env, definition, jobject j_object):
             string = <jstring> (j_env[0].CallObjectMethod(j_env, j_object, retmeth))
         else:
             string = <jstring>j_object
-        c_str = <char *>j_env[0].GetStringUTFChars(j_env, string, NULL)
-        py_str = <bytes>c_str
-        j_env[0].ReleaseStringUTFChars(j_env, string, c_str)
-
-
-        if PY_MAJOR_VERSION < 3:
-            return py_str
-        else:
-            return py_str.decode('utf-8')
+        try:
+            return convert_jstring_to_python(j_env, string)
+        finally:
+            if string != j_object:
+                j_env[0].DeleteLocalRef(j_env, string)
 
     # XXX should be deactivable from configuration
     # ie, user might not want autoconvertion of lang classes.
-    if r == 'java/lang/Long':
-        retclass = j_env[0].GetObjectClass(j_env, j_object)
-        retmeth = j_env[0].GetMethodID(j_env, retclass, 'longValue', '()J')
-        return j_env[0].CallLongMethod(j_env, j_object, retmeth)
-    if r == 'java/lang/Integer':
-        retclass = j_env[0].GetObjectClass(j_env, j_object)
-        retmeth = j_env[0].GetMethodID(j_env, retclass, 'intValue', '()I')
-        return j_env[0].CallIntMethod(j_env, j_object, retmeth)
-    if r == 'java/lang/Float':
-        retclass = j_env[0].GetObjectClass(j_env, j_object)
-        retmeth = j_env[0].GetMethodID(j_env, retclass, 'floatValue', '()F')
-        return j_env[0].CallFloatMethod(j_env, j_object, retmeth)
-    if r == 'java/lang/Double':
-        retclass = j_env[0].GetObjectClass(j_env, j_object)
-        retmeth = j_env[0].GetMethodID(j_env, retclass, 'doubleValue', '()D')
-        return j_env[0].CallDoubleMethod(j_env, j_object, retmeth)
-    if r == 'java/lang/Short':
-        retclass = j_env[0].GetObjectClass(j_env, j_object)
-        retmeth = j_env[0].GetMethodID(j_env, retclass, 'shortValue', '()S')
-        return j_env[0].CallShortMethod(j_env, j_object, retmeth)
-    if r == 'java/lang/Boolean':
-        retclass = j_env[0].GetObjectClass(j_env, j_object)
-        retmeth = j_env[0].GetMethodID(j_env, retclass, 'booleanValue', '()Z')
-        return j_env[0].CallBooleanMethod(j_env, j_object, retmeth)
-    if r == 'java/lang/Byte':
-        retclass = j_env[0].GetObjectClass(j_env, j_object)
-        retmeth = j_env[0].GetMethodID(j_env, retclass, 'byteValue', '()B')
-        return j_env[0].CallByteMethod(j_env, j_object, retmeth)
-    if r == 'java/lang/Character':
-        retclass = j_env[0].GetObjectClass(j_env, j_object)
-        retmeth = j_env[0].GetMethodID(j_env, retclass, 'charValue', '()C')
-        return ord(j_env[0].CallCharMethod(j_env, j_object, retmeth))
+    if r in box_class_index:
+        return unbox_value(j_env, box_class_index[r], j_object)
+
+    return wrap_java_object(j_env, r, j_object)
 
+
+cdef wrap_java_object(JNIEnv *j_env, r, jobject j_object):
+    # the instance of the Python class of the Java class r for j_object
+    cdef JavaClass ret_jc
     if r not in jclass_register:
         if r.startswith('$Proxy'):
             # only for $Proxy on android, don't use autoclass. The dalvik vm is
@@ -204,92 +355,60 @@ cdef convert_jobject_to_python(JNIEnv *j_env, definition, jobject j_object):
     ret_jc.instanciate_from(create_local_ref(j_env, j_object))
     return ret_jc
 
+cdef object convert_jvalue_to_python(JNIEnv *j_env, int code, definition,
+        jvalue *value):
+    # converts a value returned by a Java method with the return type
+    # `definition` of type code `code`, and deletes its local reference
+    cdef object ret = None
+    if code == JT_VOID:
+        return None
+    elif code == JT_BOOLEAN:
+        return True if value[0].z else False
+    elif code == JT_BYTE:
+        return <char>value[0].b
+    elif code == JT_CHAR:
+        return chr(<char>value[0].c)
+    elif code == JT_SHORT:
+        return <short>value[0].s
+    elif code == JT_INT:
+        return <int>value[0].i
+    elif code == JT_LONG:
+        return <long long>value[0].j
+    elif code == JT_FLOAT:
+        return <float>value[0].f
+    elif code == JT_DOUBLE:
+        return <double>value[0].d
+    if value[0].l == NULL:
+        return None
+    try:
+        if code == JT_ARRAY:
+            ret = convert_jarray_to_python(j_env, definition[1:], value[0].l)
+        else:
+            ret = convert_jobject_to_python(j_env, definition, value[0].l)
+    finally:
+        j_env[0].DeleteLocalRef(j_env, value[0].l)
+    return ret
+
+
 cdef convert_jarray_to_python(JNIEnv *j_env, definition, jobject j_object):
-    cdef jboolean iscopy
-    cdef jboolean *j_booleans
-    cdef jbyte *j_bytes
-    cdef jchar *j_chars
-    cdef jshort *j_shorts
-    cdef jint *j_ints
-    cdef jlong *j_longs
-    cdef jfloat *j_floats
-    cdef jdouble *j_doubles
     cdef object ret = None
     cdef jsize array_size
 
     cdef int i
     cdef jobject j_object_item
-    cdef char *c_str
-    cdef bytes py_str
-    cdef JavaObject ret_jobject
-    cdef JavaClass ret_jc
-    cdef ByteArray ret_as_bytearray
 
     if j_object == NULL:
         return None
 
+    r = definition[0]
+    if r in 'ZBCSIJFD':
+        return new_primitive_array(j_env, r, j_object)
+    if lazy_object_arrays and (r == 'L' or r == '['):
+        return new_object_array(j_env, definition, j_object)
+
     array_size = j_env[0].GetArrayLength(j_env, j_object)
 
-    r = definition[0]
-    if r == 'Z':
-        j_booleans = j_env[0].GetBooleanArrayElements(
-                j_env, j_object, &iscopy)
-        ret = [(True if j_booleans[i] else False)
-                for i in range(array_size)]
-        j_env[0].ReleaseBooleanArrayElements(
-                j_env, j_object, j_booleans, 0)
-
-    elif r == 'B':
-        j_bytes = j_env[0].GetByteArrayElements(
-                j_env, j_object, &iscopy)
-        ret_as_bytearray = ByteArray()
-        ret_as_bytearray.set_buffer(j_env, j_object, array_size, j_bytes)
-        return ret_as_bytearray
-
-    elif r == 'C':
-        j_chars = j_env[0].GetCharArrayElements(
-                j_env, j_object, &iscopy)
-        ret = [chr(<char>j_chars[i]) for i in range(array_size)]
-        j_env[0].ReleaseCharArrayElements(
-                j_env, j_object, j_chars, 0)
-
-    elif r == 'S':
-        j_shorts = j_env[0].GetShortArrayElements(
-                j_env, j_object, &iscopy)
-        ret = [(<short>j_shorts[i]) for i in range(array_size)]
-        j_env[0].ReleaseShortArrayElements(
-                j_env, j_object, j_shorts, 0)
-
-    elif r == 'I':
-        j_ints = j_env[0].GetIntArrayElements(
-                j_env, j_object, &iscopy)
-        ret = [(<int>j_ints[i]) for i in range(array_size)]
-        j_env[0].ReleaseIntArrayElements(
-                j_env, j_object, j_ints, 0)
-
-    elif r == 'J':
-        j_longs = j_env[0].GetLongArrayElements(
-                j_env, j_object, &iscopy)
-        ret = [(<long long>j_longs[i]) for i in range(array_size)]
-        j_env[0].ReleaseLongArrayElements(
-                j_env, j_object, j_longs, 0)
-
-    elif r == 'F':
-        j_floats = j_env[0].GetFloatArrayElements(
-                j_env, j_object, &iscopy)
-        ret = [(<float>j_floats[i]) for i in range(array_size)]
-        j_env[0].ReleaseFloatArrayElements(
-                j_env, j_object, j_floats, 0)
-
-    elif r == 'D':
-        j_doubles = j_env[0].GetDoubleArrayElements(
-                j_env, j_object, &iscopy)
-        ret = [(<double>j_doubles[i]) for i in range(array_size)]
-        j_env[0].ReleaseDoubleArrayElements(
-                j_env, j_object, j_doubles, 0)
-
-    elif r == 'L':
-        r = definition[1:-1]
+    if r == 'L':
         ret = []
         for i in range(array_size):
             j_object_item = j_env[0].GetObjectArrayElement(
@@ -322,8 +441,6 @@ cdef convert_jarray_to_python(JNIEnv *j_env, definition, jobject j_object):
 cdef jobject convert_python_to_jobject(JNIEnv *j_env, definition, obj) except *:
     cdef jobject retobject, retsubobject
     cdef jclass retclass
-    cdef jmethodID redmidinit
-    cdef jvalue j_ret[1]
     cdef JavaClass jc
     cdef JavaObject jo
     cdef JavaClassStorage jcs
@@ -336,21 +453,25 @@ cdef jobject convert_python_to_jobject(JNIEnv *j_env, definition, obj) except *:
         if obj is None:
             return NULL
         elif isinstance(obj, basestring) and jstringy_arg(definition):
-            return j_env[0].NewStringUTF(j_env, <char *><bytes>obj)
-        elif isinstance(obj, str) and PY_MAJOR_VERSION >= 3 and jstringy_arg(definition):
-            utf8 = obj.encode('utf-8')
-            return j_env[0].NewStringUTF(j_env, <char *><bytes>utf8)
+            return convert_pystring_to_java(j_env, obj)
+        elif isinstance(obj, bool) and definition in (
+                'Ljava/lang/Boolean;', 'Ljava/lang/Object;'):
+            return box_value(j_env, box_code_index['Z'], obj)
+        elif isinstance(obj, float) and definition in (
+                'Ljava/lang/Double;', 'Ljava/lang/Number;',
+                'Ljava/lang/Object;'):
+            return box_value(j_env, box_code_index['D'], obj)
         elif isinstance(obj, (int, long)) and \
                 definition in (
                     'Ljava/lang/Integer;',
                     'Ljava/lang/Number;',
                     'Ljava/lang/Long;',
                     'Ljava/lang/Object;'):
-            j_ret[0].i = obj
-            retclass = j_env[0].FindClass(j_env, 'java/lang/Integer')
-            retmidinit = j_env[0].GetMethodID(j_env, retclass, '<init>', '(I)V')
-            retobject = j_env[0].NewObjectA(j_env, retclass, retmidinit, j_ret)
-            return retobject
+            # a Long if asked, or if the value does not fit in an Integer
+            if definition == 'Ljava/lang/Long;' or \
+                    not -2147483648 <= obj <= 2147483647:
+                return box_value(j_env, box_code_index['J'], obj)
+            return box_value(j_env, box_code_index['I'], obj)
         elif isinstance(obj, type):
             jc = obj
             return jc.j_cls
@@ -371,7 +492,11 @@ cdef jobject convert_python_to_jobject(JNIEnv *j_env, definition, obj) except *:
             jc = pc.j_self
             # get the localref
             return jc.j_self.obj
-        elif isinstance(obj, (tuple, list)):
+        elif direct_buffer_of(obj) != NULL:
+            return direct_buffer_of(obj)
+        elif collection_accepts(definition[1:-1], obj):
+            return convert_pycollection_to_java(j_env, obj)
+        elif isinstance(obj, (tuple, list, PrimitiveArray, JavaObjectArray)):
             return convert_pyarray_to_java(j_env, definition, obj)
         else:
             raise JavaException('Invalid python object for this '
@@ -406,68 +531,39 @@ cdef jobject convert_python_to_jobject(JNIEnv *j_env, definition, obj) except *:
                     retsubobject)
         return retobject
 
-    elif definition == 'B':
-        retclass = j_env[0].FindClass(j_env, 'java/lang/Byte')
-        retmidinit = j_env[0].GetMethodID(j_env, retclass, '<init>', '(B)V')
-        j_ret[0].b = obj
-    elif definition == 'S':
-        retclass = j_env[0].FindClass(j_env, 'java/lang/Short')
-        retmidinit = j_env[0].GetMethodID(j_env, retclass, '<init>', '(S)V')
-        j_ret[0].s = obj
-    elif definition == 'I':
-        retclass = j_env[0].FindClass(j_env, 'java/lang/Integer')
-        retmidinit = j_env[0].GetMethodID(j_env, retclass, '<init>', '(I)V')
-        j_ret[0].i = int(obj)
-    elif definition == 'J':
-        retclass = j_env[0].FindClass(j_env, 'java/lang/Long')
-        retmidinit = j_env[0].GetMethodID(j_env, retclass, '<init>', '(J)V')
-        j_ret[0].j = obj
-    elif definition == 'F':
-        retclass = j_env[0].FindClass(j_env, 'java/lang/Float')
-        retmidinit = j_env[0].GetMethodID(j_env, retclass, '<init>', '(F)V')
-        j_ret[0].f = obj
-    elif definition == 'D':
-        retclass = j_env[0].FindClass(j_env, 'java/lang/Double')
-        retmidinit = j_env[0].GetMethodID(j_env, retclass, '<init>', '(D)V')
-        j_ret[0].d = obj
-    elif definition == 'C':
-        retclass = j_env[0].FindClass(j_env, 'java/lang/Char')
-        retmidinit = j_env[0].GetMethodID(j_env, retclass, '<init>', '(C)V')
-        j_ret[0].c = ord(obj)
-    elif definition == 'Z':
-        retclass = j_env[0].FindClass(j_env, 'java/lang/Boolean')
-        retmidinit = j_env[0].GetMethodID(j_env, retclass, '<init>', '(Z)V')
-        j_ret[0].z = 1 if obj else 0
+    elif definition in box_code_index:
+        return box_value(j_env, box_code_index[definition], obj)
     else:
         assert(0)
 
-    assert(retclass != NULL)
-    # XXX do we need a globalref or something ?
-    retobject = j_env[0].NewObjectA(j_env, retclass, retmidinit, j_ret)
-    return retobject
-
 
 cdef jobject convert_pyarray_to_java(JNIEnv *j_env, definition, pyarray) except *:
     cdef jobject ret = NULL
-    cdef int array_size = len(pyarray)
+    cdef int array_size
     cdef int i
-    cdef unsigned char c_tmp
-    cdef jboolean j_boolean
-    cdef jbyte j_byte
-    cdef jchar j_char
-    cdef jshort j_short
-    cdef jint j_int
-    cdef jlong j_long
-    cdef jfloat j_float
-    cdef jdouble j_double
     cdef jstring j_string
     cdef jclass j_class
     cdef JavaObject jo
     cdef JavaClass jc
 
-    cdef ByteArray a_bytes
-
-
+    if isinstance(pyarray, PrimitiveArray) and (
+            definition == 'Ljava/lang/Object;' or
+            definition == pyarray.definition):
+        # give the Java array of the view, with a new reference as the
+        # converted arrays
+        return j_env[0].NewLocalRef(
+                j_env, (<PrimitiveArray>pyarray).java_array())
+
+    if isinstance(pyarray, JavaObjectArray):
+        if definition == 'Ljava/lang/Object;' or \
+                definition == pyarray.definition:
+            # give the Java array of the whole view
+            ret = object_array_of(j_env, pyarray)
+            if ret != NULL:
+                return ret
+        pyarray = pyarray.tolist()
+
+    array_size = len(pyarray)
     if definition == 'Ljava/lang/Object;' and len(pyarray) > 0:
         # then the method will accept any array type as param
         # let's be as precise as we can
@@ -493,67 +589,8 @@ cdef jobject convert_pyarray_to_java(JNIEnv *j_env, definition, pyarray) except
                 definition = override
                 break
 
-    if definition == 'Z':
-        ret = j_env[0].NewBooleanArray(j_env, array_size)
-        for i in range(array_size):
-            j_boolean = 1 if pyarray[i] else 0
-            j_env[0].SetBooleanArrayRegion(j_env,
-                    ret, i, 1, &j_boolean)
-
-    elif definition == 'B':
-        ret = j_env[0].NewByteArray(j_env, array_size)
-        if isinstance(pyarray, ByteArray):
-            a_bytes = pyarray
-            j_env[0].SetByteArrayRegion(j_env,
-                ret, 0, array_size, <const_jbyte *>a_bytes._buf)
-        else:
-            for i in range(array_size):
-                c_tmp = pyarray[i]
-                j_byte = <signed char>c_tmp
-                j_env[0].SetByteArrayRegion(j_env,
-                        ret, i, 1, &j_byte)
-
-    elif definition == 'C':
-        ret = j_env[0].NewCharArray(j_env, array_size)
-        for i in range(array_size):
-            j_char = ord(pyarray[i])
-            j_env[0].SetCharArrayRegion(j_env,
-                    ret, i, 1, &j_char)
-
-    elif definition == 'S':
-        ret = j_env[0].NewShortArray(j_env, array_size)
-        for i in range(array_size):
-            j_short = pyarray[i]
-            j_env[0].SetShortArrayRegion(j_env,
-                    ret, i, 1, &j_short)
-
-    elif definition == 'I':
-        ret = j_env[0].NewIntArray(j_env, array_size)
-        for i in range(array_size):
-            j_int = pyarray[i]
-            j_env[0].SetIntArrayRegion(j_env,
-                    ret, i, 1, <const_jint *>&j_int)
-
-    elif definition == 'J':
-        ret = j_env[0].NewLongArray(j_env, array_size)
-        for i in range(array_size):
-            j_long = pyarray[i]
-            j_env[0].SetLongArrayRegion(j_env,
-                    ret, i, 1, &j_long)
-
-    elif definition == 'F':
-        ret = j_env[0].NewFloatArray(j_env, array_size)
-        for i in range(array_size):
-            j_float = pyarray[i]
-            j_env[0].SetFloatArrayRegion(j_env,
-                    ret, i, 1, &j_float)
-
-    elif definition == 'D':
-        ret = j_env[0].NewDoubleArray(j_env, array_size)
-        for i in range(array_size):
-            j_double = pyarray[i]
-            j_env[0].SetDoubleArrayRegion(j_env,
-                    ret, i, 1, &j_double)
+    if definition in ('Z', 'B', 'C', 'S', 'I', 'J', 'F', 'D'):
+        ret = convert_primitives_to_java(j_env, definition, pyarray)
 
     elif definition[0] == 'L':
         defstr = str_for_c(definition[1:-1])
@@ -569,19 +606,11 @@ cdef jobject convert_pyarray_to_java(JNIEnv *j_env, definition, pyarray) except
             if arg is None:
                 j_env[0].SetObjectArrayElement(
                         j_env, <jobjectArray>ret, i, NULL)
-            elif isinstance(arg, basestring) and PY_MAJOR_VERSION < 3 and \
-                    jstringy_arg(definition):
-                j_string = j_env[0].NewStringUTF(
-                        j_env, <bytes>arg)
-                j_env[0].SetObjectArrayElement(
-                        j_env, <jobjectArray>ret, i, j_string)
-            elif isinstance(arg, str) and PY_MAJOR_VERSION >= 3 and \
-                    jstringy_arg(definition):
-                utf8 = arg.encode('utf-8')
-                j_string = j_env[0].NewStringUTF(
-                        j_env, <bytes>utf8)
+            elif isinstance(arg, basestring) and jstringy_arg(definition):
+                j_string = convert_pystring_to_java(j_env, arg)
                 j_env[0].SetObjectArrayElement(
                         j_env, <jobjectArray>ret, i, j_string)
+                j_env[0].DeleteLocalRef(j_env, j_string)
             elif isinstance(arg, JavaClass):
                 jc = arg
                 check_assignable_from(j_env, jc, definition[1:-1])
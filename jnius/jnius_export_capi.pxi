@@ -0,0 +1,64 @@
+from cpython.pycapsule cimport PyCapsule_New
+
+
+cdef jclass capi_get_j_cls(object tp) except NULL:
+    cdef JavaClassStorage jcs = getattr(tp, '__cls_storage')
+    return jcs.j_cls
+
+
+cdef jobject capi_get_j_self(object obj) except NULL:
+    cdef JavaClass jc = obj
+    if jc.j_self is None:
+        raise JavaException('Cannot call instance method on a un-instanciated class')
+    return jc.j_self.obj
+
+
+cdef bytes capi_signature_codes(tuple definitions):
+    return signature_codes(definitions)
+
+
+cdef int capi_convert_arg(JNIEnv *j_env, tuple definition, const char *code,
+                          object arg, jvalue *j_arg) except -1:
+    cdef PyObject *argv[1]
+    argv[0] = <PyObject *>arg
+    populate_args(j_env, definition, <const unsigned char *>code, j_arg, argv)
+    return 0
+
+
+cdef int capi_release_arg(JNIEnv *j_env, tuple definition, const char *code,
+                          object arg, jvalue *j_arg) except -1:
+    cdef PyObject *argv[1]
+    argv[0] = <PyObject *>arg
+    release_args(j_env, definition, <const unsigned char *>code, j_arg, argv)
+    return 0
+
+
+cdef object capi_convert_result(JNIEnv *j_env, object definition,
+                                jobject j_object):
+    if j_object == NULL:
+        return None
+    try:
+        if definition[0] == '[':
+            return convert_jarray_to_python(j_env, definition[1:], j_object)
+        return convert_jobject_to_python(j_env, definition, j_object)
+    finally:
+        j_env[0].DeleteLocalRef(j_env, j_object)
+
+
+cdef int capi_check_exception(JNIEnv *j_env) except -1:
+    check_exception(j_env)
+    return 0
+
+
+cdef JniusCAPI jnius_capi
+jnius_capi.version = JNIUS_CAPI_VERSION
+jnius_capi.get_jnienv = get_jnienv
+jnius_capi.get_j_cls = capi_get_j_cls
+jnius_capi.get_j_self = capi_get_j_self
+jnius_capi.signature_codes = capi_signature_codes
+jnius_capi.convert_arg = capi_convert_arg
+jnius_capi.release_arg = capi_release_arg
+jnius_capi.convert_result = capi_convert_result
+jnius_capi.check_exception = capi_check_exception
+
+_C_API = PyCapsule_New(<void *>&jnius_capi, 'jnius.jnius._C_API', NULL)
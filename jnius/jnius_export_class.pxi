@@ -1,16 +1,30 @@
 class JavaException(Exception):
     '''Can be a real java exception, or just an exception from the wrapper.
+    The Java exceptions are raised as a subclass per Java class, see
+    exception_class().
     '''
     classname = None     # The classname of the exception
     innermessage = None  # The message of the inner exception
-    stacktrace = None    # The stack trace of the inner exception
+    step = None          # The index of the failing step of a batch
 
-    def __init__(self, message, classname=None, innermessage=None, stacktrace=None):
+    def __init__(self, message, classname=None, innermessage=None, stacktrace=None,
+                 throwable=None):
         self.classname = classname
         self.innermessage = innermessage
-        self.stacktrace = stacktrace
+        self._stacktrace = stacktrace
+        # global reference to the Java exception, for the stack trace
+        self.throwable = throwable
         Exception.__init__(self, message)
 
+    @property
+    def stacktrace(self):
+        '''The stack trace of the inner exception, read on first access.
+        '''
+        if self._stacktrace is None and self.throwable is not None:
+            self._stacktrace = exception_stacktrace(
+                get_jnienv(), (<LocalRef>self.throwable).obj)
+        return self._stacktrace
+
 
 cdef class JavaObject(object):
     '''Can contain any Java object. Used to store instance, or whatever.
@@ -24,9 +38,16 @@ cdef class JavaObject(object):
 
 cdef class JavaClassStorage:
     cdef jclass j_cls
+    # the constructors as (definition, args definition, varargs, args type
+    # codes), all of them, by number of arguments, and the one chosen for an
+    # overload_key()
+    cdef list constructors
+    cdef dict constructors_by_arity
+    cdef dict constructors_cache
 
     def __cinit__(self):
         self.j_cls = NULL
+        self.constructors = None
 
     def __dealloc__(self):
         cdef JNIEnv *j_env
@@ -49,6 +70,16 @@ class MetaJavaClass(type):
     def get_javaclass(name):
         return jclass_register.get(name)
 
+    @staticmethod
+    def add_member(tp, name, value):
+        # bind a JavaMethod, JavaMultipleMethod or JavaField created after the
+        # class itself (lazy classes of autoclass), and add it to the class
+        cdef JavaClassStorage jcs = getattr(tp, '__cls_storage')
+        resolve_member(get_jnienv(), jcs.j_cls, name, value,
+            tp.__javaclass__)
+        apply_release_gil(name, value, getattr(tp, '__release_gil__', None))
+        setattr(tp, name, value)
+
     @classmethod
     def resolve_class(meta, classDict):
         # search the Java class, and bind to our object
@@ -97,6 +128,7 @@ class MetaJavaClass(type):
             jcs.j_cls = j_env[0].FindClass(j_env,
                     <char *>class_name)
             if jcs.j_cls == NULL:
+                j_env[0].ExceptionClear(j_env)
                 raise JavaException('Unable to find the class'
                         ' {0}'.format(__javaclass__))
 
@@ -107,32 +139,66 @@ class MetaJavaClass(type):
 
         classDict['__cls_storage'] = jcs
 
-        # search all the static JavaMethod within our class, and resolve them
-        cdef JavaMethod jm
-        cdef JavaMultipleMethod jmm
+        # resolve all the members of our class once, the instances only
+        # hold their object reference
+        classname = classDict['__javaclass__']
+        policy = classDict.get('__release_gil__')
         for name, value in items_compat(classDict):
-            if isinstance(value, JavaMethod):
-                jm = value
-                if not jm.is_static:
-                    continue
-                jm.set_resolve_info(j_env, jcs.j_cls, None,
-                    str_for_c(name), str_for_c(__javaclass__))
-            elif isinstance(value, JavaMultipleMethod):
-                jmm = value
-                jmm.set_resolve_info(j_env, jcs.j_cls, None,
-                    str_for_c(name), str_for_c(__javaclass__))
-
+            resolve_member(j_env, jcs.j_cls, name, value, classname)
+            apply_release_gil(name, value, policy)
 
-        # search all the static JavaField within our class, and resolve them
-        cdef JavaField jf
-        for name, value in items_compat(classDict):
-            if not isinstance(value, JavaField):
-                continue
-            jf = value
-            if not jf.is_static:
-                continue
-            jf.set_resolve_info(j_env, jcs.j_cls,
-                str_for_c(name), str_for_c(__javaclass__))
+    @staticmethod
+    def set_release_gil(tp, policy):
+        # set the GIL policy of the class, see apply_release_gil()
+        tp.__release_gil__ = policy
+        for name, value in items_compat(dict(tp.__dict__)):
+            apply_release_gil(name, value, policy)
+
+
+cdef void resolve_member(JNIEnv *j_env, jclass j_cls, name, value,
+        classname) except *:
+    # bind a member of a Java class to the class, if it is one of ours
+    cdef JavaMethod jm
+    cdef JavaMultipleMethod jmm
+    cdef JavaField jf
+    if isinstance(value, JavaMethod):
+        jm = value
+        jm.set_resolve_info(j_env, j_cls, str_for_c(name),
+            str_for_c(classname))
+    elif isinstance(value, JavaMultipleMethod):
+        jmm = value
+        jmm.set_resolve_info(j_env, j_cls, str_for_c(name),
+            str_for_c(classname))
+    elif isinstance(value, JavaField):
+        jf = value
+        if jf.is_static:
+            jf.set_resolve_info(j_env, j_cls, str_for_c(name),
+                str_for_c(classname))
+        else:
+            jf.set_resolve_info(j_env, j_cls, name, classname)
+
+
+cdef void apply_release_gil(name, value, policy) except *:
+    # the __release_gil__ policy of a class tells which of its methods release
+    # the GIL during their calls: all of them (True, the default), none
+    # (False), or the ones named in a collection. A release_gil given to the
+    # method itself has precedence.
+    cdef JavaMethod jm
+    cdef JavaMultipleMethod jmm
+    if policy is None:
+        return
+    if policy is True or policy is False:
+        release_gil = policy
+    else:
+        release_gil = name in policy
+    if isinstance(value, JavaMethod):
+        jm = value
+        if not jm.release_gil_set:
+            jm.release_gil = release_gil
+    elif isinstance(value, JavaMultipleMethod):
+        jmm = value
+        if not jmm.release_gil_set:
+            jmm.set_release_gil(release_gil)
 
 
 cdef class JavaClass(object):
@@ -155,22 +221,12 @@ cdef class JavaClass(object):
 
         if 'noinstance' not in kwargs:
             self.call_constructor(args)
-            self.resolve_methods()
-            self.resolve_fields()
 
     cdef void instanciate_from(self, LocalRef j_self) except *:
+        # the members are resolved by the class, see MetaJavaClass
         self.j_self = j_self
-        self.resolve_methods()
-        self.resolve_fields()
-
-    cdef void call_constructor(self, args) except *:
-        # the goal is to find the class constructor, and call it with the
-        # correct arguments.
-        cdef jvalue *j_args = NULL
-        cdef jobject j_self = NULL
-        cdef jmethodID constructor = NULL
-        cdef JNIEnv *j_env = get_jnienv()
 
+    cdef void parse_constructors(self, JavaClassStorage jcs) except *:
         # get the constructor definition if exist
         definitions = [('()V', False)]
         if hasattr(self, '__javaconstructor__'):
@@ -181,42 +237,78 @@ cdef class JavaClass(object):
         if len(definitions) == 0:
             raise JavaException('No constructor available')
 
-        elif len(definitions) == 1:
-            definition, is_varargs = definitions[0]
+        constructors = []
+        by_arity = {}
+        for definition, is_varargs in definitions:
             d_ret, d_args = parse_definition(definition)
-
-            if is_varargs:
-                args_ = args[:len(d_args) - 1] + (args[len(d_args) - 1:],)
-            else:
-                args_ = args
-            if len(args or ()) != len(d_args or ()):
+            constructor = (definition, d_args, is_varargs,
+                           signature_codes(d_args))
+            constructors.append(constructor)
+            by_arity.setdefault(len(d_args), []).append(constructor)
+        jcs.constructors_by_arity = by_arity
+        jcs.constructors_cache = {}
+        jcs.constructors = constructors
+
+    cdef tuple select_constructor(self, JavaClassStorage jcs, tuple args):
+        # the (definition, args definition, varargs, codes) of the
+        # constructor matching the arguments
+        if jcs.constructors is None:
+            self.parse_constructors(jcs)
+        constructors = jcs.constructors
+
+        if len(constructors) == 1:
+            entry = constructors[0]
+            if len(args) != len(entry[1]):
                 raise JavaException('Invalid call, number of argument'
                         ' mismatch for constructor')
-        else:
-            scores = []
-            for definition, is_varargs in definitions:
-                d_ret, d_args = parse_definition(definition)
-                if is_varargs:
-                    args_ = args[:len(d_args) - 1] + (args[len(d_args) - 1:],)
-                else:
-                    args_ = args
-
-                score = calculate_score(d_args, args)
+            return entry
+
+        key = overload_key(PySequence_Fast_ITEMS(args), len(args))
+        entry = jcs.constructors_cache.get(key)
+        if entry is None:
+            best_score = -1
+            for candidate in jcs.constructors_by_arity.get(len(args), ()):
+                score = calculate_score(candidate[1], args)
                 if score == -1:
                     continue
-                scores.append((score, definition, d_ret, d_args, args_))
-            if not scores:
+                if entry is None or (score, candidate[0]) > \
+                        (best_score, entry[0]):
+                    best_score, entry = score, candidate
+            if entry is None:
                 raise JavaException('No constructor matching your arguments')
-            scores.sort()
-            score, definition, d_ret, d_args, args_ = scores[-1]
+            if key is not None:
+                jcs.constructors_cache[key] = entry
+        return entry
+
+    cdef void call_constructor(self, tuple args) except *:
+        # the goal is to find the class constructor, and call it with the
+        # correct arguments.
+        cdef JavaClassStorage jcs = self.__cls_storage
+        cdef bytes codes
+        cdef jvalue stack_args[MAX_STACK_ARGS]
+        cdef jvalue *j_args = stack_args
+        cdef ArgsBuffer buf = None
+        cdef jobject j_self = NULL
+        cdef jmethodID constructor = NULL
+        cdef JNIEnv *j_env = get_jnienv()
+
+        definition, d_args, is_varargs, codes = \
+                self.select_constructor(jcs, args)
+
+        if is_varargs:
+            args_ = args[:len(d_args) - 1] + (args[len(d_args) - 1:],)
+        else:
+            args_ = args
+
+        if len(d_args) > MAX_STACK_ARGS:
+            buf = get_args_buffer()
+            j_args = buf.acquire(len(d_args))
 
         try:
             # convert python arguments to java arguments
             if len(args):
-                j_args = <jvalue *>malloc(sizeof(jvalue) * len(d_args))
-                if j_args == NULL:
-                    raise MemoryError('Unable to allocate memory for java args')
-                populate_args(j_env, d_args, j_args, args_)
+                populate_args(j_env, d_args, codes, j_args,
+                        PySequence_Fast_ITEMS(args_))
 
             # get the java constructor
             defstr = str_for_c(definition)
@@ -231,7 +323,8 @@ cdef class JavaClass(object):
                     constructor, j_args)
 
             # release our arguments
-            release_args(j_env, d_args, j_args, args_)
+            release_args(j_env, d_args, codes, j_args,
+                    PySequence_Fast_ITEMS(args_))
 
             check_exception(j_env)
             if j_self == NULL:
@@ -241,38 +334,8 @@ cdef class JavaClass(object):
             self.j_self = create_local_ref(j_env, j_self)
             j_env[0].DeleteLocalRef(j_env, j_self)
         finally:
-            if j_args != NULL:
-                free(j_args)
-
-    cdef void resolve_methods(self) except *:
-        # search all the JavaMethod within our class, and resolve them
-        cdef JavaMethod jm
-        cdef JavaMultipleMethod jmm
-        cdef JNIEnv *j_env = get_jnienv()
-        for name, value in items_compat(self.__class__.__dict__):
-            if isinstance(value, JavaMethod):
-                jm = value
-                if jm.is_static:
-                    continue
-                jm.set_resolve_info(j_env, self.j_cls, self.j_self,
-                    str_for_c(name), str_for_c(self.__javaclass__))
-            elif isinstance(value, JavaMultipleMethod):
-                jmm = value
-                jmm.set_resolve_info(j_env, self.j_cls, self.j_self,
-                    str_for_c(name), str_for_c(self.__javaclass__))
-
-    cdef void resolve_fields(self) except *:
-        # search all the JavaField within our class, and resolve them
-        cdef JavaField jf
-        cdef JNIEnv *j_env = get_jnienv()
-        for name, value in items_compat(self.__class__.__dict__):
-            if not isinstance(value, JavaField):
-                continue
-            jf = value
-            if jf.is_static:
-                continue
-            jf.set_resolve_info(j_env, self.j_cls,
-                name, self.__javaclass__)
+            if buf is not None:
+                buf.release()
 
     def __repr__(self):
         return '<{0} at 0x{1:x} jclass={2} jself={3}>'.format(
@@ -290,6 +353,7 @@ cdef class JavaField(object):
     cdef name
     cdef classname
     cdef definition
+    cdef int code
 
     def __cinit__(self, definition, **kwargs):
         self.j_field = NULL
@@ -298,6 +362,7 @@ cdef class JavaField(object):
     def __init__(self, definition, **kwargs):
         super(JavaField, self).__init__()
         self.definition = definition
+        self.code = signature_code(definition)
         self.is_static = kwargs.get('static', False)
 
     cdef void set_resolve_info(self, JNIEnv *j_env, jclass j_cls,
@@ -359,34 +424,34 @@ cdef class JavaField(object):
         cdef JNIEnv *j_env = get_jnienv()
 
         # type of the java field
-        r = self.definition[0]
+        cdef int r = self.code
 
         # set the java field; implemented only for primitive types
-        if r == 'Z':
+        if r == JT_BOOLEAN:
             j_boolean = <jboolean>value
             j_env[0].SetBooleanField(j_env, j_self, self.j_field, j_boolean)
-        elif r == 'B':
+        elif r == JT_BYTE:
             j_byte = <jbyte>value
             j_env[0].SetByteField(j_env, j_self, self.j_field, j_byte)
-        elif r == 'C':
+        elif r == JT_CHAR:
             j_char = <jchar>value
             j_env[0].SetCharField(j_env, j_self, self.j_field, j_char)
-        elif r == 'S':
+        elif r == JT_SHORT:
             j_short = <jshort>value
             j_env[0].SetShortField(j_env, j_self, self.j_field, j_short)
-        elif r == 'I':
+        elif r == JT_INT:
             j_int = <jint>value
             j_env[0].SetIntField(j_env, j_self, self.j_field, j_int)
-        elif r == 'J':
+        elif r == JT_LONG:
             j_long = <jlong>value
             j_env[0].SetLongField(j_env, j_self, self.j_field, j_long)
-        elif r == 'F':
+        elif r == JT_FLOAT:
             j_float = <jfloat>value
             j_env[0].SetFloatField(j_env, j_self, self.j_field, j_float)
-        elif r == 'D':
+        elif r == JT_DOUBLE:
             j_double = <jdouble>value
             j_env[0].SetDoubleField(j_env, j_self, self.j_field, j_double)
-        elif r == 'L':
+        elif r == JT_STRINGY or r == JT_OBJECT:
             j_object = <jobject>convert_python_to_jobject(j_env, self.definition, value)
             j_env[0].SetObjectField(j_env, j_self, self.j_field, j_object)
             j_env[0].DeleteLocalRef(j_env, j_object)
@@ -412,43 +477,43 @@ cdef class JavaField(object):
         cdef JavaClass ret_jc
         cdef JNIEnv *j_env = get_jnienv()
 
-        # return type of the java method
-        r = self.definition[0]
+        # type of the java field
+        cdef int r = self.code
 
         # now call the java method
-        if r == 'Z':
+        if r == JT_BOOLEAN:
             j_boolean = j_env[0].GetBooleanField(
                     j_env, j_self, self.j_field)
             ret = True if j_boolean else False
-        elif r == 'B':
+        elif r == JT_BYTE:
             j_byte = j_env[0].GetByteField(
                     j_env, j_self, self.j_field)
             ret = <char>j_byte
-        elif r == 'C':
+        elif r == JT_CHAR:
             j_char = j_env[0].GetCharField(
                     j_env, j_self, self.j_field)
             ret = chr(<char>j_char)
-        elif r == 'S':
+        elif r == JT_SHORT:
             j_short = j_env[0].GetShortField(
                     j_env, j_self, self.j_field)
             ret = <short>j_short
-        elif r == 'I':
+        elif r == JT_INT:
             j_int = j_env[0].GetIntField(
                     j_env, j_self, self.j_field)
             ret = <int>j_int
-        elif r == 'J':
+        elif r == JT_LONG:
             j_long = j_env[0].GetLongField(
                     j_env, j_self, self.j_field)
             ret = <long long>j_long
-        elif r == 'F':
+        elif r == JT_FLOAT:
             j_float = j_env[0].GetFloatField(
                     j_env, j_self, self.j_field)
             ret = <float>j_float
-        elif r == 'D':
+        elif r == JT_DOUBLE:
             j_double = j_env[0].GetDoubleField(
                     j_env, j_self, self.j_field)
             ret = <double>j_double
-        elif r == 'L':
+        elif r == JT_STRINGY or r == JT_OBJECT:
             j_object = j_env[0].GetObjectField(
                     j_env, j_self, self.j_field)
             check_exception(j_env)
@@ -456,13 +521,13 @@ cdef class JavaField(object):
                 ret = convert_jobject_to_python(
                         j_env, self.definition, j_object)
                 j_env[0].DeleteLocalRef(j_env, j_object)
-        elif r == '[':
-            r = self.definition[1:]
+        elif r == JT_ARRAY:
             j_object = j_env[0].GetObjectField(
                     j_env, j_self, self.j_field)
             check_exception(j_env)
             if j_object != NULL:
-                ret = convert_jarray_to_python(j_env, r, j_object)
+                ret = convert_jarray_to_python(
+                        j_env, self.definition[1:], j_object)
                 j_env[0].DeleteLocalRef(j_env, j_object)
         else:
             raise Exception('Invalid field definition')
@@ -483,43 +548,43 @@ cdef class JavaField(object):
         cdef object ret = None
         cdef JNIEnv *j_env = get_jnienv()
 
-        # return type of the java method
-        r = self.definition[0]
+        # type of the java field
+        cdef int r = self.code
 
         # now call the java method
-        if r == 'Z':
+        if r == JT_BOOLEAN:
             j_boolean = j_env[0].GetStaticBooleanField(
                     j_env, self.j_cls, self.j_field)
             ret = True if j_boolean else False
-        elif r == 'B':
+        elif r == JT_BYTE:
             j_byte = j_env[0].GetStaticByteField(
                     j_env, self.j_cls, self.j_field)
             ret = <char>j_byte
-        elif r == 'C':
+        elif r == JT_CHAR:
             j_char = j_env[0].GetStaticCharField(
                     j_env, self.j_cls, self.j_field)
             ret = chr(<char>j_char)
-        elif r == 'S':
+        elif r == JT_SHORT:
             j_short = j_env[0].GetStaticShortField(
                     j_env, self.j_cls, self.j_field)
             ret = <short>j_short
-        elif r == 'I':
+        elif r == JT_INT:
             j_int = j_env[0].GetStaticIntField(
                     j_env, self.j_cls, self.j_field)
             ret = <int>j_int
-        elif r == 'J':
+        elif r == JT_LONG:
             j_long = j_env[0].GetStaticLongField(
                     j_env, self.j_cls, self.j_field)
             ret = <long long>j_long
-        elif r == 'F':
+        elif r == JT_FLOAT:
             j_float = j_env[0].GetStaticFloatField(
                     j_env, self.j_cls, self.j_field)
             ret = <float>j_float
-        elif r == 'D':
+        elif r == JT_DOUBLE:
             j_double = j_env[0].GetStaticDoubleField(
                     j_env, self.j_cls, self.j_field)
             ret = <double>j_double
-        elif r == 'L':
+        elif r == JT_STRINGY or r == JT_OBJECT:
             j_object = j_env[0].GetStaticObjectField(
                     j_env, self.j_cls, self.j_field)
             check_exception(j_env)
@@ -527,13 +592,13 @@ cdef class JavaField(object):
                 ret = convert_jobject_to_python(
                         j_env, self.definition, j_object)
                 j_env[0].DeleteLocalRef(j_env, j_object)
-        elif r == '[':
-            r = self.definition[1:]
+        elif r == JT_ARRAY:
             j_object = j_env[0].GetStaticObjectField(
                     j_env, self.j_cls, self.j_field)
             check_exception(j_env)
             if j_object != NULL:
-                ret = convert_jarray_to_python(j_env, r, j_object)
+                ret = convert_jarray_to_python(
+                        j_env, self.definition[1:], j_object)
                 j_env[0].DeleteLocalRef(j_env, j_object)
         else:
             raise Exception('Invalid field definition')
@@ -547,7 +612,6 @@ cdef class JavaMethod(object):
     '''
     cdef jmethodID j_method
     cdef jclass j_cls
-    cdef LocalRef j_self
     cdef name
     cdef classname
     cdef definition
@@ -555,19 +619,32 @@ cdef class JavaMethod(object):
     cdef bint is_varargs
     cdef object definition_return
     cdef object definition_args
+    # whether the calls release the GIL, and if it was given to __init__,
+    # over the policy of the class
+    cdef readonly bint release_gil
+    cdef bint release_gil_set
+    # type codes of the arguments and of the return value
+    cdef bytes args_codes
+    cdef int return_code
+    # PEP 590 entry point, see jnius_vectorcall.pxi
+    cdef void *vectorcall
 
     def __cinit__(self, definition, **kwargs):
         self.j_method = NULL
         self.j_cls = NULL
-        self.j_self = None
+        self.vectorcall = <void *>method_vectorcall
 
     def __init__(self, definition, **kwargs):
         super(JavaMethod, self).__init__()
         self.definition = definition
         self.definition_return, self.definition_args = \
                 parse_definition(definition)
+        self.args_codes = signature_codes(self.definition_args)
+        self.return_code = signature_code(self.definition_return)
         self.is_static = kwargs.get('static', False)
         self.is_varargs = kwargs.get('varargs', False)
+        self.release_gil_set = 'release_gil' in kwargs
+        self.release_gil = kwargs.get('release_gil', True)
 
     cdef void ensure_method(self) except *:
         if self.j_method != NULL:
@@ -591,300 +668,408 @@ cdef class JavaMethod(object):
                     ' {0}({1})'.format(self.name, self.definition))
 
     cdef void set_resolve_info(self, JNIEnv *j_env, jclass j_cls,
-            LocalRef j_self, name, classname):
+            name, classname):
+        # the instance is given to each call, by the JavaBoundMethod returned
+        # from __get__
         self.name = name
         self.classname = classname
         self.j_cls = j_cls
-        self.j_self = j_self
 
     def __get__(self, obj, objtype):
-        if obj is None:
+        if obj is None or self.is_static:
             return self
-        # XXX FIXME we MUST not change our own j_self, but return a "bound"
-        # method here, as python does!
-        cdef JavaClass jc = obj
-        self.j_self = jc.j_self
-        return self
+        return bind_method(self, (<JavaClass?>obj).j_self)
 
     def __call__(self, *args):
+        return self.call(None, PySequence_Fast_ITEMS(args), len(args))
+
+    def map(self, iterable):
+        '''Calls the method with each argument of `iterable`, and returns the
+        list of the results.
+        '''
+        return self.batch(None, iterable, False)
+
+    def starmap(self, iterable):
+        '''Calls the method with each tuple of arguments of `iterable`, and
+        returns the list of the results.
+        '''
+        return self.batch(None, iterable, True)
+
+    cdef list batch(self, LocalRef j_self, iterable, bint star):
+        # the calls are done by chunks: the arguments of the chunk are
+        # converted, then the calls done (without the GIL if the method
+        # releases it), and their results converted back. A chunk holds at
+        # most BATCH_SIZE local references, for its arguments and results
+        cdef list results = []
+        cdef list chunk
+        cdef tuple args
+        cdef int size = max(1, BATCH_SIZE // (len(self.definition_args) + 1))
+
+        if self.is_varargs:
+            for item in iterable:
+                args = tuple(item) if star else (item, )
+                results.append(self.call(
+                    j_self, PySequence_Fast_ITEMS(args), len(args)))
+            return results
+
+        if not self.is_static and j_self is None:
+            raise JavaException('Cannot call instance method on a un-instanciated class')
+        self.ensure_method()
+
+        it = iter(iterable)
+        while True:
+            chunk = list(islice(it, size))
+            if not chunk:
+                return results
+            self.call_chunk(j_self, chunk, star, results)
+
+    cdef void call_chunk(self, LocalRef j_self, list chunk, bint star,
+            list results) except *:
+        cdef tuple d_args = self.definition_args
+        cdef int nargs = len(d_args)
+        cdef int count = len(chunk)
+        cdef int index, done = 0, converted = 0
+        cdef list arg_tuples = []
+        cdef tuple args
+        cdef JNIEnv *j_env = get_jnienv()
+        cdef jobject j_obj = NULL if j_self is None else j_self.obj
+        cdef bint is_static = self.is_static
+        cdef jvalue *j_args = <jvalue *>malloc(
+                sizeof(jvalue) * (count * nargs + 1))
+        cdef jvalue *j_rets = <jvalue *>malloc(sizeof(jvalue) * count)
+
+        try:
+            if j_args == NULL or j_rets == NULL:
+                raise MemoryError('Unable to allocate memory for java args')
+            if j_env[0].EnsureLocalCapacity(j_env, count * (nargs + 1)) != 0:
+                check_exception(j_env)
+                raise MemoryError('Unable to reserve the local references')
+            for index in range(count):
+                item = chunk[index]
+                args = tuple(item) if star else (item, )
+                if len(args) != nargs:
+                    raise JavaException('Invalid call, number of argument mismatch')
+                populate_args(j_env, d_args, self.args_codes,
+                        j_args + index * nargs, PySequence_Fast_ITEMS(args))
+                arg_tuples.append(args)
+
+            if self.release_gil:
+                with nogil:
+                    done = call_many(j_env, j_obj, self.j_cls, self.j_method,
+                            is_static, self.return_code, j_args, nargs,
+                            count, j_rets)
+            else:
+                done = call_many(j_env, j_obj, self.j_cls, self.j_method,
+                        is_static, self.return_code, j_args, nargs,
+                        count, j_rets)
+
+            if done < count:
+                # a call raised: drop the results of the chunk, and raise the
+                # Java exception before any other JNI call
+                if self.return_code in (JT_STRINGY, JT_OBJECT, JT_ARRAY):
+                    for index in range(done):
+                        j_env[0].DeleteLocalRef(j_env, j_rets[index].l)
+                converted = done
+                check_exception(j_env)
+
+            # each conversion deletes the local reference of its result, the
+            # ones left if a conversion raises are deleted below
+            while converted < done:
+                converted += 1
+                results.append(convert_jvalue_to_python(
+                    j_env, self.return_code, self.definition_return,
+                    &j_rets[converted - 1]))
+        finally:
+            if self.return_code in (JT_STRINGY, JT_OBJECT, JT_ARRAY):
+                for index in range(converted, done):
+                    j_env[0].DeleteLocalRef(j_env, j_rets[index].l)
+            for index in range(len(arg_tuples)):
+                release_args(j_env, d_args, self.args_codes,
+                        j_args + index * nargs,
+                        PySequence_Fast_ITEMS(arg_tuples[index]))
+            free(j_args)
+            free(j_rets)
+
+    cdef call(self, LocalRef j_self, PyObject **argv, Py_ssize_t nargs):
         # argument array to pass to the method
-        cdef jvalue *j_args = NULL
+        cdef jvalue stack_args[MAX_STACK_ARGS]
+        cdef jvalue *j_args = stack_args
+        cdef ArgsBuffer buf = None
         cdef tuple d_args = self.definition_args
+        cdef tuple args
         cdef JNIEnv *j_env = get_jnienv()
 
         if self.is_varargs:
+            # the extra arguments are given to Java as an array
+            args = argv_tuple(argv, nargs)
             args = args[:len(d_args) - 1] + (args[len(d_args) - 1:],)
+            argv = PySequence_Fast_ITEMS(args)
+            nargs = len(args)
 
-        if len(args) != len(d_args):
+        if nargs != len(d_args):
             raise JavaException('Invalid call, number of argument mismatch')
 
-        if not self.is_static and j_env == NULL:
+        if not self.is_static and j_self is None:
             raise JavaException('Cannot call instance method on a un-instanciated class')
 
         self.ensure_method()
 
+        if len(d_args) > MAX_STACK_ARGS:
+            buf = get_args_buffer()
+            j_args = buf.acquire(len(d_args))
+
         try:
             # convert python argument if necessary
-            if len(args):
-                j_args = <jvalue *>malloc(sizeof(jvalue) * len(d_args))
-                if j_args == NULL:
-                    raise MemoryError('Unable to allocate memory for java args')
-                populate_args(j_env, self.definition_args, j_args, args)
+            if nargs:
+                populate_args(j_env, self.definition_args, self.args_codes,
+                        j_args, argv)
 
             try:
                 # do the call
                 if self.is_static:
-                    return self.call_staticmethod(j_env, j_args)
-                return self.call_method(j_env, j_args)
+                    return self.call_jni(j_env, NULL, j_args)
+                return self.call_jni(j_env, j_self.obj, j_args)
             finally:
-                release_args(j_env, self.definition_args, j_args, args)
+                release_args(j_env, self.definition_args, self.args_codes,
+                        j_args, argv)
 
         finally:
-            if j_args != NULL:
-                free(j_args)
+            if buf is not None:
+                buf.release()
 
-    cdef call_method(self, JNIEnv *j_env, jvalue *j_args):
-        cdef jboolean j_boolean
-        cdef jbyte j_byte
-        cdef jchar j_char
-        cdef jshort j_short
-        cdef jint j_int
-        cdef jlong j_long
-        cdef jfloat j_float
-        cdef jdouble j_double
-        cdef jobject j_object
-        cdef char *c_str
-        cdef bytes py_str
-        cdef object ret = None
-        cdef JavaObject ret_jobject
-        cdef JavaClass ret_jc
-        cdef jobject j_self = self.j_self.obj
+    cdef call_jni(self, JNIEnv *j_env, jobject j_self, jvalue *j_args):
+        # do the call, with or without the GIL, and convert its result
+        cdef jvalue j_ret
+        cdef int r = self.return_code
+        cdef bint is_static = self.is_static
 
-        # return type of the java method
-        r = self.definition_return[0]
+        if r == JT_INVALID:
+            raise Exception('Invalid return definition?')
 
-        # now call the java method
-        if r == 'V':
-            with nogil:
-                j_env[0].CallVoidMethodA(
-                        j_env, j_self, self.j_method, j_args)
-        elif r == 'Z':
-            with nogil:
-                j_boolean = j_env[0].CallBooleanMethodA(
-                        j_env, j_self, self.j_method, j_args)
-            ret = True if j_boolean else False
-        elif r == 'B':
-            with nogil:
-                j_byte = j_env[0].CallByteMethodA(
-                        j_env, j_self, self.j_method, j_args)
-            ret = <char>j_byte
-        elif r == 'C':
-            with nogil:
-                j_char = j_env[0].CallCharMethodA(
-                        j_env, j_self, self.j_method, j_args)
-            ret = chr(<char>j_char)
-        elif r == 'S':
-            with nogil:
-                j_short = j_env[0].CallShortMethodA(
-                        j_env, j_self, self.j_method, j_args)
-            ret = <short>j_short
-        elif r == 'I':
-            with nogil:
-                j_int = j_env[0].CallIntMethodA(
-                        j_env, j_self, self.j_method, j_args)
-            ret = <int>j_int
-        elif r == 'J':
-            with nogil:
-                j_long = j_env[0].CallLongMethodA(
-                        j_env, j_self, self.j_method, j_args)
-            ret = <long long>j_long
-        elif r == 'F':
-            with nogil:
-                j_float = j_env[0].CallFloatMethodA(
-                        j_env, j_self, self.j_method, j_args)
-            ret = <float>j_float
-        elif r == 'D':
-            with nogil:
-                j_double = j_env[0].CallDoubleMethodA(
-                        j_env, j_self, self.j_method, j_args)
-            ret = <double>j_double
-        elif r == 'L':
+        j_ret.j = 0
+        if self.release_gil:
             with nogil:
-                j_object = j_env[0].CallObjectMethodA(
-                        j_env, j_self, self.j_method, j_args)
-            check_exception(j_env)
-            if j_object != NULL:
-                ret = convert_jobject_to_python(
-                        j_env, self.definition_return, j_object)
-                j_env[0].DeleteLocalRef(j_env, j_object)
-        elif r == '[':
-            r = self.definition_return[1:]
-            with nogil:
-                j_object = j_env[0].CallObjectMethodA(
-                        j_env, j_self, self.j_method, j_args)
-            check_exception(j_env)
-            if j_object != NULL:
-                ret = convert_jarray_to_python(j_env, r, j_object)
-                j_env[0].DeleteLocalRef(j_env, j_object)
+                call_many(j_env, j_self, self.j_cls, self.j_method, is_static,
+                        r, j_args, 0, 1, &j_ret)
         else:
-            raise Exception('Invalid return definition?')
-
-        check_exception(j_env)
-        return ret
-
-    cdef call_staticmethod(self, JNIEnv *j_env, jvalue *j_args):
-        cdef jboolean j_boolean
-        cdef jbyte j_byte
-        cdef jchar j_char
-        cdef jshort j_short
-        cdef jint j_int
-        cdef jlong j_long
-        cdef jfloat j_float
-        cdef jdouble j_double
-        cdef jobject j_object
-        cdef char *c_str
-        cdef bytes py_str
-        cdef object ret = None
-        cdef JavaObject ret_jobject
-        cdef JavaClass ret_jc
-
-        # return type of the java method
-        r = self.definition_return[0]
+            call_many(j_env, j_self, self.j_cls, self.j_method, is_static,
+                    r, j_args, 0, 1, &j_ret)
 
-        # now call the java method
-        if r == 'V':
-            with nogil:
-                j_env[0].CallStaticVoidMethodA(
-                        j_env, self.j_cls, self.j_method, j_args)
-        elif r == 'Z':
-            with nogil:
-                j_boolean = j_env[0].CallStaticBooleanMethodA(
-                        j_env, self.j_cls, self.j_method, j_args)
-            ret = True if j_boolean else False
-        elif r == 'B':
-            with nogil:
-                j_byte = j_env[0].CallStaticByteMethodA(
-                        j_env, self.j_cls, self.j_method, j_args)
-            ret = <char>j_byte
-        elif r == 'C':
-            with nogil:
-                j_char = j_env[0].CallStaticCharMethodA(
-                        j_env, self.j_cls, self.j_method, j_args)
-            ret = chr(<char>j_char)
-        elif r == 'S':
-            with nogil:
-                j_short = j_env[0].CallStaticShortMethodA(
-                        j_env, self.j_cls, self.j_method, j_args)
-            ret = <short>j_short
-        elif r == 'I':
-            with nogil:
-                j_int = j_env[0].CallStaticIntMethodA(
-                        j_env, self.j_cls, self.j_method, j_args)
-            ret = <int>j_int
-        elif r == 'J':
-            with nogil:
-                j_long = j_env[0].CallStaticLongMethodA(
-                        j_env, self.j_cls, self.j_method, j_args)
-            ret = <long long>j_long
-        elif r == 'F':
-            with nogil:
-                j_float = j_env[0].CallStaticFloatMethodA(
-                        j_env, self.j_cls, self.j_method, j_args)
-            ret = <float>j_float
-        elif r == 'D':
-            with nogil:
-                j_double = j_env[0].CallStaticDoubleMethodA(
-                        j_env, self.j_cls, self.j_method, j_args)
-            ret = <double>j_double
-        elif r == 'L':
-            with nogil:
-                j_object = j_env[0].CallStaticObjectMethodA(
-                        j_env, self.j_cls, self.j_method, j_args)
-            check_exception(j_env)
-            if j_object != NULL:
-                ret = convert_jobject_to_python(
-                        j_env, self.definition_return, j_object)
-                j_env[0].DeleteLocalRef(j_env, j_object)
-        elif r == '[':
-            r = self.definition_return[1:]
-            with nogil:
-                j_object = j_env[0].CallStaticObjectMethodA(
-                        j_env, self.j_cls, self.j_method, j_args)
+        if j_env[0].ExceptionCheck(j_env):
+            if r == JT_STRINGY or r == JT_OBJECT or r == JT_ARRAY:
+                j_env[0].DeleteLocalRef(j_env, j_ret.l)
             check_exception(j_env)
-            if j_object != NULL:
-                ret = convert_jarray_to_python(j_env, r, j_object)
-                j_env[0].DeleteLocalRef(j_env, j_object)
+        return convert_jvalue_to_python(
+                j_env, r, self.definition_return, &j_ret)
+
+
+cdef int call_many(JNIEnv *j_env, jobject j_self, jclass j_cls,
+        jmethodID j_method, bint is_static, int r, jvalue *j_args, int nargs,
+        int count, jvalue *j_rets) nogil:
+    # calls the method `count` times, with the arguments j_args[i * nargs:]
+    # and the result in j_rets[i]. Stops on the first Java exception, and
+    # returns the number of calls that succeeded
+    cdef int index
+    cdef jvalue *args
+    for index in range(count):
+        args = j_args + index * nargs
+        if is_static:
+            if r == JT_VOID:
+                j_env[0].CallStaticVoidMethodA(j_env, j_cls, j_method, args)
+            elif r == JT_BOOLEAN:
+                j_rets[index].z = j_env[0].CallStaticBooleanMethodA(
+                        j_env, j_cls, j_method, args)
+            elif r == JT_BYTE:
+                j_rets[index].b = j_env[0].CallStaticByteMethodA(
+                        j_env, j_cls, j_method, args)
+            elif r == JT_CHAR:
+                j_rets[index].c = j_env[0].CallStaticCharMethodA(
+                        j_env, j_cls, j_method, args)
+            elif r == JT_SHORT:
+                j_rets[index].s = j_env[0].CallStaticShortMethodA(
+                        j_env, j_cls, j_method, args)
+            elif r == JT_INT:
+                j_rets[index].i = j_env[0].CallStaticIntMethodA(
+                        j_env, j_cls, j_method, args)
+            elif r == JT_LONG:
+                j_rets[index].j = j_env[0].CallStaticLongMethodA(
+                        j_env, j_cls, j_method, args)
+            elif r == JT_FLOAT:
+                j_rets[index].f = j_env[0].CallStaticFloatMethodA(
+                        j_env, j_cls, j_method, args)
+            elif r == JT_DOUBLE:
+                j_rets[index].d = j_env[0].CallStaticDoubleMethodA(
+                        j_env, j_cls, j_method, args)
+            else:
+                j_rets[index].l = j_env[0].CallStaticObjectMethodA(
+                        j_env, j_cls, j_method, args)
         else:
-            raise Exception('Invalid return definition?')
-
-        check_exception(j_env)
-        return ret
+            if r == JT_VOID:
+                j_env[0].CallVoidMethodA(j_env, j_self, j_method, args)
+            elif r == JT_BOOLEAN:
+                j_rets[index].z = j_env[0].CallBooleanMethodA(
+                        j_env, j_self, j_method, args)
+            elif r == JT_BYTE:
+                j_rets[index].b = j_env[0].CallByteMethodA(
+                        j_env, j_self, j_method, args)
+            elif r == JT_CHAR:
+                j_rets[index].c = j_env[0].CallCharMethodA(
+                        j_env, j_self, j_method, args)
+            elif r == JT_SHORT:
+                j_rets[index].s = j_env[0].CallShortMethodA(
+                        j_env, j_self, j_method, args)
+            elif r == JT_INT:
+                j_rets[index].i = j_env[0].CallIntMethodA(
+                        j_env, j_self, j_method, args)
+            elif r == JT_LONG:
+                j_rets[index].j = j_env[0].CallLongMethodA(
+                        j_env, j_self, j_method, args)
+            elif r == JT_FLOAT:
+                j_rets[index].f = j_env[0].CallFloatMethodA(
+                        j_env, j_self, j_method, args)
+            elif r == JT_DOUBLE:
+                j_rets[index].d = j_env[0].CallDoubleMethodA(
+                        j_env, j_self, j_method, args)
+            else:
+                j_rets[index].l = j_env[0].CallObjectMethodA(
+                        j_env, j_self, j_method, args)
+        if j_env[0].ExceptionCheck(j_env):
+            return index
+    return count
 
 
 cdef class JavaMultipleMethod(object):
 
-    cdef LocalRef j_self
     cdef list definitions
     cdef dict static_methods
     cdef dict instance_methods
+    # candidate methods by number of arguments, and the method chosen for an
+    # overload_key(), for the static and instance calls
+    cdef dict static_by_arity
+    cdef dict instance_by_arity
+    cdef dict static_cache
+    cdef dict instance_cache
     cdef bytes name
     cdef bytes classname
+    cdef readonly bint release_gil
+    cdef bint release_gil_set
+    # PEP 590 entry point, see jnius_vectorcall.pxi
+    cdef void *vectorcall
 
-    def __cinit__(self, definition, **kwargs):
-        self.j_self = None
+    def __cinit__(self, *args, **kwargs):
+        self.vectorcall = <void *>multiple_method_vectorcall
 
     def __init__(self, definitions, **kwargs):
         super(JavaMultipleMethod, self).__init__()
         self.definitions = definitions
         self.static_methods = {}
         self.instance_methods = {}
+        self.static_by_arity = {}
+        self.instance_by_arity = {}
+        self.static_cache = {}
+        self.instance_cache = {}
         self.name = None
+        self.release_gil_set = 'release_gil' in kwargs
+        self.release_gil = kwargs.get('release_gil', True)
 
     def __get__(self, obj, objtype):
         if obj is None:
-            self.j_self = None
             return self
-        # XXX FIXME we MUST not change our own j_self, but return a "bound"
-        # method here, as python does!
-        cdef JavaClass jc = obj
-        self.j_self = jc.j_self
-        return self
+        return bind_method(self, (<JavaClass?>obj).j_self)
 
     cdef void set_resolve_info(self, JNIEnv *j_env, jclass j_cls,
-            LocalRef j_self, bytes name, bytes classname):
+            bytes name, bytes classname):
         cdef JavaMethod jm
         self.name = name
         self.classname = classname
+        for cache in (self.static_by_arity, self.instance_by_arity,
+                      self.static_cache, self.instance_cache):
+            cache.clear()
 
         for signature, static, is_varargs in self.definitions:
-            jm = None
-            if j_self is None and static:
-                if signature in self.static_methods:
-                    continue
+            if static:
                 jm = JavaStaticMethod(signature, varargs=is_varargs)
-                jm.set_resolve_info(j_env, j_cls, j_self, name, classname)
                 self.static_methods[signature] = jm
-
-            elif j_self is not None and not static:
-                if signature in self.instance_methods:
-                    continue
+            else:
                 jm = JavaMethod(signature, varargs=is_varargs)
-                jm.set_resolve_info(j_env, j_cls, None, name, classname)
                 self.instance_methods[signature] = jm
+            jm.release_gil = self.release_gil
+            jm.set_resolve_info(j_env, j_cls, name, classname)
+
+    cdef void set_release_gil(self, bint release_gil):
+        cdef JavaMethod jm
+        self.release_gil = release_gil
+        for methods in (self.static_methods, self.instance_methods):
+            for jm in methods.values():
+                jm.release_gil = release_gil
 
     def __call__(self, *args):
-        # try to match our args to a signature
+        return self.call(None, PySequence_Fast_ITEMS(args), len(args))
+
+    def map(self, iterable):
+        '''Calls the method with each argument of `iterable`, and returns the
+        list of the results. The signature is chosen for each call.
+        '''
+        return self.batch(None, iterable, False)
+
+    def starmap(self, iterable):
+        '''Calls the method with each tuple of arguments of `iterable`, and
+        returns the list of the results. The signature is chosen for each
+        call.
+        '''
+        return self.batch(None, iterable, True)
+
+    cdef list batch(self, LocalRef j_self, iterable, bint star):
+        cdef list results = []
+        cdef tuple args
+        for item in iterable:
+            args = tuple(item) if star else (item, )
+            results.append(self.call(
+                j_self, PySequence_Fast_ITEMS(args), len(args)))
+        return results
+
+    cdef call(self, LocalRef j_self, PyObject **argv, Py_ssize_t nargs):
         cdef JavaMethod jm
-        cdef list scores = []
-        cdef dict methods
+        cdef dict cache
+        key = overload_key(argv, nargs)
 
-        if self.j_self:
-            methods = self.instance_methods
+        if j_self:
+            cache = self.instance_cache
         else:
-            methods = self.static_methods
+            cache = self.static_cache
+        jm = cache.get(key)
+        if jm is None:
+            args = argv_tuple(argv, nargs)
+            if j_self:
+                jm = self.select(self.instance_methods, self.instance_by_arity,
+                                 args)
+            else:
+                jm = self.select(self.static_methods, self.static_by_arity,
+                                 args)
+            if key is not None:
+                cache[key] = jm
+        return jm.call(j_self, argv, nargs)
 
-        for signature, jm in items_compat(methods):
-            sign_ret, sign_args = jm.definition_return, jm.definition_args
+    cdef JavaMethod select(self, dict methods, dict by_arity, tuple args):
+        # try to match our args to a signature
+        cdef JavaMethod jm
+        cdef JavaMethod best = None
+        cdef int nargs = len(args)
+        cdef int score, best_score = 0
+        cdef list candidates = by_arity.get(nargs)
+
+        if candidates is None:
+            candidates = []
+            for signature, jm in sorted(items_compat(methods)):
+                if jm.is_varargs:
+                    if nargs >= len(jm.definition_args) - 1:
+                        candidates.append(jm)
+                elif nargs == len(jm.definition_args):
+                    candidates.append(jm)
+            by_arity[nargs] = candidates
+
+        for jm in candidates:
+            sign_args = jm.definition_args
             if jm.is_varargs:
                 args_ = args[:len(sign_args) - 1] + (args[len(sign_args) - 1:],)
             else:
@@ -892,18 +1077,71 @@ cdef class JavaMultipleMethod(object):
 
             score = calculate_score(sign_args, args_, jm.is_varargs)
 
-            if score <= 0:
-                continue
-            scores.append((score, signature))
+            # on equal scores, the last signature wins
+            if score > 0 and score >= best_score:
+                best_score, best = score, jm
 
-        if not scores:
+        if best is None:
             raise JavaException('No methods matching your arguments')
-        scores.sort()
-        score, signature = scores[-1]
+        return best
 
-        jm = methods[signature]
-        jm.j_self = self.j_self
-        return jm.__call__(*args)
+
+@cython.freelist(32)
+cdef class JavaBoundMethod(object):
+    '''A JavaMethod or JavaMultipleMethod bound to a Java object, as returned
+    by `obj.method`. The method itself is shared by all the instances of the
+    class and never holds an object, so that calls from several threads on
+    different objects don't interfere.
+    '''
+    cdef object method
+    cdef LocalRef j_self
+    # PEP 590 entry point, see jnius_vectorcall.pxi
+    cdef void *vectorcall
+
+    def __cinit__(self):
+        self.vectorcall = <void *>bound_method_vectorcall
+
+    def __call__(self, *args):
+        return self.call(PySequence_Fast_ITEMS(args), len(args))
+
+    cdef call(self, PyObject **argv, Py_ssize_t nargs):
+        if type(self.method) is JavaMultipleMethod:
+            return (<JavaMultipleMethod>self.method).call(
+                self.j_self, argv, nargs)
+        return (<JavaMethod>self.method).call(self.j_self, argv, nargs)
+
+    def map(self, iterable):
+        '''See :meth:`JavaMethod.map`.
+        '''
+        if type(self.method) is JavaMultipleMethod:
+            return (<JavaMultipleMethod>self.method).batch(
+                self.j_self, iterable, False)
+        return (<JavaMethod>self.method).batch(self.j_self, iterable, False)
+
+    def starmap(self, iterable):
+        '''See :meth:`JavaMethod.starmap`.
+        '''
+        if type(self.method) is JavaMultipleMethod:
+            return (<JavaMultipleMethod>self.method).batch(
+                self.j_self, iterable, True)
+        return (<JavaMethod>self.method).batch(self.j_self, iterable, True)
+
+    def __repr__(self):
+        if type(self.method) is JavaMultipleMethod:
+            name = (<JavaMultipleMethod>self.method).name
+        else:
+            name = (<JavaMethod>self.method).name
+        if PY_MAJOR_VERSION >= 3:
+            name = name.decode('utf-8')
+        return '<bound Java method {0} of {1}>'.format(name, self.j_self)
+
+
+cdef inline JavaBoundMethod bind_method(object method, LocalRef j_self):
+    # allocated from the freelist of JavaBoundMethod, without calling __init__
+    cdef JavaBoundMethod bm = JavaBoundMethod.__new__(JavaBoundMethod)
+    bm.method = method
+    bm.j_self = j_self
+    return bm
 
 
 class JavaStaticMethod(JavaMethod):
@@ -22,6 +22,7 @@ def find_javaclass(namestr):
 
     jc = j_env[0].FindClass(j_env, name)
     if jc == NULL:
+        j_env[0].ExceptionClear(j_env)
         raise JavaException('Class not found {0!r}'.format(name))
 
     cls = Class(noinstance=True)
@@ -29,3 +30,31 @@ def find_javaclass(namestr):
     j_env[0].DeleteLocalRef(j_env, jc)
     return cls
 
+
+def exception_class(namestr):
+    '''Returns the JavaException subclass raised for the Java exceptions of
+    the class `namestr`, and of its subclasses.
+    '''
+    namestr = namestr.replace('/', '.')
+    cls = exception_classes.get(namestr)
+    if cls is not None:
+        return cls
+
+    cdef bytes name = str_for_c(namestr.replace('.', '/'))
+    cdef jclass jc
+    cdef jclass throwable = NULL
+    cdef JNIEnv *j_env = get_jnienv()
+    init_exception_ids(j_env)
+
+    jc = j_env[0].FindClass(j_env, name)
+    if jc == NULL:
+        j_env[0].ExceptionClear(j_env)
+        raise JavaException('Class not found {0!r}'.format(name))
+    try:
+        throwable = j_env[0].FindClass(j_env, 'java/lang/Throwable')
+        if not j_env[0].IsAssignableFrom(j_env, jc, throwable):
+            raise JavaException('{0} is not a Throwable'.format(namestr))
+        return java_exception_class(j_env, jc)
+    finally:
+        j_env[0].DeleteLocalRef(j_env, throwable)
+        j_env[0].DeleteLocalRef(j_env, jc)
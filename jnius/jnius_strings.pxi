@@ -0,0 +1,211 @@
+# Conversion of the strings between Java and Python through UTF-16, the
+# encoding of both the jstring and of the Python 3 str with non Latin-1
+# characters. The modified UTF-8 of GetStringUTFChars/NewStringUTF costs an
+# encoding and a decoding on each side, and mangles the characters outside
+# of the BMP.
+
+from collections import OrderedDict
+
+cdef extern from "Python.h":
+    object PyUnicode_New(Py_ssize_t size, Py_UCS4 maxchar)
+    int PyUnicode_READY(object o) except -1
+    int PyUnicode_KIND(object o)
+    void *PyUnicode_DATA(object o)
+    Py_ssize_t PyUnicode_GET_LENGTH(object o)
+    int PyUnicode_1BYTE_KIND
+    int PyUnicode_2BYTE_KIND
+
+# strings up to this length are copied on the C stack
+DEF STRING_STACK_SIZE = 256
+
+# the short strings recently converted, with their jstring, or None when
+# the cache is disabled
+cdef object string_cache = None
+cdef Py_ssize_t string_cache_size = 0
+cdef Py_ssize_t string_cache_length = 0
+
+
+def set_string_cache(size, max_length=32):
+    '''Keep the last `size` converted strings of up to `max_length`
+    characters, so that a string converted again reuses the same Python
+    string or Java string instead of making a new one. A size of 0 disables
+    the cache.
+    '''
+    global string_cache, string_cache_size, string_cache_length
+    if size < 0 or max_length < 0:
+        raise ValueError('The size and max_length must be positive')
+    string_cache = OrderedDict() if size else None
+    string_cache_size = size
+    string_cache_length = max_length
+
+
+cdef object cached_string(key):
+    # the (str, LocalRef of the jstring) entry of key, as the last used
+    entry = string_cache.pop(key, None)
+    if entry is not None:
+        string_cache[key] = entry
+    return entry
+
+
+cdef void cache_string(JNIEnv *j_env, text, jstring j_string) except *:
+    string_cache[text] = (text, create_local_ref(j_env, j_string))
+    if len(string_cache) > string_cache_size:
+        string_cache.popitem(False)
+
+
+cdef int native_utf16_order():
+    # the byteorder of PyUnicode_DecodeUTF16 for the jchar
+    cdef int one = 1
+    return -1 if (<char *>&one)[0] == 1 else 1
+
+
+cdef jchar scan_jchars(const jchar *chars, Py_ssize_t length,
+        bint *surrogates) nogil:
+    # the bits of all the characters, which are < 256 if the string is
+    # Latin-1, and if the string has surrogate pairs
+    cdef Py_ssize_t i
+    cdef jchar bits = 0
+    for i in range(length):
+        bits |= chars[i]
+        if (chars[i] & 0xF800) == 0xD800:
+            surrogates[0] = True
+    return bits
+
+
+cdef void narrow_jchars(unsigned char *data, const jchar *chars,
+        Py_ssize_t length) nogil:
+    cdef Py_ssize_t i
+    for i in range(length):
+        data[i] = <unsigned char>chars[i]
+
+
+cdef object unicode_from_jchars(const jchar *chars, Py_ssize_t length):
+    # a Python unicode string from UTF-16 characters
+    cdef jchar bits
+    cdef bint surrogates = False
+    cdef int byteorder = native_utf16_order()
+    IF JNIUS_PYTHON3:
+        bits = scan_jchars(chars, length, &surrogates)
+        if not surrogates:
+            ret = PyUnicode_New(length, bits)
+            if bits < 256:
+                # Latin-1 only, one byte per character
+                narrow_jchars(<unsigned char *>PyUnicode_DATA(ret),
+                        chars, length)
+            else:
+                memcpy(PyUnicode_DATA(ret), chars, length * sizeof(jchar))
+            return ret
+    return PyUnicode_DecodeUTF16(
+            <char *>chars, length * sizeof(jchar), NULL, &byteorder)
+
+
+cdef object convert_jstring_to_python(JNIEnv *j_env, jstring j_string):
+    # a Python string from a jstring (str on Python 3, UTF-8 bytes on
+    # Python 2)
+    cdef jchar buf[STRING_STACK_SIZE]
+    cdef const jchar *chars
+    cdef jsize length = j_env[0].GetStringLength(j_env, j_string)
+    cdef jchar bits = 0
+    cdef bint surrogates = True
+    if length <= STRING_STACK_SIZE:
+        j_env[0].GetStringRegion(j_env, j_string, 0, length, buf)
+        ret = unicode_from_jchars(buf, length)
+    else:
+        IF JNIUS_PYTHON3:
+            # look at the characters first, then copy them in the string
+            # made for them: no Python object is made in a critical region,
+            # where the JNI calls of a finalizer are not allowed
+            chars = j_env[0].GetStringCritical(j_env, j_string, NULL)
+            if chars == NULL:
+                raise MemoryError('Unable to get the characters of a string')
+            surrogates = False
+            bits = scan_jchars(chars, length, &surrogates)
+            j_env[0].ReleaseStringCritical(j_env, j_string, chars)
+        if not surrogates:
+            ret = PyUnicode_New(length, bits)
+            if bits < 256:
+                chars = j_env[0].GetStringCritical(j_env, j_string, NULL)
+                if chars == NULL:
+                    raise MemoryError(
+                        'Unable to get the characters of a string')
+                narrow_jchars(<unsigned char *>PyUnicode_DATA(ret),
+                        chars, length)
+                j_env[0].ReleaseStringCritical(j_env, j_string, chars)
+            else:
+                j_env[0].GetStringRegion(j_env, j_string, 0, length,
+                        <jchar *>PyUnicode_DATA(ret))
+        else:
+            chars = j_env[0].GetStringChars(j_env, j_string, NULL)
+            if chars == NULL:
+                raise MemoryError('Unable to get the characters of a string')
+            try:
+                ret = unicode_from_jchars(chars, length)
+            finally:
+                j_env[0].ReleaseStringChars(j_env, j_string, chars)
+
+    IF not JNIUS_PYTHON3:
+        ret = ret.encode('utf-8')
+
+    if string_cache is not None and length <= string_cache_length:
+        entry = cached_string(ret)
+        if entry is not None:
+            return entry[0]
+        cache_string(j_env, ret, j_string)
+    return ret
+
+
+cdef jstring new_jstring(JNIEnv *j_env, text) except NULL:
+    # a jstring of the Python unicode string text
+    cdef jchar buf[STRING_STACK_SIZE]
+    cdef jchar *chars = buf
+    cdef const unsigned char *data
+    cdef Py_ssize_t i, length
+    cdef jstring ret
+    IF JNIUS_PYTHON3:
+        PyUnicode_READY(text)
+        length = PyUnicode_GET_LENGTH(text)
+        if PyUnicode_KIND(text) == PyUnicode_2BYTE_KIND:
+            ret = j_env[0].NewString(
+                    j_env, <const_jchar *>PyUnicode_DATA(text), length)
+        elif PyUnicode_KIND(text) == PyUnicode_1BYTE_KIND:
+            if length > STRING_STACK_SIZE:
+                chars = <jchar *>malloc(length * sizeof(jchar))
+                if chars == NULL:
+                    raise MemoryError()
+            data = <const unsigned char *>PyUnicode_DATA(text)
+            for i in range(length):
+                chars[i] = data[i]
+            ret = j_env[0].NewString(j_env, <const_jchar *>chars, length)
+            if chars != buf:
+                free(chars)
+        else:
+            utf16 = PyUnicode_AsEncodedString(text, 'utf-16-le'
+                    if native_utf16_order() == -1 else 'utf-16-be', NULL)
+            ret = j_env[0].NewString(j_env, <const_jchar *><char *>utf16,
+                    len(utf16) // sizeof(jchar))
+    ELSE:
+        utf16 = PyUnicode_AsEncodedString(text, 'utf-16-le'
+                if native_utf16_order() == -1 else 'utf-16-be', NULL)
+        ret = j_env[0].NewString(j_env, <const_jchar *><char *>utf16,
+                len(utf16) // sizeof(jchar))
+    if ret == NULL:
+        check_exception(j_env)
+        raise MemoryError('Unable to create a string')
+    return ret
+
+
+cdef jstring convert_pystring_to_java(JNIEnv *j_env, obj) except NULL:
+    # a new local reference to a jstring of the Python string obj; the bytes
+    # are decoded as UTF-8
+    cdef jstring ret
+    if string_cache is not None and len(obj) <= string_cache_length:
+        entry = cached_string(obj)
+        if entry is not None:
+            return j_env[0].NewLocalRef(j_env, (<LocalRef>entry[1]).obj)
+    if isinstance(obj, bytes):
+        ret = new_jstring(j_env, (<bytes>obj).decode('utf-8'))
+    else:
+        ret = new_jstring(j_env, obj)
+    if string_cache is not None and len(obj) <= string_cache_length:
+        cache_string(j_env, obj, ret)
+    return ret
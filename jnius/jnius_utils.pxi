@@ -52,54 +52,115 @@ cdef parse_definition(definition):
     return ret, tuple(args)
 
 
+# the method IDs used to describe the Java exceptions, looked up once
+cdef jmethodID mid_toString = NULL
+cdef jmethodID mid_getMessage = NULL
+cdef jmethodID mid_getCause = NULL
+cdef jmethodID mid_getStackTrace = NULL
+cdef jmethodID mid_getName = NULL
+
+# JavaException subclass by Java exception class name
+cdef dict exception_classes = {}
+
+
+cdef void init_exception_ids(JNIEnv *j_env) except *:
+    global mid_toString, mid_getMessage, mid_getCause, mid_getStackTrace
+    global mid_getName
+    cdef jclass cls_object
+    cdef jclass cls_throwable
+    cdef jclass cls_class
+    if mid_getName != NULL:
+        return
+
+    cls_object = j_env[0].FindClass(j_env, "java/lang/Object")
+    cls_throwable = j_env[0].FindClass(j_env, "java/lang/Throwable")
+    cls_class = j_env[0].FindClass(j_env, "java/lang/Class")
+    if cls_object == NULL or cls_throwable == NULL or cls_class == NULL:
+        j_env[0].ExceptionClear(j_env)
+        raise JavaException('Unable to find the Throwable class')
+
+    mid_toString = j_env[0].GetMethodID(j_env, cls_object, "toString", "()Ljava/lang/String;")
+    mid_getMessage = j_env[0].GetMethodID(j_env, cls_throwable, "getMessage", "()Ljava/lang/String;")
+    mid_getCause = j_env[0].GetMethodID(j_env, cls_throwable, "getCause", "()Ljava/lang/Throwable;")
+    mid_getStackTrace = j_env[0].GetMethodID(j_env, cls_throwable, "getStackTrace", "()[Ljava/lang/StackTraceElement;")
+    mid_getName = j_env[0].GetMethodID(j_env, cls_class, "getName", "()Ljava/lang/String;")
+
+    j_env[0].DeleteLocalRef(j_env, cls_object)
+    j_env[0].DeleteLocalRef(j_env, cls_throwable)
+    j_env[0].DeleteLocalRef(j_env, cls_class)
+
+
 cdef void check_exception(JNIEnv *j_env) except *:
-    cdef jmethodID toString = NULL
-    cdef jmethodID getCause = NULL
-    cdef jmethodID getStackTrace = NULL
-    cdef jmethodID getMessage = NULL
     cdef jstring e_msg
-    cdef jboolean isCopy
+    cdef jclass j_cls
+    cdef LocalRef throwable
     cdef jthrowable exc = j_env[0].ExceptionOccurred(j_env)
-    cdef jclass cls_object = NULL
-    cdef jclass cls_throwable = NULL
     if exc:
         # ExceptionDescribe always writes to stderr, preventing tidy exception
         # handling, so should only be for debugging
         # j_env[0].ExceptionDescribe(j_env)
         j_env[0].ExceptionClear(j_env)
+        init_exception_ids(j_env)
 
-        cls_object = j_env[0].FindClass(j_env, "java/lang/Object")
-        cls_throwable = j_env[0].FindClass(j_env, "java/lang/Throwable")
+        e_msg = j_env[0].CallObjectMethod(j_env, exc, mid_getMessage)
+        pymsg = None if e_msg == NULL else convert_jobject_to_python(j_env, <bytes> 'Ljava/lang/String;', e_msg)
+        if e_msg != NULL:
+            j_env[0].DeleteLocalRef(j_env, e_msg)
 
-        toString = j_env[0].GetMethodID(j_env, cls_object, "toString", "()Ljava/lang/String;");
-        getMessage = j_env[0].GetMethodID(j_env, cls_throwable, "getMessage", "()Ljava/lang/String;");
-        getCause = j_env[0].GetMethodID(j_env, cls_throwable, "getCause", "()Ljava/lang/Throwable;");
-        getStackTrace = j_env[0].GetMethodID(j_env, cls_throwable, "getStackTrace", "()[Ljava/lang/StackTraceElement;");
+        j_cls = j_env[0].GetObjectClass(j_env, exc)
+        try:
+            pyexc = java_exception_class(j_env, j_cls)
+        finally:
+            j_env[0].DeleteLocalRef(j_env, j_cls)
 
-        e_msg = j_env[0].CallObjectMethod(j_env, exc, getMessage);
-        pymsg = None if e_msg == NULL else convert_jobject_to_python(j_env, <bytes> 'Ljava/lang/String;', e_msg)
+        # the stack trace is read from the throwable when asked only
+        throwable = create_local_ref(j_env, exc)
+        j_env[0].DeleteLocalRef(j_env, exc)
 
-        pystack = []
-        _append_exception_trace_messages(j_env, pystack, exc, getCause, getStackTrace, toString)
+        pyexcclass = pyexc.classname
+        raise pyexc('JVM exception occurred: %s' % (pymsg if pymsg is not None else pyexcclass), pyexcclass, pymsg, None, throwable)
 
-        pyexcclass = lookup_java_object_name(j_env, exc).replace('/', '.')
 
-        j_env[0].DeleteLocalRef(j_env, cls_object)
-        j_env[0].DeleteLocalRef(j_env, cls_throwable)
-        if e_msg != NULL:
-            j_env[0].DeleteLocalRef(j_env, e_msg)
-        j_env[0].DeleteLocalRef(j_env, exc)
+cdef object java_exception_class(JNIEnv *j_env, jclass j_cls):
+    # the JavaException subclass of the Java exception class j_cls, created
+    # with the subclasses of its superclasses on the first use
+    cdef jclass j_super
+    cdef jobject js = j_env[0].CallObjectMethod(j_env, j_cls, mid_getName)
+    name = convert_jobject_to_python(j_env, 'Ljava/lang/String;', js)
+    j_env[0].DeleteLocalRef(j_env, js)
+
+    cls = exception_classes.get(name)
+    if cls is not None:
+        return cls
+
+    base = JavaException
+    j_super = j_env[0].GetSuperclass(j_env, j_cls)
+    if j_super != NULL:
+        try:
+            if name != 'java.lang.Throwable':
+                base = java_exception_class(j_env, j_super)
+        finally:
+            j_env[0].DeleteLocalRef(j_env, j_super)
 
-        raise JavaException('JVM exception occurred: %s' % (pymsg if pymsg is not None else pyexcclass), pyexcclass, pymsg, pystack)
+    cls = type(str(name), (base, ), {
+        'classname': name, '__module__': 'jnius'})
+    exception_classes[name] = cls
+    return cls
+
+
+cdef list exception_stacktrace(JNIEnv *j_env, jthrowable exc):
+    # the Throwable.toString() of exc and of its causes, each followed by its
+    # stack frames
+    cdef list pystack = []
+    init_exception_ids(j_env)
+    _append_exception_trace_messages(j_env, pystack, exc)
+    return pystack
 
 
 cdef void _append_exception_trace_messages(
     JNIEnv*      j_env,
     list         pystack,
-    jthrowable   exc,
-    jmethodID    mid_getCause,
-    jmethodID    mid_getStackTrace,
-    jmethodID    mid_toString):
+    jthrowable   exc):
 
     # Get the array of StackTraceElements.
     cdef jobjectArray frames = j_env[0].CallObjectMethod(j_env, exc, mid_getStackTrace)
@@ -135,8 +196,7 @@ cdef void _append_exception_trace_messages(
     if frames != NULL:
         cause = j_env[0].CallObjectMethod(j_env, exc, mid_getCause)
         if cause != NULL:
-            _append_exception_trace_messages(j_env, pystack, cause,
-                                             mid_getCause, mid_getStackTrace, mid_toString)
+            _append_exception_trace_messages(j_env, pystack, cause)
             j_env[0].DeleteLocalRef(j_env, cause)
 
     j_env[0].DeleteLocalRef(j_env, frames)
@@ -208,18 +268,90 @@ cdef void check_assignable_from(JNIEnv *env, JavaClass jc, signature) except *:
             jc.__javaclass__, signature))
 
 
-cdef lookup_java_object_name(JNIEnv *j_env, jobject j_obj):
-    cdef jclass jcls = j_env[0].GetObjectClass(j_env, j_obj)
-    cdef jclass jcls2 = j_env[0].GetObjectClass(j_env, jcls)
-    cdef jmethodID jmeth = j_env[0].GetMethodID(j_env, jcls2, 'getName', '()Ljava/lang/String;')
-    cdef jobject js = j_env[0].CallObjectMethod(j_env, jcls, jmeth)
+# the runtime classes of the last objects returned as a java/lang/Object,
+# most recent first, as global references with their name: the objects of a
+# collection are mostly of a few classes, found with IsSameObject instead of
+# asking their name to Java
+DEF RUNTIME_CLASSES_SIZE = 16
+cdef jclass runtime_classes[RUNTIME_CLASSES_SIZE]
+cdef list runtime_class_names = []
+cdef jmethodID mid_class_getName = NULL
+
+
+cdef java_class_name(JNIEnv *j_env, jclass jcls):
+    global mid_class_getName
+    cdef jclass jcls2
+    cdef jobject js
+    if mid_class_getName == NULL:
+        jcls2 = j_env[0].GetObjectClass(j_env, jcls)
+        mid_class_getName = j_env[0].GetMethodID(
+                j_env, jcls2, 'getName', '()Ljava/lang/String;')
+        j_env[0].DeleteLocalRef(j_env, jcls2)
+    js = j_env[0].CallObjectMethod(j_env, jcls, mid_class_getName)
     name = convert_jobject_to_python(j_env, 'Ljava/lang/String;', js)
     j_env[0].DeleteLocalRef(j_env, js)
-    j_env[0].DeleteLocalRef(j_env, jcls)
-    j_env[0].DeleteLocalRef(j_env, jcls2)
     return name.replace('.', '/')
 
 
+cdef lookup_java_object_name(JNIEnv *j_env, jobject j_obj):
+    cdef jclass jcls = j_env[0].GetObjectClass(j_env, j_obj)
+    cdef jclass found
+    cdef int index, count = len(runtime_class_names)
+    for index in range(count):
+        if j_env[0].IsSameObject(j_env, jcls, runtime_classes[index]):
+            j_env[0].DeleteLocalRef(j_env, jcls)
+            name = runtime_class_names[index]
+            if index:
+                # move it first
+                del runtime_class_names[index]
+                runtime_class_names.insert(0, name)
+                found = runtime_classes[index]
+                while index:
+                    runtime_classes[index] = runtime_classes[index - 1]
+                    index -= 1
+                runtime_classes[0] = found
+            return name
+
+    try:
+        name = java_class_name(j_env, jcls)
+        if count == RUNTIME_CLASSES_SIZE:
+            count -= 1
+            j_env[0].DeleteGlobalRef(j_env, runtime_classes[count])
+            runtime_class_names.pop()
+        for index in range(count, 0, -1):
+            runtime_classes[index] = runtime_classes[index - 1]
+        runtime_classes[0] = j_env[0].NewGlobalRef(j_env, jcls)
+        runtime_class_names.insert(0, name)
+    finally:
+        j_env[0].DeleteLocalRef(j_env, jcls)
+    return name
+
+
+cdef tuple overload_key(PyObject **argv, Py_ssize_t nargs):
+    # the key of the signature chosen for the arguments, or None when it
+    # can't be cached: the score of a signature only depends on the type of
+    # the arguments, and on the length of the strings (a char is a
+    # 1-character string) or the format of the buffers, except for the lists
+    # and tuples scored on their content
+    cdef list key = []
+    cdef Py_ssize_t index
+    for index in range(nargs):
+        arg = <object>argv[index]
+        tp = type(arg)
+        if tp is list or tp is tuple:
+            return None
+        if isinstance(arg, basestring):
+            key.append((tp, len(arg) == 1))
+        elif tp is JavaObjectArray:
+            key.append((tp, arg.definition))
+        elif tp is not bytearray and PyObject_CheckBuffer(arg) and \
+                not isinstance(arg, PrimitiveArray):
+            key.append((tp, buffer_key(arg), direct_buffer_of(arg) != NULL))
+        else:
+            key.append(tp)
+    return tuple(key)
+
+
 cdef int calculate_score(sign_args, args, is_varargs=False) except *:
     cdef int index
     cdef int score = 0
@@ -301,13 +433,26 @@ cdef int calculate_score(sign_args, args, is_varargs=False) except *:
                 score += 10
                 continue
 
+            # a dict, set or list given as a HashMap, HashSet or ArrayList
+            if collection_accepts(r, arg):
+                score += 5 if r == 'java/lang/Object' else 10
+                continue
+
+            # the memoryview of a direct ByteBuffer
+            if direct_buffer_of(arg) != NULL and r in (
+                    'java/nio/ByteBuffer', 'java/nio/Buffer',
+                    'java/lang/Object'):
+                score += 10
+                continue
+
             # if it's a generic object, accept python string, or any java
             # class/object
             if r == 'java/lang/Object':
                 if isinstance(arg, JavaClass) or isinstance(arg, JavaObject):
                     score += 10
                     continue
-                elif isinstance(arg, basestring):
+                elif isinstance(arg, (basestring, PrimitiveArray,
+                        JavaObjectArray)):
                     score += 5
                     continue
                 return -1
@@ -361,10 +506,34 @@ cdef int calculate_score(sign_args, args, is_varargs=False) except *:
                 score += 10
                 continue
 
-            if r == '[B' and isinstance(arg, (bytearray, ByteArray)):
+            if r == '[B' and isinstance(arg, bytearray):
+                score += 10
+                continue
+
+            if isinstance(arg, PrimitiveArray):
+                if r[1:] != arg.definition:
+                    return -1
                 score += 10
                 continue
 
+            if isinstance(arg, JavaObjectArray):
+                if r[1:] == arg.definition:
+                    score += 10
+                elif r == '[Ljava/lang/Object;' and arg.definition[0] in 'L[':
+                    # the Java arrays are covariant
+                    score += 5
+                else:
+                    return -1
+                continue
+
+            if PyObject_CheckBuffer(arg):
+                # array.array, memoryview, numpy arrays...
+                subscore = buffer_score(r[1:], arg)
+                if subscore == -1:
+                    return -1
+                score += subscore
+                continue
+
             if not isinstance(arg, (list, tuple)):
                 return -1
 
@@ -382,3 +551,60 @@ cdef int calculate_score(sign_args, args, is_varargs=False) except *:
             # a method with a better signature so we don't
             # change this method score
     return score
+
+
+# calls with up to MAX_STACK_ARGS arguments pass them in a jvalue array on the
+# C stack, larger ones use the ArgsBuffer of their thread
+DEF MAX_STACK_ARGS = 8
+
+# number of calls converted and done at once by JavaMethod.map() and
+# starmap(), which bounds their memory use and local references
+DEF BATCH_SIZE = 256
+
+
+cdef class ArgsBuffer(object):
+    # jvalue array reused by the calls of a thread, grown as needed
+    cdef jvalue *j_args
+    cdef int size
+    cdef bint busy
+
+    def __cinit__(self):
+        self.j_args = NULL
+        self.size = 0
+        self.busy = False
+
+    def __dealloc__(self):
+        if self.j_args != NULL:
+            free(self.j_args)
+
+    cdef jvalue *acquire(self, int size) except NULL:
+        if size > self.size:
+            if self.j_args != NULL:
+                free(self.j_args)
+            self.size = 0
+            self.j_args = <jvalue *>malloc(sizeof(jvalue) * size)
+            if self.j_args == NULL:
+                raise MemoryError('Unable to allocate memory for java args')
+            self.size = size
+        self.busy = True
+        return self.j_args
+
+    cdef void release(self):
+        self.busy = False
+
+
+cdef ArgsBuffer get_args_buffer():
+    # the buffer of the current thread, kept in its thread state dict, or a
+    # new one if it is in use by a call below us (a Python callback,
+    # implementing a Java interface)
+    cdef dict state = <dict>PyThreadState_GetDict()
+    cdef PyObject *found = PyDict_GetItem(state, 'jnius.ArgsBuffer')
+    cdef ArgsBuffer buf
+    if found == NULL:
+        buf = ArgsBuffer()
+        state['jnius.ArgsBuffer'] = buf
+        return buf
+    buf = <ArgsBuffer>found
+    if buf.busy:
+        return ArgsBuffer()
+    return buf
@@ -0,0 +1,73 @@
+# PEP 590 vectorcall for JavaMethod, JavaMultipleMethod and JavaBoundMethod.
+#
+# On Python 3.8 and later, a call like obj.size() or obj.get(i) gives the
+# arguments as a C array, without packing them in a tuple for __call__. Each
+# instance stores its vectorcall function in its `vectorcall` field, and the
+# types are flagged to use it once the module is initialized. On older
+# Pythons, the types keep using __call__ only.
+
+cdef extern from *:
+    """
+    #if PY_VERSION_HEX >= 0x03080000
+    #ifndef Py_TPFLAGS_HAVE_VECTORCALL
+    #define Py_TPFLAGS_HAVE_VECTORCALL _Py_TPFLAGS_HAVE_VECTORCALL
+    #endif
+    #define jnius_vectorcall_nargs(n) PyVectorcall_NARGS(n)
+    static int jnius_enable_vectorcall(PyObject *type, Py_ssize_t offset) {
+        ((PyTypeObject *)type)->tp_vectorcall_offset = offset;
+        ((PyTypeObject *)type)->tp_flags |= Py_TPFLAGS_HAVE_VECTORCALL;
+        return 1;
+    }
+    #else
+    #define jnius_vectorcall_nargs(n) ((Py_ssize_t)(n))
+    static int jnius_enable_vectorcall(PyObject *type, Py_ssize_t offset) {
+        return 0;
+    }
+    #endif
+    """
+    Py_ssize_t jnius_vectorcall_nargs(size_t nargsf)
+    int jnius_enable_vectorcall(PyObject *type, Py_ssize_t offset)
+
+
+cdef inline Py_ssize_t vectorcall_nargs(size_t nargsf,
+        PyObject *kwnames) except -1:
+    if kwnames != NULL and len(<tuple>kwnames):
+        raise TypeError('Java methods take no keyword arguments')
+    return jnius_vectorcall_nargs(nargsf)
+
+
+cdef object method_vectorcall(object method, PyObject **argv,
+        size_t nargsf, PyObject *kwnames):
+    return (<JavaMethod>method).call(
+        None, argv, vectorcall_nargs(nargsf, kwnames))
+
+
+cdef object multiple_method_vectorcall(object method, PyObject **argv,
+        size_t nargsf, PyObject *kwnames):
+    return (<JavaMultipleMethod>method).call(
+        None, argv, vectorcall_nargs(nargsf, kwnames))
+
+
+cdef object bound_method_vectorcall(object method, PyObject **argv,
+        size_t nargsf, PyObject *kwnames):
+    return (<JavaBoundMethod>method).call(
+        argv, vectorcall_nargs(nargsf, kwnames))
+
+
+cdef bint enable_vectorcall(type tp, object obj, void **field):
+    # `field` is the vectorcall field of `obj`, an instance of `tp`
+    return jnius_enable_vectorcall(<PyObject *>tp,
+        <char *>field - <char *><PyObject *>obj)
+
+
+cdef bint setup_vectorcall() except *:
+    cdef JavaMethod jm = JavaMethod('()V')
+    cdef JavaMultipleMethod jmm = JavaMultipleMethod([])
+    cdef JavaBoundMethod bm = JavaBoundMethod()
+    enable_vectorcall(JavaStaticMethod, jm, &jm.vectorcall)
+    enable_vectorcall(JavaMultipleMethod, jmm, &jmm.vectorcall)
+    enable_vectorcall(JavaBoundMethod, bm, &bm.vectorcall)
+    return enable_vectorcall(JavaMethod, jm, &jm.vectorcall)
+
+#: True when the Java methods are called through PEP 590 vectorcall
+HAS_VECTORCALL = setup_vectorcall()
@@ -0,0 +1,523 @@
+'''
+Binding generator
+=================
+
+Writes plain Python modules declaring the Java classes, like the ones written
+by hand in :mod:`jnius.reflect`, so that an application can import its
+bindings without any reflection at runtime::
+
+    python -m jnius.pregen --classpath libs/foo.jar -o bindings com.foo.*
+
+Each Java package becomes a Python package under the output directory
+(`bindings/com/foo/__init__.py` here), holding the classes of that package.
+A class name can also be given as `com.foo.*` for the classes of the package,
+or `com.foo.**` to include the subpackages; wildcards are expanded with the
+jars and directories of the classpath (see :mod:`jnius.classpath`).
+
+Importing a generated module registers its classes, autoclass() then returns
+them directly.
+
+With `--cython`, a Cython extension is written per package instead (`com_foo.pyx`
+here), along with the `jni.pxi` and `jnius_capi.pxi` files it includes. Each
+method becomes a cdef function with its own cached jmethodID, and with the
+conversion of its primitive arguments and of its return value fixed at
+generation time; the other conversions go through the C API that the jnius
+module exports in the `jnius.jnius._C_API` capsule. Overloads with different
+numbers of arguments are dispatched on that number, the other overloads are
+left to JavaMultipleMethod.
+'''
+from __future__ import absolute_import
+from __future__ import unicode_literals
+from __future__ import print_function
+from __future__ import division
+__all__ = ('generate', 'render_class', 'render_module', 'render_cython_module')
+
+import argparse
+import io
+import keyword
+import os
+import re
+import shutil
+import subprocess
+import sys
+from os.path import dirname, exists, join
+
+import jnius_config
+from jnius.classpath import ClasspathIndex
+from jnius.reflect import bean_getter, dump_spec, lower_name
+
+MODIFIER_PUBLIC = 0x0001
+
+HEADER = '''\
+# -*- coding: utf-8 -*-
+# Generated by python -m jnius.pregen, do not edit.
+from six import with_metaclass
+
+from jnius.jnius import (
+    JavaClass, MetaJavaClass, JavaMethod, JavaStaticMethod,
+    JavaField, JavaStaticField, JavaMultipleMethod
+)
+from jnius.reflect import _class_attributes
+'''
+
+_identifier = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+#: keywords of either Python 2 or Python 3
+_keywords = set(keyword.kwlist) | set([
+    'print', 'exec', 'nonlocal', 'async', 'await', 'True', 'False', 'None'])
+
+
+def _is_identifier(name):
+    return bool(_identifier.match(name)) and name not in _keywords
+
+
+def _assign(name, value):
+    # members named after a Python keyword can't be declared with a plain
+    # assignment, add them to the namespace of the class body directly
+    if _is_identifier(name):
+        return '    {0} = {1}\n'.format(name, value)
+    return "    locals()['{0}'] = {1}\n".format(name, value)
+
+
+def _method(sigs):
+    if len(sigs) > 1:
+        lines = ['JavaMultipleMethod([\n']
+        for s in sorted(sigs, key=lambda s: s['sig']):
+            lines.append("        ('{0}', {1}, {2}),\n".format(
+                s['sig'], s['static'], s['vargs']))
+        lines.append('    ])')
+        return ''.join(lines)
+    s = sigs[0]
+    factory = 'JavaStaticMethod' if s['static'] else 'JavaMethod'
+    if s['vargs']:
+        return "{0}('{1}', varargs=True)".format(factory, s['sig'])
+    return "{0}('{1}')".format(factory, s['sig'])
+
+
+def _field(s):
+    factory = 'JavaStaticField' if s['static'] else 'JavaField'
+    return "{0}('{1}')".format(factory, s['sig'])
+
+
+def python_name(clsname):
+    """ Returns the name of the Python class for the Java class `clsname`.
+    """
+    return clsname.rpartition('.')[2].replace('$', '_')
+
+
+def render_class(spec, exclude=(),
+                 bases='with_metaclass(MetaJavaClass, JavaClass)'):
+    """ Returns the source of the class statement for an unpacked spec (see
+        :func:`jnius.reflect.dump_spec`), with the members that load_spec()
+        would create, except the ones in `exclude`.
+    """
+    clsname = spec['class']
+    lines = [
+        '\n\n',
+        'class {0}({1}):\n'.format(python_name(clsname), bases),
+        "    __javaclass__ = '{0}'\n".format(clsname.replace('.', '/')),
+    ]
+
+    constructors = sorted(spec['constructors'].values(),
+                          key=lambda c: c['sig'])
+    if constructors:
+        lines.append('    __javaconstructor__ = (\n')
+        for c in constructors:
+            lines.append("        ('{0}', {1}),\n".format(
+                c['sig'], c['vargs']))
+        lines.append('    )\n')
+    else:
+        lines.append('    __javaconstructor__ = ()\n')
+
+    #: The Python protocols of the interfaces, as given by autoclass()
+    lines.append('    locals().update(_class_attributes(\n')
+    lines.append("        '{0}', __javaconstructor__, (\n".format(clsname))
+    for name in sorted(spec['interfaces']):
+        lines.append("            '{0}',\n".format(name))
+    lines.append('        )))\n')
+
+    #: Fields hide the methods of the same name, like in load_spec
+    members = {}
+    getters = []
+    for name, sigs in spec['methods'].items():
+        sigs = list(sigs.values())
+        members[name] = _method(sigs)
+        if len(sigs) == 1 and name != 'getClass' and bean_getter(name) and \
+                sigs[0]['sig'].startswith('()'):
+            getters.append(name)
+    for name, s in spec['fields'].items():
+        members[name] = _field(s)
+
+    #: Bean properties, without hiding a real member
+    for name in getters:
+        lowername = lower_name(
+            name[3:] if name.startswith('get') else name[2:])
+        if lowername not in members:
+            members[lowername] = \
+                'property(lambda self: self.{0}())'.format(name)
+
+    names = sorted([name for name in members if name not in exclude])
+    if names:
+        lines.append('\n')
+    for name in names:
+        lines.append(_assign(name, members[name]))
+    return ''.join(lines)
+
+
+def render_module(specs):
+    """ Returns the source of a module declaring the classes of the unpacked
+        `specs`.
+    """
+    classes = sorted(specs, key=lambda spec: spec['class'])
+    return HEADER + ''.join([render_class(spec) for spec in classes])
+
+
+CYTHON_HEADER = """\
+# -*- coding: utf-8 -*-
+# Generated by python -m jnius.pregen --cython, do not edit.
+# Build with the jni.pxi and jnius_capi.pxi files next to it, and the JNI
+# headers in the include path.
+include "jni.pxi"
+include "jnius_capi.pxi"
+
+from cpython.pycapsule cimport PyCapsule_GetPointer
+
+import jnius.jnius
+from jnius.jnius import (
+    JavaClass, MetaJavaClass, JavaMethod, JavaStaticMethod,
+    JavaField, JavaStaticField, JavaMultipleMethod, JavaException
+)
+from jnius.reflect import _class_attributes
+
+cdef JniusCAPI *capi = <JniusCAPI *>PyCapsule_GetPointer(
+    jnius.jnius._C_API, 'jnius.jnius._C_API')
+if capi.version != JNIUS_CAPI_VERSION:
+    raise ImportError('{0} was generated for another version of '
+                      'pyjnius'.format(__name__))
+
+
+cdef jclass get_class(object tp, jclass *j_cls) except NULL:
+    if j_cls[0] == NULL:
+        j_cls[0] = capi.get_j_cls(tp)
+    return j_cls[0]
+
+
+cdef jmethodID get_method(JNIEnv *j_env, jclass j_cls, jmethodID *j_method,
+        const char *name, const char *definition, bint static) except NULL:
+    if j_method[0] == NULL:
+        if static:
+            j_method[0] = j_env[0].GetStaticMethodID(
+                j_env, j_cls, name, definition)
+        else:
+            j_method[0] = j_env[0].GetMethodID(
+                j_env, j_cls, name, definition)
+        if j_method[0] == NULL:
+            j_env[0].ExceptionClear(j_env)
+            raise JavaException('Unable to find the method {0}({1})'.format(
+                name, definition))
+    return j_method[0]
+"""
+
+_signature = re.compile(r'\[*(?:[ZBCSIJFD]|L[^;]+;)')
+
+#: JNI name and C type of the values of each return type
+_call_types = {
+    'V': ('Void', None),
+    'Z': ('Boolean', 'jboolean'),
+    'B': ('Byte', 'jbyte'),
+    'C': ('Char', 'jchar'),
+    'S': ('Short', 'jshort'),
+    'I': ('Int', 'jint'),
+    'J': ('Long', 'jlong'),
+    'F': ('Float', 'jfloat'),
+    'D': ('Double', 'jdouble'),
+    'L': ('Object', 'jobject'),
+    '[': ('Object', 'jobject'),
+}
+
+#: conversion of the returned values, like in convert_jvalue_to_python
+_results = {
+    'Z': 'True if j_ret else False',
+    'B': '<char>j_ret',
+    'C': '<Py_UCS4>j_ret',
+    'S': '<short>j_ret',
+    'I': '<int>j_ret',
+    'J': '<long long>j_ret',
+    'F': '<float>j_ret',
+    'D': '<double>j_ret',
+}
+
+
+def parse_signature(definition):
+    """ Returns the return type and the list of the argument types of a
+        method signature.
+    """
+    args, ret = definition[1:].split(')')
+    return ret, _signature.findall(args)
+
+
+def _render_call(pyname, index, clsname, name, s):
+    """ Returns a cdef function calling the method described by `s` with its
+        jmethodID, and the conversions fixed for its signature.
+    """
+    ret, args = parse_signature(s['sig'])
+    params = ['a{0}'.format(i) for i in range(len(args))]
+    static = s['static']
+    call, ctype = _call_types[ret[0]]
+    lines = ['\n\ncdef jmethodID j_method_{0} = NULL\n'.format(index)]
+    # the definitions of the object arguments and their type codes
+    for i, arg in enumerate(args):
+        if len(arg) > 1:
+            lines.append("cdef tuple d_{0}_{1} = ('{2}', )\n".format(
+                index, i, arg))
+            lines.append(
+                'cdef bytes c_{0}_{1} = capi.signature_codes(d_{0}_{1})\n'
+                .format(index, i))
+    lines += [
+        'cdef _call_{0}({1}):\n'.format(
+            index, ', '.join(([] if static else ['self']) + params)),
+        '    # {0}.{1}{2}\n'.format(clsname, name, s['sig']),
+        '    cdef JNIEnv *j_env = capi.get_jnienv()\n',
+        '    cdef jclass j_cls = get_class({0}, &j_cls_{0})\n'.format(pyname),
+        "    cdef jmethodID j_method = get_method(j_env, j_cls, &j_method_{0}, "
+        "b'{1}', b'{2}', {3})\n".format(index, name, s['sig'], static),
+    ]
+    if not static:
+        lines.append('    cdef jobject j_self = capi.get_j_self(self)\n')
+    if args:
+        lines.append('    cdef jvalue j_args[{0}]\n'.format(len(args)))
+    else:
+        lines.append('    cdef jvalue *j_args = NULL\n')
+    if ctype:
+        lines.append('    cdef {0} j_ret\n'.format(ctype))
+
+    objects = []
+    for i, (arg, param) in enumerate(zip(args, params)):
+        if arg in ('Z', 'B', 'S', 'I', 'J', 'F', 'D'):
+            lines.append('    j_args[{0}].{1} = {2}\n'.format(
+                i, arg.lower(), param))
+        elif arg == 'C':
+            lines.append('    j_args[{0}].c = ord({1})\n'.format(i, param))
+        else:
+            lines.append('    j_args[{0}].l = NULL\n'.format(i))
+            objects.append((i, arg, param))
+
+    indent = '    '
+    if objects:
+        lines.append('    try:\n')
+        indent = '        '
+        for i, arg, param in objects:
+            lines.append(
+                '{0}capi.convert_arg(j_env, d_{1}_{2}, c_{1}_{2}, {3}, '
+                '&j_args[{2}])\n'.format(indent, index, i, param))
+
+    target = 'j_cls' if static else 'j_self'
+    lines.append('{0}with nogil:\n'.format(indent))
+    lines.append('{0}    {1}j_env[0].Call{2}{3}MethodA(\n'.format(
+        indent, 'j_ret = ' if ctype else '', 'Static' if static else '', call))
+    lines.append('{0}        j_env, {1}, j_method, j_args)\n'.format(
+        indent, target))
+
+    if objects:
+        lines.append('    finally:\n')
+        for i, arg, param in objects:
+            lines.append(
+                '        capi.release_arg(j_env, d_{0}_{1}, c_{0}_{1}, {2}, '
+                '&j_args[{1}])\n'.format(index, i, param))
+
+    lines.append('    capi.check_exception(j_env)\n')
+    if ret in _results:
+        lines.append('    return {0}\n'.format(_results[ret]))
+    elif ret != 'V':
+        lines.append(
+            "    return capi.convert_result(j_env, '{0}', j_ret)\n".format(ret))
+    return ''.join(lines)
+
+
+def _compilable(name, sigs):
+    # overloads are dispatched on the number of arguments only, the others
+    # (and varargs) are left to JavaMultipleMethod
+    if not _is_identifier(name):
+        return False
+    if len(sigs) > 1:
+        arities = set([len(parse_signature(s['sig'])[1]) for s in sigs])
+        if len(arities) != len(sigs) or any([s['vargs'] for s in sigs]):
+            return False
+    return True
+
+
+def _render_wrapper(name, sigs, calls):
+    static = sigs[0]['static']
+    self_ = [] if static else ['self']
+    lines = []
+    if static:
+        lines.append('    @staticmethod\n')
+    if len(sigs) == 1:
+        s = sigs[0]
+        nargs = len(parse_signature(s['sig'])[1])
+        params = ['a{0}'.format(i) for i in range(nargs)]
+        if s['vargs']:
+            params[-1] = '*' + params[-1]
+        lines.append('    def {0}({1}):\n'.format(
+            name, ', '.join(self_ + params)))
+        lines.append('        return _call_{0}({1})\n'.format(
+            calls[0], ', '.join(self_ + [p.lstrip('*') for p in params])))
+        return ''.join(lines)
+
+    lines.append('    def {0}({1}):\n'.format(name, ', '.join(self_ + ['*args'])))
+    for n, (s, call) in enumerate(zip(sigs, calls)):
+        nargs = len(parse_signature(s['sig'])[1])
+        lines.append('        {0} len(args) == {1}:\n'.format(
+            'if' if n == 0 else 'elif', nargs))
+        lines.append('            return _call_{0}({1})\n'.format(
+            call, ', '.join(self_ + [
+                'args[{0}]'.format(i) for i in range(nargs)])))
+    lines.append('        raise JavaException('
+                 "'No methods matching your arguments')\n")
+    return ''.join(lines)
+
+
+def render_cython_class(spec, index):
+    """ Returns the source of the cdef functions calling the compilable
+        methods of an unpacked spec, and of the class using them. `index`
+        numbers the cdef functions, and is returned updated.
+    """
+    clsname = spec['class']
+    pyname = python_name(clsname)
+    calls = ['\n\ncdef jclass j_cls_{0} = NULL\n'.format(pyname)]
+
+    compiled = {}
+    for name in sorted(spec['methods']):
+        sigs = sorted(spec['methods'][name].values(), key=lambda s: s['sig'])
+        if name in spec['fields'] or not _compilable(name, sigs):
+            continue
+        # static and instance overloads can't share a Python function
+        if len(set([s['static'] for s in sigs])) > 1:
+            continue
+        numbers = []
+        for s in sigs:
+            calls.append(_render_call(pyname, index, clsname, name, s))
+            numbers.append(index)
+            index += 1
+        compiled[name] = _render_wrapper(name, sigs, numbers)
+
+    # the other members are the ones of the pure Python bindings
+    # (Cython doesn't support six.with_metaclass on Python 2)
+    source = render_class(spec, exclude=compiled,
+                          bases='JavaClass, metaclass=MetaJavaClass')
+    if compiled:
+        source += '\n' + '\n'.join(
+            [compiled[name] for name in sorted(compiled)])
+    return ''.join(calls) + source, index
+
+
+def render_cython_module(specs):
+    """ Returns the source of a Cython module declaring the classes of the
+        unpacked `specs`, with compiled methods.
+    """
+    parts = [CYTHON_HEADER]
+    index = 0
+    for spec in sorted(specs, key=lambda spec: spec['class']):
+        source, index = render_cython_class(spec, index)
+        parts.append(source)
+    return ''.join(parts)
+
+
+def _is_public(spec):
+    return bool(spec['modifiers'] & MODIFIER_PUBLIC)
+
+
+def generate(patterns, output='.', index=None, cython=False):
+    """ Writes the bindings of the classes matching `patterns` in `output`,
+        one module per Java package. Classes found with a wildcard are
+        skipped if they are not public.
+
+        @param patterns: class names, or `a.b.*` and `a.b.**` wildcards
+        @param output: root directory of the generated packages
+        @param index: ClasspathIndex to expand the wildcards with
+        @param cython: write Cython extensions instead, named after the
+                       packages (`a_b.pyx`)
+        @returns the list of the written files
+    """
+    packages = {}
+    for pattern in patterns:
+        explicit = not pattern.endswith('*')
+        if not explicit and index is None:
+            index = ClasspathIndex()
+        clsnames = [pattern] if explicit else index.expand(pattern)
+        for clsname in clsnames:
+            spec = dump_spec(clsname, packed=False)
+            if explicit or _is_public(spec):
+                package = clsname.rpartition('.')[0]
+                packages.setdefault(package, {})[clsname] = spec
+
+    if cython:
+        return _write_cython(packages, output)
+
+    written = []
+    for package, specs in sorted(packages.items()):
+        directory = output
+        for part in package.split('.'):
+            directory = join(directory, part)
+            if not exists(directory):
+                os.makedirs(directory)
+            init = join(directory, '__init__.py')
+            if not exists(init):
+                io.open(init, 'w', encoding='utf-8').close()
+        filename = join(directory, '__init__.py')
+        with io.open(filename, 'w', encoding='utf-8') as fd:
+            fd.write(render_module(specs.values()))
+        written.append(filename)
+    return written
+
+
+def _write_cython(packages, output):
+    if not exists(output):
+        os.makedirs(output)
+    written = []
+    for name in ('jni.pxi', 'jnius_capi.pxi'):
+        filename = join(output, name)
+        shutil.copyfile(join(dirname(__file__), name), filename)
+        written.append(filename)
+    for package, specs in sorted(packages.items()):
+        filename = join(output, package.replace('.', '_') + '.pyx')
+        with io.open(filename, 'w', encoding='utf-8') as fd:
+            fd.write(render_cython_module(specs.values()))
+        written.append(filename)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m jnius.pregen',
+        description='Generate Python modules declaring Java classes.')
+    parser.add_argument(
+        '--classpath', action='append', default=[],
+        help='classpath to search the classes in (can be repeated)')
+    parser.add_argument(
+        '-o', '--output', default='.',
+        help='root directory of the generated packages')
+    parser.add_argument(
+        '--cython', action='store_true',
+        help='write Cython extensions with compiled method calls')
+    parser.add_argument(
+        'classes', nargs='+',
+        help='class names, or a.b.* / a.b.** wildcards')
+    args = parser.parse_args(argv)
+
+    if args.classpath:
+        # importing jnius started the JVM already, without the classpath:
+        # run again with the classpath in the environment
+        env = dict(os.environ)
+        env['CLASSPATH'] = jnius_config.split_char.join(args.classpath)
+        return subprocess.call(
+            [sys.executable, '-m', 'jnius.pregen', '-o', args.output] +
+            (['--cython'] if args.cython else []) + args.classes, env=env)
+
+    for filename in generate(args.classes, args.output, cython=args.cython):
+        print(filename)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
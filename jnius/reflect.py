@@ -4,14 +4,16 @@ from __future__ import print_function
 from __future__ import division
 __all__ = ('autoclass', 'ensureclass','dump_spec','load_spec','build_cache')
 
-from os.path import dirname, join, exists
-    
+import warnings
+
 from six import with_metaclass
 
 from jnius.jnius import (
     JavaClass, MetaJavaClass, JavaMethod, JavaStaticMethod,
-    JavaField, JavaStaticField, JavaMultipleMethod, find_javaclass
+    JavaField, JavaStaticField, JavaMultipleMethod, JavaException,
+    find_javaclass, direct_buffer_classes, direct_buffer_memoryview
 )
+from jnius.cache import get_spec_cache
 
 
 class Class(with_metaclass(MetaJavaClass, JavaClass)):
@@ -39,14 +41,14 @@ class Class(with_metaclass(MetaJavaClass, JavaClass)):
     getInterfaces = JavaMethod('()[Ljava/lang/Class;')
     getMethod = JavaMethod('(Ljava/lang/String,[Ljava/lang/Class;)Ljava/lang/reflect/Method;')
     getMethods = JavaMethod('()[Ljava/lang/reflect/Method;')
-    getModifiers = JavaMethod('()[I')
+    getModifiers = JavaMethod('()I')
     getName = JavaMethod('()Ljava/lang/String;')
     getPackage = JavaMethod('()Ljava/lang/Package;')
     getProtectionDomain = JavaMethod('()Ljava/security/ProtectionDomain;')
     getResource = JavaMethod('(Ljava/lang/String;)Ljava/net/URL;')
     getResourceAsStream = JavaMethod('(Ljava/lang/String;)Ljava/io/InputStream;')
     getSigners = JavaMethod('()[Ljava/lang/Object;')
-    getSuperclass = JavaMethod('()Ljava/lang/reflect/Class;')
+    getSuperclass = JavaMethod('()Ljava/lang/Class;')
     isArray = JavaMethod('()Z')
     isAssignableFrom = JavaMethod('(Ljava/lang/reflect/Class;)Z')
     isInstance = JavaMethod('(Ljava/lang/Object;)Z')
@@ -149,107 +151,301 @@ def bean_getter(s):
     return (s.startswith('get') and len(s) > 3 and s[3].isupper()) or (s.startswith('is') and len(s) > 2 and s[2].isupper())
 
 
-def autoclass(clsname, cached=True):
+def autoclass(clsname, cached=True, lazy=False, release_gil=None):
+    """ Returns a JavaClass reflecting the Java class `clsname`.
+
+        With `lazy`, the members are only created on first access, from the
+        cached spec if there is one, or by querying the class for the
+        accessed name.
+
+        `release_gil` sets which methods of the class release the GIL during
+        their calls: all of them (True, the default), none (False), or the
+        ones named in a collection. It applies to the class, which is shared
+        by all the callers of autoclass.
+    """
     jniname = clsname.replace('.', '/')
     cls = MetaJavaClass.get_javaclass(jniname)
-    if cls:
-        return cls
-    
-    if cached:
-        #: Try to load from cache
-        return cached_autoclass(clsname,mem=False) # Ignore mem, we just tried
+    if not cls:
+        if lazy:
+            cls = lazy_autoclass(clsname, cached)
+        elif cached:
+            #: Try to load from cache
+            cls = cached_autoclass(clsname,mem=False) # Ignore mem, we just tried
+        else:
+            cls = load_spec(dump_spec(clsname))
 
-    classDict = {}
+    if release_gil is not None:
+        MetaJavaClass.set_release_gil(cls, release_gil)
+    return cls
 
-    # c = Class.forName(clsname)
-    c = find_javaclass(clsname)
-    if c is None:
-        raise Exception('Java class {0} not found'.format(c))
-        return None
 
-    constructors = []
+MODIFIER_STATIC = 0x0008
+
+_introspect = None
+
+
+def get_introspect():
+    """ Returns the binding of the org.jnius.Introspect helper, or None if
+        the pyjnius classes are not available in the classpath.
+    """
+    global _introspect
+    if _introspect is None:
+        try:
+            class Introspect(with_metaclass(MetaJavaClass, JavaClass)):
+                __javaclass__ = 'org/jnius/Introspect'
+
+                describe = JavaStaticMethod(
+                    '(Ljava/lang/Class;)Ljava/lang/String;')
+                describeClass = JavaStaticMethod(
+                    '(Ljava/lang/Class;)Ljava/lang/String;')
+                describeMembers = JavaStaticMethod(
+                    '(Ljava/lang/Class;Ljava/lang/String;)Ljava/lang/String;')
+            _introspect = Introspect
+        except JavaException:
+            _introspect = False
+    return _introspect or None
+
+
+_flatten = None
+
+#: the largest number of elements read at once when iterating over an iterator
+_MAX_CHUNK = 1024
+
+
+def get_flatten():
+    """ Returns the binding of the org.jnius.Flatten helper, or None if the
+        pyjnius classes are not available in the classpath.
+    """
+    global _flatten
+    if _flatten is None:
+        try:
+            class Flatten(with_metaclass(MetaJavaClass, JavaClass)):
+                __javaclass__ = 'org/jnius/Flatten'
+
+                fromIterable = JavaStaticMethod(
+                    '(Ljava/lang/Iterable;)Ljava/lang/Object;')
+                fromIterator = JavaStaticMethod(
+                    '(Ljava/util/Iterator;)Ljava/lang/Object;')
+                take = JavaStaticMethod(
+                    '(Ljava/util/Iterator;I)Ljava/lang/Object;')
+                fromMap = JavaStaticMethod(
+                    '(Ljava/util/Map;)[Ljava/lang/Object;')
+            _flatten = Flatten
+        except JavaException:
+            _flatten = False
+    return _flatten or None
+
+
+def _as_list(array):
+    # the elements of an array returned by Java, converted as a list or as a
+    # view of the array
+    return array if isinstance(array, list) else array.tolist()
+
+
+def _iterator_tolist(self):
+    """ Returns the remaining elements of a java.util.Iterator as a list, in
+        one call when org.jnius.Flatten is available.
+    """
+    flatten = get_flatten()
+    if flatten is not None:
+        return _as_list(flatten.fromIterator(self))
+    ret = []
+    while self.hasNext():
+        ret.append(self.next())
+    return ret
+
+
+def _iterator_iter(self):
+    """ Iterates lazily over the remaining elements of a java.util.Iterator,
+        by chunks of growing size when org.jnius.Flatten is available: leaving
+        the loop early consumes at most as many elements as were yielded.
+    """
+    flatten = get_flatten()
+    if flatten is None:
+        while self.hasNext():
+            yield self.next()
+        return
+    size = 1
+    while True:
+        chunk = _as_list(flatten.take(self, size))
+        for element in chunk:
+            yield element
+        if len(chunk) < size:
+            return
+        size = min(size * 2, _MAX_CHUNK)
+
+
+def _iterable_tolist(self):
+    """ Returns the elements of a java.lang.Iterable as a list, in one call
+        when org.jnius.Flatten is available.
+    """
+    flatten = get_flatten()
+    if flatten is not None:
+        return _as_list(flatten.fromIterable(self))
+    return _iterator_tolist(self.iterator())
+
+
+def _map_todict(self):
+    """ Returns the entries of a java.util.Map as a dict, in one call when
+        org.jnius.Flatten is available.
+    """
+    flatten = get_flatten()
+    if flatten is not None:
+        keys, values = flatten.fromMap(self)
+        return dict(zip(_as_list(keys), _as_list(values)))
+    return dict((entry.getKey(), entry.getValue())
+                for entry in self.entrySet().toArray())
+
+
+def _new_spec(clsname):
+    return {
+        'class': clsname,
+        'modifiers': 0,
+        'constructors': {},
+        'interfaces': [],
+        'fields': {},
+        'methods': {},
+        #'extends': 'java.lang.Object', # Superclass
+    }
+
+
+def _add_constructor(spec, sig, mods, varargs):
+    spec['constructors'][sig] = {
+        'vargs': varargs,
+        'modifiers': mods,
+        'sig': sig,
+    }
+
+
+def _add_method(spec, name, sig, mods, varargs):
+    spec['methods'].setdefault(name, {})[sig] = {
+        'vargs': varargs,
+        'static': bool(mods & MODIFIER_STATIC),
+        'modifiers': mods,
+        'sig': sig,
+        'name': name,
+    }
+
+
+def _add_field(spec, name, sig, mods):
+    spec['fields'][name] = {
+        'static': bool(mods & MODIFIER_STATIC),
+        'modifiers': mods,
+        'name': name,
+        'sig': sig,
+    }
+
+
+def parse_description(clsname, description):
+    """ Builds a spec out of the packed string returned by
+        org.jnius.Introspect.describe().
+    """
+    spec = _new_spec(clsname)
+    for line in description.splitlines():
+        record = line.split('\t')
+        kind = record[0]
+        if kind == 'M':
+            mods, varargs, name, sig = record[1:]
+            _add_method(spec, name, sig, int(mods), varargs == '1')
+        elif kind == 'F':
+            mods, name, sig = record[1:]
+            _add_field(spec, name, sig, int(mods))
+        elif kind == 'C':
+            mods, varargs, sig = record[1:]
+            _add_constructor(spec, sig, int(mods), varargs == '1')
+        elif kind == 'I':
+            spec['interfaces'].append(record[1])
+        elif kind == 'X':
+            spec['modifiers'] = int(record[1])
+    return spec
+
+
+def _reflect_header(spec, c):
+    spec['modifiers'] = c.getModifiers()
+
     for constructor in c.getConstructors():
         sig = '({0})V'.format(
             ''.join([get_signature(x) for x in constructor.getParameterTypes()]))
-        constructors.append((sig, constructor.isVarArgs()))
-    classDict['__javaconstructor__'] = constructors
-
-    methods = c.getMethods()
-    methods_name = [x.getName() for x in methods]
-    for index, method in enumerate(methods):
-        name = methods_name[index]
-        if name in classDict:
-            continue
-        count = methods_name.count(name)
-
-        # only one method available
-        if count == 1:
-            static = Modifier.isStatic(method.getModifiers())
-            varargs = method.isVarArgs()
-            sig = '({0}){1}'.format(
-                ''.join([get_signature(x) for x in method.getParameterTypes()]),
-                get_signature(method.getReturnType()))
-            cls = JavaStaticMethod if static else JavaMethod
-            classDict[name] = cls(sig, varargs=varargs)
-            if name != 'getClass' and bean_getter(name) and len(method.getParameterTypes()) == 0:
-                lowername = lower_name(name[3:])
-                classDict[lowername] = (lambda n: property(lambda self: getattr(self, n)()))(name)
-            continue
-
-        # multiple signatures
-        signatures = []
-        for index, subname in enumerate(methods_name):
-            if subname != name:
-                continue
-            method = methods[index]
-            sig = '({0}){1}'.format(
-                ''.join([get_signature(x) for x in method.getParameterTypes()]),
-                get_signature(method.getReturnType()))
-            '''
-            print 'm', name, sig, method.getModifiers()
-            m = method.getModifiers()
-            print 'Public', Modifier.isPublic(m)
-            print 'Private', Modifier.isPrivate(m)
-            print 'Protected', Modifier.isProtected(m)
-            print 'Static', Modifier.isStatic(m)
-            print 'Final', Modifier.isFinal(m)
-            print 'Synchronized', Modifier.isSynchronized(m)
-            print 'Volatile', Modifier.isVolatile(m)
-            print 'Transient', Modifier.isTransient(m)
-            print 'Native', Modifier.isNative(m)
-            print 'Interface', Modifier.isInterface(m)
-            print 'Abstract', Modifier.isAbstract(m)
-            print 'Strict', Modifier.isStrict(m)
-            '''
-            signatures.append((sig, Modifier.isStatic(method.getModifiers()), method.isVarArgs()))
-
-        classDict[name] = JavaMultipleMethod(signatures)
-
-    for iclass in c.getInterfaces():
-        if iclass.getName() == 'java.util.List':
-            classDict['__getitem__'] = lambda self, index: self.get(index)
-            classDict['__len__'] = lambda self: self.size()
-            break
-
+        _add_constructor(spec, sig, constructor.getModifiers(),
+                         constructor.isVarArgs())
+
+    # walk the superclasses and the superinterfaces, to report the same
+    # interfaces as Introspect.describe()
+    pending = []
+    while c is not None:
+        pending.append(c)
+        c = c.getSuperclass()
+    while pending:
+        for iclass in pending.pop(0).getInterfaces():
+            name = iclass.getName()
+            if name not in spec['interfaces']:
+                spec['interfaces'].append(name)
+                pending.append(iclass)
+
+
+def _reflect_method(spec, method, name):
+    sig = '({0}){1}'.format(
+        ''.join([get_signature(x) for x in method.getParameterTypes()]),
+        get_signature(method.getReturnType()))
+    _add_method(spec, name, sig, method.getModifiers(), method.isVarArgs())
+
+
+def _reflect_field(spec, field, name):
+    _add_field(spec, name, get_signature(field.getType()),
+               field.getModifiers())
+
+
+def reflect_spec(c, clsname):
+    """ Builds a spec using the java.lang.reflect API from Python. It is used
+        when org.jnius.Introspect is not available, and costs a JNI round trip
+        per member, parameter and return type.
+    """
+    spec = _new_spec(clsname)
+    _reflect_header(spec, c)
+    for method in c.getMethods():
+        _reflect_method(spec, method, method.getName())
     for field in c.getFields():
-        static = Modifier.isStatic(field.getModifiers())
-        sig = get_signature(field.getType())
-        cls = JavaStaticField if static else JavaField
-        classDict[field.getName()] = cls(sig)
+        _reflect_field(spec, field, field.getName())
+    return spec
 
-    classDict['__javaclass__'] = clsname.replace('.', '/')
 
-    return MetaJavaClass.__new__(
-        MetaJavaClass,
-        clsname,  # .replace('.', '_'),
-        (JavaClass, ),
-        classDict)
+def describe_class(c, clsname):
+    """ Builds a spec of the class `c` without any method or field, for the
+        lazy classes.
+    """
+    introspect = get_introspect()
+    if introspect is not None:
+        return parse_description(clsname, introspect.describeClass(c))
+    spec = _new_spec(clsname)
+    _reflect_header(spec, c)
+    return spec
+
+
+def describe_members(c, clsname, name):
+    """ Builds a spec of the class `c` with only the methods and fields
+        called `name`, and nothing else.
+    """
+    introspect = get_introspect()
+    if introspect is not None:
+        return parse_description(
+            clsname, introspect.describeMembers(c, name))
+    spec = _new_spec(clsname)
+    for method in c.getMethods():
+        if method.getName() == name:
+            _reflect_method(spec, method, name)
+    for field in c.getFields():
+        if field.getName() == name:
+            _reflect_field(spec, field, name)
+    return spec
 
 
 def dump_spec(clsname, packed=True):
     """ Makes a spec of a JavaClass that can be stored and used passed to load_spec to statically define a JavaClass. 
          Allows avoiding having to load everything via the JNI (which is slow) every time.
-         
+
+        The whole class is described in a single call to
+        org.jnius.Introspect when the pyjnius classes are in the classpath.
+
         @param clsname: dottect object name of java class
         @returns spec
     """
@@ -258,87 +454,13 @@ def dump_spec(clsname, packed=True):
     if c is None:
         raise Exception('Java class {0} not found'.format(c))
         return None
-    
-    spec = {
-        'class': clsname,
-        'constructors': {},
-        'interfaces': [],
-        'fields': {},
-        'methods': {},
-        #'extends': 'java.lang.Object', # Superclass
-    }
 
-    #: Get spec for each constructor
-    for constructor in c.getConstructors():
-        sig = '({0})V'.format(
-            ''.join([get_signature(x) for x in constructor.getParameterTypes()]))
-        spec['constructors'][sig] = {
-            'vargs':  constructor.isVarArgs(),
-            'sig': sig,
-        }
-    
-    #: Get spec for each method
-    methods = c.getMethods()
-    methods_name = [x.getName() for x in methods]
-    for index, method in enumerate(methods):
-        name = methods_name[index]
-        if name in spec['methods']:
-            continue
-        count = methods_name.count(name)
-        
-        spec['methods'][name] = {}
-        for index, subname in enumerate(methods_name):
-            if subname != name:
-                continue
-            method = methods[index]
-            sig = '({0}){1}'.format(
-                ''.join([get_signature(x) for x in method.getParameterTypes()]),
-                get_signature(method.getReturnType()))
-
-            mods = method.getModifiers()
-            spec['methods'][name][sig] = {
-                'vargs': method.isVarArgs(),
-                #'public': Modifier.isPublic(mods),
-                #'protected':Modifier.isProtected(mods),
-                #'private': Modifier.isPrivate(mods),
-                'static': Modifier.isStatic(mods),
-                #'final': Modifier.isFinal(mods),
-                #'synchronized': Modifier.isSynchronized(mods),
-                #'volatile': Modifier.isVolatile(mods),
-                #'transient': Modifier.isTransient(mods),
-                #'native': Modifier.isNative(mods),
-                #'abstract': Modifier.isAbstract(mods),
-                #'strict': Modifier.isStrict(mods),
-                'sig': sig,
-                'name': name,
-            }
-
-    #: Get spec for each field
-    for field in c.getFields():
-        mods = field.getModifiers()
-        
-        spec['fields'][field.getName()] = {
-            #'public': Modifier.isPublic(mods),
-            #'protected':Modifier.isProtected(mods),
-            #'private': Modifier.isPrivate(mods),
-            'static': Modifier.isStatic(mods),
-            #'final': Modifier.isFinal(mods),
-            #'synchronized': Modifier.isSynchronized(mods),
-            #'volatile': Modifier.isVolatile(mods),
-            #'transient': Modifier.isTransient(mods),
-            #'native': Modifier.isNative(mods),
-            #'abstract': Modifier.isAbstract(mods),
-            #'strict': Modifier.isStrict(mods),
-            'name': field.getName(),
-            'sig': get_signature(field.getType()),
-        }
-        
-    #: Get spec reference for each interface
-    for iclass in c.getInterfaces():
-        spec['interfaces'].append(iclass.getName())
-
-    #: Get spec reference for the superclass interface
-    #spec['extends'] = c.getSuperclass().getName()
+    introspect = get_introspect()
+    if introspect is not None:
+        spec = parse_description(clsname, introspect.describe(c))
+    else:
+        spec = reflect_spec(c, clsname)
+
     if packed:
         return pack_spec(spec)
     return spec
@@ -349,12 +471,12 @@ def pack_spec(spec):
         into a tuple of tuples.
     """
     methods = []
-    for name, specs in spec['methods'].iteritems():
+    for name, specs in spec['methods'].items():
         sigs = [(s['sig'], s['static'], s['vargs']) for s in specs.values()]
         methods.append((name, tuple(sigs)))
 
     fields = []
-    for name, s in spec['fields'].iteritems():
+    for name, s in spec['fields'].items():
         fields.append((name, s['sig'], s['static']))
 
     return (
@@ -366,12 +488,65 @@ def pack_spec(spec):
         tuple(fields),
     )
 
-def load_spec(spec):
+def _class_attributes(javaclass, constructors, interfaces):
+    #: Add type and constructors
+    attributes = {
+        '__javaclass__': javaclass.replace('.','/'),
+        '__javaconstructor__': constructors,
+    }
+
+    #: Add support for any interfaces, of the class itself for the objects
+    #: returned as an interface
+    interfaces = set(interfaces)
+    interfaces.add(javaclass.replace('/', '.'))
+    if 'java.util.List' in interfaces:
+        #: Update is slow
+        attributes['__getitem__'] = lambda self, index: self.get(index)
+    if 'java.util.Collection' in interfaces or 'java.util.Map' in interfaces:
+        attributes['__len__'] = lambda self: self.size()
+    if 'java.lang.Iterable' in interfaces:
+        attributes['tolist'] = _iterable_tolist
+        attributes['__iter__'] = lambda self: _iterator_iter(self.iterator())
+    if 'java.util.Iterator' in interfaces:
+        attributes['tolist'] = _iterator_tolist
+        attributes['__iter__'] = _iterator_iter
+    if javaclass.replace('.', '/') in direct_buffer_classes:
+        attributes['memoryview'] = lambda self: direct_buffer_memoryview(self)
+    if 'java.util.Map' in interfaces:
+        attributes['todict'] = _map_todict
+        attributes['__iter__'] = lambda self: _iterator_iter(
+            self.keySet().iterator())
+
+    return attributes
+
+
+def _create_method(m):
+    if len(m) > 1:
+        return JavaMultipleMethod(list(m))
+    ms = m[0]
+    return (JavaStaticMethod if ms[1] else JavaMethod)(ms[0], varargs=ms[2])
+
+
+def _create_field(f):
+    return (JavaStaticField if f[2] else JavaField)(f[1])
+
+
+def _is_property_getter(name, m):
+    return len(m) == 1 and name != 'getClass' and bean_getter(name) and \
+        m[0][0].startswith('()')
+
+
+def _create_property(getter):
+    return property(lambda self: getattr(self, getter)())
+
+
+def load_spec(spec, lazy=False):
     """ Loads a JavaClass from a spec. Returns the same output as  autoclass, 
         but instead of using the JNI to build the class via reflection it loads the previously 
         reflected values from the spec, allowing you to "cache" a JavaClass definition.
          
         @param spec: spec dictonary from dump_spec
+        @param lazy: create the members on first access only
         @returns JavaClass instance that should equal the autoclass output
     """
 
@@ -380,31 +555,29 @@ def load_spec(spec):
     cls = MetaJavaClass.get_javaclass(javaclass.replace('.', '/'))
     if cls:
         return cls
-    
-    #: Add type and constructors
-    attributes = {
-        '__javaclass__': javaclass.replace('.','/'),
-        '__javaconstructor__': constructors,
-    }
-    
-    #: Add support for any interfaces
-    if 'java.util.List' in interfaces:
-        #: Update is slow
-        attributes['__getitem__'] = lambda self, index: self.get(index)
-        attributes['__len__'] = lambda self: self.size()
+
+    attributes = _class_attributes(javaclass, constructors, interfaces)
+
+    if lazy:
+        return _lazy_class(javaclass, attributes,
+                           LazyMembers(javaclass, methods, fields))
 
     #: Add methods
+    getters = []
     for name, m in methods:
-        if len(m) > 1:
-            method = JavaMultipleMethod(list(m))
-        else:
-            ms = m[0]
-            method = (JavaStaticMethod if ms[1] else JavaMethod)(ms[0])
-        attributes[name] = method
+        attributes[name] = _create_method(m)
+        if _is_property_getter(name, m):
+            getters.append(name)
 
     #: Add fields
     for f in fields:
-        attributes[f[0]] = (JavaStaticField if f[2] else JavaField)(f[1])
+        attributes[f[0]] = _create_field(f)
+
+    #: Add bean properties, without hiding a real member
+    for name in getters:
+        lowername = lower_name(name[3:] if name.startswith('get') else name[2:])
+        if lowername not in attributes:
+            attributes[lowername] = _create_property(name)
 
     return MetaJavaClass.__new__(
         MetaJavaClass,
@@ -413,78 +586,163 @@ def load_spec(spec):
         attributes
     )
 
-_CACHE_FILE = join(dirname(__file__),'reflect.javac')
-_SPEC_CACHE = {}
 
-def cached_autoclass(clsname, mem=True, save=True, output='msgpack', flush=False):
-    """ Attempt to load the class from cache. If it doesn't exist,  
-        create the cache.
-        
-        Cache creates a json file called 'reflect.javac' in this folder.
-        
+def lazy_autoclass(clsname, cached=True):
+    """ Returns a JavaClass whose members are created on first access, so
+        that the cost of a class depends on the members used, not on the
+        size of the Java class.
+
+        The members come from the spec cache when the class is there;
+        otherwise, the Java class is queried for each accessed name.
+    """
+    cls = MetaJavaClass.get_javaclass(clsname.replace('.', '/'))
+    if cls:
+        return cls
+
+    store = get_spec_cache() if cached else None
+    spec = store.get(clsname) if store is not None else None
+    if spec is not None:
+        return load_spec(spec, lazy=True)
+
+    c = find_javaclass(clsname)
+    javaclass, constructors, interfaces, _, _ = pack_spec(
+        describe_class(c, clsname))
+    return _lazy_class(
+        javaclass, _class_attributes(javaclass, constructors, interfaces),
+        LazyMembers(javaclass, c=c))
+
+
+class LazyMembers(object):
+    """ Creates the members of a lazy class, from the methods and fields of
+        a packed spec, or when they are not given, by querying the Java class
+        `c` for each name.
+    """
+
+    def __init__(self, clsname, methods=None, fields=None, c=None):
+        super(LazyMembers, self).__init__()
+        self.clsname = clsname
+        self.c = c
+        self.methods = None if methods is None else dict(methods)
+        self.fields = None if fields is None else \
+            dict([(f[0], f) for f in fields])
+        self.queried = {}
+        self.missing = set()
+
+    def lookup(self, name):
+        """ Returns the signatures of the methods called `name`, and the
+            field called `name`, from the packed spec format.
+        """
+        if self.methods is not None:
+            return self.methods.get(name), self.fields.get(name)
+        if name not in self.queried:
+            _, _, _, methods, fields = pack_spec(
+                describe_members(self.c, self.clsname, name))
+            self.queried[name] = (methods[0][1] if methods else None,
+                                  fields[0] if fields else None)
+        return self.queried[name]
+
+    def create(self, name):
+        """ Returns a new member for `name`, or None if there is none.
+        """
+        if name in self.missing:
+            return None
+
+        #: Fields hide the methods of the same name, like in load_spec
+        m, f = self.lookup(name)
+        if f:
+            return _create_field(f)
+        if m:
+            return _create_method(m)
+
+        #: Bean property
+        suffix = name[:1].upper() + name[1:]
+        if lower_name(suffix) == name:
+            for getter in ('get' + suffix, 'is' + suffix):
+                m, f = self.lookup(getter)
+                if m and _is_property_getter(getter, m):
+                    return _create_property(getter)
+
+        self.missing.add(name)
+        return None
+
+
+def _lazy_member(cls, name):
+    if name.startswith('__'):
+        raise AttributeError(name)
+    value = cls.__javamembers__.create(name)
+    if value is None:
+        raise AttributeError('{0} has no attribute {1}'.format(
+            cls.__javaclass__, name))
+    MetaJavaClass.add_member(cls, name, value)
+
+
+def _lazy_getattr(self, name):
+    _lazy_member(type(self), name)
+    return getattr(self, name)
+
+
+class LazyMetaJavaClass(MetaJavaClass):
+    """ Metaclass of the lazy classes, for the access to the static members
+        through the class.
+    """
+
+    def __getattr__(cls, name):
+        _lazy_member(cls, name)
+        return getattr(cls, name)
+
+
+def _lazy_class(javaclass, attributes, members):
+    attributes['__javamembers__'] = members
+    attributes['__getattr__'] = _lazy_getattr
+    return MetaJavaClass.__new__(
+        LazyMetaJavaClass,
+        javaclass,
+        (JavaClass, ),
+        attributes
+    )
+
+
+def cached_autoclass(clsname, mem=True, save=True, flush=False):
+    """ Attempt to load the class spec from the spec cache (see
+        :mod:`jnius.cache`). If it isn't there, introspect the class and
+        store its spec.
+
         @param: clsname: JavaClass to load
         @param: mem: Check in memory for class first
-        @param: flush: Ignore cache file if one exists
-        @param: output: Cache file type to use (pickle or json)
-        @param: save: Update/create the cache file if necessary
+        @param: flush: Ignore the cached spec if one exists
+        @param: save: Store the spec if necessary
     """
     #: Try memory first
-    global _SPEC_CACHE
     if mem:
         cls = MetaJavaClass.get_javaclass(clsname.replace('.', '/'))
         if cls:
             return cls
-    pargs = {}
-    if output=='json':
-        import json as pickle
-    elif output=='msgpack':
-        import msgpack as pickle
-    else:
-        import cPickle as pickle
-        pargs = {"protocol": pickle.HIGHEST_PROTOCOL}
-        
-    #: Try to load from file
-    specs = {} if flush else _SPEC_CACHE
-    
-    if not flush and not specs and exists(_CACHE_FILE):
-        with open(_CACHE_FILE,'rb') as f:
-            try:
-                specs = pickle.load(f)
-                _SPEC_CACHE = specs
-            except:
-                pass #: Warn of failure at least? 
-    
-    #: If spec cache doesn't exist, create it
-    if clsname not in specs:
-        #: Create spec
-        specs[clsname] = dump_spec(clsname)
-        
-        #: Save to  javac
-        if save:
-            try:
-                with open(_CACHE_FILE,'wb') as f:
-                    pickle.dump(specs, f, **pargs)
-            except:
-                pass #: Warn of failure at least?
-        
-    #: Load from spec
-    return load_spec(specs[clsname])
 
+    store = get_spec_cache()
+    if store is None:
+        return load_spec(dump_spec(clsname))
 
-def build_cache(clsnames, output='pickle'):
-    """ Generates a javac file containing all the JavaClass names given.
+    #: Try to load from the store
+    spec = None if flush else store.get(clsname)
 
-    """
-    if output=='json':
-        import json as pickle
-        pargs = {}
-    else:
-        import cPickle as pickle
-        pargs = {"protocol":pickle.HIGHEST_PROTOCOL}
+    if spec is None:
+        spec = dump_spec(clsname)
+        if save:
+            try:
+                store.put(clsname, spec)
+            except (IOError, OSError) as e:
+                warnings.warn('Unable to cache the spec of {0}: {1}'.format(
+                    clsname, e))
 
-    specs = {n:dump_spec(n,mem=False,save=False,flush=True) for n in clsnames}
+    return load_spec(spec)
 
-    #: Save
-    with open(_CACHE_FILE,'w') as f:
-        pickle.dump(specs,f,**pargs)
 
+def build_cache(clsnames):
+    """ Stores the spec of all the JavaClass names given in the spec cache,
+        replacing the ones already there.
+    """
+    store = get_spec_cache()
+    if store is None:
+        raise Exception('The spec cache is disabled')
+    for clsname in clsnames:
+        store.put(clsname, dump_spec(clsname))
@@ -0,0 +1,202 @@
+package org.jnius;
+import java.lang.reflect.Array;
+import java.util.ArrayList;
+import java.util.Arrays;
+import java.util.Collection;
+import java.util.HashMap;
+import java.util.HashSet;
+import java.util.Iterator;
+import java.util.Map;
+
+/**
+ * Flatten the collections and the maps into arrays in a single call.
+ *
+ * Iterating a collection from Python used to cost a JNI round trip per
+ * element, and the conversion of a boxed element. Here, the elements are
+ * copied on the Java side into one array, whose type depends on the
+ * elements: an array of primitives when all the elements are boxes of the
+ * same primitive type (int[] for Integers, double[] for Doubles...), a
+ * String[] when they are all strings (or null), or else an Object[]. These
+ * arrays are converted at once by pyjnius. The iterators are iterated by
+ * chunks of growing size through take(), to stay lazy.
+ *
+ * The other way, toList(), toSet() and toMap() build the collections given
+ * for the Python lists, sets and dicts from such arrays.
+ */
+public class Flatten {
+
+    /**
+     * The elements of an Iterable, in the order of its iterator.
+     */
+    public static Object fromIterable(Iterable iterable) {
+        if (iterable instanceof Collection) {
+            return narrow(((Collection) iterable).toArray());
+        }
+        return fromIterator(iterable.iterator());
+    }
+
+    /**
+     * The remaining elements of an Iterator.
+     */
+    public static Object fromIterator(Iterator iterator) {
+        ArrayList elements = new ArrayList();
+        while (iterator.hasNext()) {
+            elements.add(iterator.next());
+        }
+        return narrow(elements.toArray());
+    }
+
+    /**
+     * The next elements of an Iterator, at most max of them: fewer only when
+     * the iterator is exhausted.
+     */
+    public static Object take(Iterator iterator, int max) {
+        ArrayList elements = new ArrayList(Math.min(max, 1024));
+        while (elements.size() < max && iterator.hasNext()) {
+            elements.add(iterator.next());
+        }
+        return narrow(elements.toArray());
+    }
+
+    /**
+     * The keys and the values of a Map, as an array of two arrays, in the
+     * order of its entries.
+     */
+    public static Object[] fromMap(Map map) {
+        Object[] keys = new Object[map.size()];
+        Object[] values = new Object[keys.length];
+        int i = 0;
+        for (Iterator it = map.entrySet().iterator(); it.hasNext(); i++) {
+            Map.Entry entry = (Map.Entry) it.next();
+            keys[i] = entry.getKey();
+            values[i] = entry.getValue();
+        }
+        return new Object[] { narrow(keys), narrow(values) };
+    }
+
+    /**
+     * The elements as an array of primitives, a String[], or themselves.
+     */
+    static Object narrow(Object[] elements) {
+        if (elements.length == 0) {
+            return elements;
+        }
+        // the class of all the elements, if they are of the same class
+        Class cls = elements[0] == null ? null : elements[0].getClass();
+        boolean strings = true;
+        for (int i = 0; i < elements.length; i++) {
+            Object element = elements[i];
+            if (element != null && element.getClass() != String.class) {
+                strings = false;
+            }
+            if (element == null || element.getClass() != cls) {
+                cls = null;
+            }
+        }
+        int n = elements.length;
+        if (strings) {
+            String[] ret = new String[n];
+            System.arraycopy(elements, 0, ret, 0, n);
+            return ret;
+        } else if (cls == Integer.class) {
+            int[] ret = new int[n];
+            for (int i = 0; i < n; i++) {
+                ret[i] = ((Integer) elements[i]).intValue();
+            }
+            return ret;
+        } else if (cls == Long.class) {
+            long[] ret = new long[n];
+            for (int i = 0; i < n; i++) {
+                ret[i] = ((Long) elements[i]).longValue();
+            }
+            return ret;
+        } else if (cls == Double.class) {
+            double[] ret = new double[n];
+            for (int i = 0; i < n; i++) {
+                ret[i] = ((Double) elements[i]).doubleValue();
+            }
+            return ret;
+        } else if (cls == Float.class) {
+            float[] ret = new float[n];
+            for (int i = 0; i < n; i++) {
+                ret[i] = ((Float) elements[i]).floatValue();
+            }
+            return ret;
+        } else if (cls == Short.class) {
+            short[] ret = new short[n];
+            for (int i = 0; i < n; i++) {
+                ret[i] = ((Short) elements[i]).shortValue();
+            }
+            return ret;
+        } else if (cls == Boolean.class) {
+            boolean[] ret = new boolean[n];
+            for (int i = 0; i < n; i++) {
+                ret[i] = ((Boolean) elements[i]).booleanValue();
+            }
+            return ret;
+        }
+        // the bytes and chars are given as Objects, a byte[] or char[] being
+        // converted to Python as unsigned bytes or as strings
+        return elements;
+    }
+
+    /**
+     * An ArrayList of the elements of an array.
+     */
+    public static ArrayList toList(Object array) {
+        return new ArrayList(Arrays.asList(box(array)));
+    }
+
+    /**
+     * A HashSet of the elements of an array.
+     */
+    public static HashSet toSet(Object array) {
+        return new HashSet(Arrays.asList(box(array)));
+    }
+
+    /**
+     * A HashMap of the keys and the values of two arrays of the same length.
+     */
+    public static HashMap toMap(Object keys, Object values) {
+        Object[] k = box(keys);
+        Object[] v = box(values);
+        HashMap ret = new HashMap(Math.max(16, (int) (k.length / .75f) + 1));
+        for (int i = 0; i < k.length; i++) {
+            ret.put(k[i], v[i]);
+        }
+        return ret;
+    }
+
+    /**
+     * The elements of an array, boxed if it is an array of primitives. The
+     * elements of a long[] are boxed as Integers when they all fit, as the
+     * Python ints given for an Object, or else all as Longs, so that the
+     * collection holds a single box type.
+     */
+    static Object[] box(Object array) {
+        if (array instanceof Object[]) {
+            return (Object[]) array;
+        }
+        int n = Array.getLength(array);
+        Object[] ret = new Object[n];
+        if (array instanceof long[]) {
+            long[] longs = (long[]) array;
+            boolean ints = true;
+            for (int i = 0; i < n && ints; i++) {
+                ints = longs[i] == (int) longs[i];
+            }
+            for (int i = 0; i < n; i++) {
+                if (ints) {
+                    ret[i] = Integer.valueOf((int) longs[i]);
+                } else {
+                    ret[i] = Long.valueOf(longs[i]);
+                }
+            }
+            return ret;
+        }
+        for (int i = 0; i < n; i++) {
+            ret[i] = Array.get(array, i);
+        }
+        return ret;
+    }
+}
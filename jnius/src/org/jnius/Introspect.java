@@ -0,0 +1,163 @@
+package org.jnius;
+import java.lang.reflect.Constructor;
+import java.lang.reflect.Field;
+import java.lang.reflect.Method;
+import java.util.ArrayList;
+import java.util.List;
+
+/**
+ * Describe a Java class in a single call.
+ *
+ * The reflection done by autoclass() used to cost one JNI round trip per
+ * method, parameter and return type. Here, everything is collected on the
+ * Java side, and returned as one packed string, one record per line, the
+ * fields of a record being separated by a tab:
+ *
+ *   X  modifiers                              the class itself
+ *   I  name                                   an implemented interface
+ *   C  modifiers  varargs  signature          a public constructor
+ *   M  modifiers  varargs  name  signature    a public method
+ *   F  modifiers  name  signature             a public field
+ *
+ * Interfaces are listed transitively (including the ones implemented by the
+ * superclasses and the superinterfaces), in the dotted form returned by
+ * Class.getName(). Signatures are in the JNI format.
+ *
+ * describeClass() and describeMembers() return a part of the records only,
+ * for the lazy classes of autoclass(), which resolve their members on first
+ * access.
+ */
+public class Introspect {
+
+    public static String describe(Class cls) {
+        StringBuilder sb = new StringBuilder();
+        header(sb, cls);
+
+        Method[] methods = cls.getMethods();
+        for (int i = 0; i < methods.length; i++) {
+            method(sb, methods[i]);
+        }
+
+        Field[] fields = cls.getFields();
+        for (int i = 0; i < fields.length; i++) {
+            field(sb, fields[i]);
+        }
+
+        return sb.toString();
+    }
+
+    /**
+     * Describe only the class, its interfaces and its constructors.
+     */
+    public static String describeClass(Class cls) {
+        return header(new StringBuilder(), cls).toString();
+    }
+
+    /**
+     * Describe only the public methods and fields called name.
+     */
+    public static String describeMembers(Class cls, String name) {
+        StringBuilder sb = new StringBuilder();
+
+        Method[] methods = cls.getMethods();
+        for (int i = 0; i < methods.length; i++) {
+            if (methods[i].getName().equals(name))
+                method(sb, methods[i]);
+        }
+
+        Field[] fields = cls.getFields();
+        for (int i = 0; i < fields.length; i++) {
+            if (fields[i].getName().equals(name))
+                field(sb, fields[i]);
+        }
+
+        return sb.toString();
+    }
+
+    public static String signature(Class cls) {
+        if (cls.isArray())
+            return cls.getName().replace('.', '/');
+        if (cls.isPrimitive()) {
+            if (cls == Void.TYPE) return "V";
+            if (cls == Boolean.TYPE) return "Z";
+            if (cls == Byte.TYPE) return "B";
+            if (cls == Character.TYPE) return "C";
+            if (cls == Short.TYPE) return "S";
+            if (cls == Integer.TYPE) return "I";
+            if (cls == Long.TYPE) return "J";
+            if (cls == Float.TYPE) return "F";
+            if (cls == Double.TYPE) return "D";
+        }
+        return "L" + cls.getName().replace('.', '/') + ";";
+    }
+
+    static List<Class> interfaces(Class cls) {
+        List<Class> result = new ArrayList<Class>();
+        List<Class> pending = new ArrayList<Class>();
+        for (Class c = cls; c != null; c = c.getSuperclass()) {
+            pending.add(c);
+        }
+        while (!pending.isEmpty()) {
+            Class c = (Class) pending.remove(0);
+            Class[] ifaces = c.getInterfaces();
+            for (int i = 0; i < ifaces.length; i++) {
+                if (!result.contains(ifaces[i])) {
+                    result.add(ifaces[i]);
+                    pending.add(ifaces[i]);
+                }
+            }
+        }
+        return result;
+    }
+
+    static StringBuilder header(StringBuilder sb, Class cls) {
+        record(sb, "X").append(cls.getModifiers()).append('\n');
+
+        List<Class> ifaces = interfaces(cls);
+        for (int i = 0; i < ifaces.size(); i++) {
+            Class iface = (Class) ifaces.get(i);
+            record(sb, "I").append(iface.getName()).append('\n');
+        }
+
+        Constructor[] constructors = cls.getConstructors();
+        for (int i = 0; i < constructors.length; i++) {
+            constructor(sb, constructors[i]);
+        }
+        return sb;
+    }
+
+    static StringBuilder record(StringBuilder sb, String kind) {
+        return sb.append(kind).append('\t');
+    }
+
+    static String arguments(Class[] types) {
+        StringBuilder sb = new StringBuilder("(");
+        for (int i = 0; i < types.length; i++) {
+            sb.append(signature(types[i]));
+        }
+        return sb.append(')').toString();
+    }
+
+    static void constructor(StringBuilder sb, Constructor c) {
+        record(sb, "C")
+            .append(c.getModifiers()).append('\t')
+            .append(c.isVarArgs() ? 1 : 0).append('\t')
+            .append(arguments(c.getParameterTypes())).append("V\n");
+    }
+
+    static void method(StringBuilder sb, Method m) {
+        record(sb, "M")
+            .append(m.getModifiers()).append('\t')
+            .append(m.isVarArgs() ? 1 : 0).append('\t')
+            .append(m.getName()).append('\t')
+            .append(arguments(m.getParameterTypes()))
+            .append(signature(m.getReturnType())).append('\n');
+    }
+
+    static void field(StringBuilder sb, Field f) {
+        record(sb, "F")
+            .append(f.getModifiers()).append('\t')
+            .append(f.getName()).append('\t')
+            .append(signature(f.getType())).append('\n');
+    }
+}
@@ -1,6 +1,6 @@
 __all__ = ('set_options', 'add_options', 'get_options',
            'set_classpath', 'add_classpath', 'get_classpath',
-           'expand_classpath')
+           'expand_classpath', 'set_cache_dir', 'get_cache_dir')
 
 import platform
 if platform.system() == 'Windows':
@@ -11,6 +11,7 @@ else:
 vm_running = False
 options = []
 classpath = None
+cache_dir = None
 
 
 def set_options(*opts):
@@ -83,3 +84,31 @@ def expand_classpath():
         else:
             paths.extend(glob(path + '.[Jj][Aa][Rr]'))
     return split_char.join(paths)
+
+
+def set_cache_dir(path):
+    """
+    Sets the directory where autoclass() stores the class specs. Overrides the
+    JNIUS_CACHE_DIR environment variable. Use an empty string to disable the
+    cache.
+    """
+    global cache_dir
+    cache_dir = path
+
+
+def get_cache_dir():
+    "Retrieves the directory where autoclass() stores the class specs."
+    from os import environ
+    from os.path import expanduser, join
+
+    if cache_dir is not None:
+        return cache_dir
+
+    if 'JNIUS_CACHE_DIR' in environ:
+        return environ['JNIUS_CACHE_DIR']
+
+    if platform.system() == 'Windows' and 'LOCALAPPDATA' in environ:
+        return join(environ['LOCALAPPDATA'], 'pyjnius', 'cache')
+
+    base = environ.get('XDG_CACHE_HOME') or join(expanduser('~'), '.cache')
+    return join(base, 'pyjnius')
@@ -24,7 +24,13 @@ def getenv(key):
 
 files = [
     'jni.pxi',
+    'jnius_arrays.pxi',
+    'jnius_batch.pxi',
+    'jnius_buffers.pxi',
+    'jnius_capi.pxi',
+    'jnius_collections.pxi',
     'jnius_conversion.pxi',
+    'jnius_export_capi.pxi',
     'jnius_export_class.pxi',
     'jnius_export_func.pxi',
     'jnius_jvm_android.pxi',
@@ -32,7 +38,9 @@ files = [
     'jnius_jvm_dlopen.pxi',
     'jnius_localref.pxi',
     'jnius.pyx',
+    'jnius_strings.pxi',
     'jnius_utils.pxi',
+    'jnius_vectorcall.pxi',
 ]
 
 libraries = []
@@ -173,6 +181,7 @@ setup(
     version=version,
     cmdclass={'build_ext': build_ext},
     packages=['jnius'],
+    package_data={'jnius': ['jni.pxi', 'jnius_capi.pxi']},
     py_modules=['jnius_config'],
     url='https://pyjnius.readthedocs.io',
     author='Kivy Team and other contributors',
@@ -6,6 +6,7 @@ public class BasicsTest {
 	static public boolean methodStaticZ() { return true; };
 	static public byte methodStaticB() { return 127; };
 	static public char methodStaticC() { return 'k'; };
+	static public char methodStaticNonAsciiC() { return '\u00e9'; };
 	static public short methodStaticS() { return 32767; };
 	static public int methodStaticI() { return 2147483467; };
 	static public long methodStaticJ() { return 9223372036854775807L; };
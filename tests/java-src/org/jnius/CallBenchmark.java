@@ -0,0 +1,25 @@
+package org.jnius;
+
+/**
+ * Methods with 0, 1, 4 and 16 arguments, to measure the overhead of a call
+ * from Python (see benchmarks/call_overhead.py).
+ */
+public class CallBenchmark {
+
+    public int args0() {
+        return 0;
+    }
+
+    public int args1(int a) {
+        return a;
+    }
+
+    public int args4(int a, int b, int c, int d) {
+        return a + b + c + d;
+    }
+
+    public int args16(int a, int b, int c, int d, int e, int f, int g, int h,
+                      int i, int j, int k, int l, int m, int n, int o, int p) {
+        return a + b + c + d + e + f + g + h + i + j + k + l + m + n + o + p;
+    }
+}
@@ -0,0 +1,74 @@
+package org.jnius;
+import java.util.ArrayList;
+import java.util.HashMap;
+import java.util.Iterator;
+import java.util.LinkedHashSet;
+import java.util.List;
+import java.util.Map;
+import java.util.Set;
+
+public class CollectionsTest {
+
+    public static Map<String, Double> doubles(int size) {
+        Map<String, Double> ret = new HashMap<String, Double>();
+        for (int i = 0; i < size; i++) {
+            ret.put("key" + i, i / 2.0);
+        }
+        return ret;
+    }
+
+    public static List<Integer> ints(int size) {
+        List<Integer> ret = new ArrayList<Integer>();
+        for (int i = 0; i < size; i++) {
+            ret.add(i);
+        }
+        return ret;
+    }
+
+    public static Iterator<Integer> counter() {
+        // an unbounded iterator
+        return new Iterator<Integer>() {
+            private int next = 0;
+
+            public boolean hasNext() {
+                return true;
+            }
+
+            public Integer next() {
+                return next++;
+            }
+
+            public void remove() {
+                throw new UnsupportedOperationException();
+            }
+        };
+    }
+
+    public static long sum(List<Long> values) {
+        long ret = 0;
+        for (Long value : values) {
+            ret += value;
+        }
+        return ret;
+    }
+
+    public static long sumValues(Map<String, Long> values) {
+        return sum(new ArrayList<Long>(values.values()));
+    }
+
+    public static Set<Long> longs() {
+        Set<Long> ret = new LinkedHashSet<Long>();
+        ret.add(1L << 40);
+        ret.add(-1L);
+        return ret;
+    }
+
+    public static List<Object> mixed() {
+        List<Object> ret = new ArrayList<Object>();
+        ret.add("text");
+        ret.add(1);
+        ret.add(null);
+        ret.add(2.5);
+        return ret;
+    }
+}
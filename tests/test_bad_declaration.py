@@ -2,7 +2,7 @@ from __future__ import print_function
 from __future__ import division
 from __future__ import absolute_import
 import unittest
-from jnius import JavaException, JavaClass
+from jnius import JavaException, JavaClass, exception_class
 from jnius.reflect import autoclass
 
 class BadDeclarationTest(unittest.TestCase):
@@ -52,3 +52,27 @@ class BadDeclarationTest(unittest.TestCase):
             self.assertEquals("helloworld2", je.innermessage)
             self.assertIn("Caused by:", je.stacktrace)
             self.assertEquals(11, len(je.stacktrace))
+
+    def test_java_exception_class(self):
+        Integer = autoclass('java.lang.Integer')
+        NumberFormatException = exception_class(
+            'java.lang.NumberFormatException')
+        IllegalArgumentException = exception_class(
+            'java.lang.IllegalArgumentException')
+        self.assertTrue(issubclass(NumberFormatException,
+                                   IllegalArgumentException))
+        self.assertTrue(issubclass(IllegalArgumentException, JavaException))
+        self.assertIs(exception_class('java/lang/NumberFormatException'),
+                      NumberFormatException)
+        self.assertRaises(JavaException, exception_class, 'java.lang.String')
+        self.assertRaises(JavaException, exception_class, 'org.unknown.Nope')
+
+        try:
+            Integer.parseInt('abc')
+            self.fail("Expected exception to be thrown")
+        except IllegalArgumentException as je:
+            self.assertIs(type(je), NumberFormatException)
+            self.assertEqual("java.lang.NumberFormatException", je.classname)
+            self.assertEqual(
+                'java.lang.NumberFormatException: For input string: "abc"',
+                je.stacktrace[0])
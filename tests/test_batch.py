@@ -0,0 +1,62 @@
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+import unittest
+from jnius import JavaException
+from jnius.reflect import autoclass
+
+
+class BatchTest(unittest.TestCase):
+
+    def test_static(self):
+        Math = autoclass('java.lang.Math')
+        String = autoclass('java.lang.String')
+        self.assertEqual(Math.abs.map([-1, 2, -3]), [1, 2, 3])
+        self.assertEqual(Math.max.starmap([(1, 2), (4, 3)]), [2, 4])
+        self.assertEqual(String.valueOf.map([]), [])
+
+    def test_instance(self):
+        ArrayList = autoclass('java.util.ArrayList')
+        l = ArrayList()
+        # more than a chunk of calls
+        values = [str(i) for i in range(1000)]
+        self.assertEqual(l.add.map(values), [True] * 1000)
+        self.assertEqual(l.size(), 1000)
+        self.assertEqual(l.get.map(range(0, 1000, 100)), values[::100])
+
+        # the chunks are smaller with more object arguments and results
+        Objects = autoclass('java.util.Objects')
+        self.assertEqual(
+            Objects.toString.starmap([(None, v) for v in values]), values)
+
+        sb = autoclass('java.lang.StringBuilder')()
+        sb.append.starmap([('abc', ), ('def', )])
+        self.assertEqual(sb.toString(), 'abcdef')
+
+    def test_primitive_arguments(self):
+        BasicsTest = autoclass('org.jnius.BasicsTest')
+        args = (True, 127, 'k', 32767, 2147483467, 9223372036854775807,
+                1.23456789, 1.23456789)
+        self.assertEqual(
+            BasicsTest().methodParamsZBCSIJFD.starmap([args] * 3),
+            [True] * 3)
+
+    def test_exception(self):
+        ArrayList = autoclass('java.util.ArrayList')
+        l = ArrayList()
+        l.add('a')
+        with self.assertRaises(JavaException) as cm:
+            l.get.map([0, 0, 5, 0])
+        self.assertEqual(cm.exception.classname,
+                         'java.lang.IndexOutOfBoundsException')
+        self.assertEqual(l.get(0), 'a')
+        self.assertRaises(JavaException, l.get.starmap, [(0, 0)])
+
+    def test_invalid_argument(self):
+        # the arguments converted before the invalid one are released
+        crc = autoclass('java.util.zip.CRC32')()
+        values = [1, 2, 3]
+        self.assertRaises(OverflowError, crc.update.starmap,
+                          [(values, 0, 3), (values, 0, 2 ** 40)])
+        self.assertEqual(values, [1, 2, 3])
+        crc.update.starmap([(values, 0, 3)])
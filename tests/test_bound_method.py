@@ -0,0 +1,51 @@
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+import threading
+import unittest
+from jnius.reflect import autoclass
+
+
+class BoundMethodTest(unittest.TestCase):
+
+    def test_bound_to_instance(self):
+        String = autoclass('java.lang.String')
+        a, b = String('hello'), String('hello world')
+        length, contains = a.length, a.contains
+        self.assertEqual(b.length(), 11)
+        self.assertTrue(b.contains('world'))
+        # the bound methods still call on a
+        self.assertEqual(length(), 5)
+        self.assertFalse(contains('world'))
+
+    def test_threads(self):
+        ArrayList = autoclass('java.util.ArrayList')
+        lists = [ArrayList() for i in range(4)]
+        for i, l in enumerate(lists):
+            for j in range(i):
+                l.add(str(j))
+        errors = []
+
+        def run(l, size):
+            for i in range(2000):
+                if l.size() != size or l.indexOf(str(size - 1)) != size - 1:
+                    errors.append(size)
+                    return
+
+        threads = [threading.Thread(target=run, args=(l, i))
+                   for i, l in enumerate(lists) if i]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, [])
+
+    def test_keyword_arguments(self):
+        ArrayList = autoclass('java.util.ArrayList')
+        Math = autoclass('java.lang.Math')
+        l = ArrayList()
+        l.add('hello')
+        self.assertEqual(l.get(0), 'hello')
+        self.assertEqual(Math.max(3, 4), 4)
+        self.assertRaises(TypeError, lambda: l.get(index=0))
+        self.assertRaises(TypeError, lambda: Math.max(a=3, b=4))
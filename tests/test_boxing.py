@@ -0,0 +1,48 @@
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+import unittest
+from jnius import autoclass, java_method, PythonJavaClass
+
+
+class ValueCallable(PythonJavaClass):
+    __javainterfaces__ = ['java/util/concurrent/Callable']
+
+    def __init__(self, value):
+        super(ValueCallable, self).__init__()
+        self.value = value
+
+    @java_method('()Ljava/lang/Object;')
+    def call(self):
+        return self.value
+
+
+class BoxingTest(unittest.TestCase):
+
+    def call(self, value):
+        # box value as the result of a Callable, and unbox it back
+        FutureTask = autoclass('java.util.concurrent.FutureTask')
+        task = FutureTask(ValueCallable(value))
+        task.run()
+        return task.get()
+
+    def test_roundtrip(self):
+        for value in (0, -1, 100, 2 ** 31 - 1, -2 ** 31):
+            self.assertEqual(self.call(value), value)
+        # the values too large for an Integer are given as a Long
+        self.assertEqual(self.call(2 ** 40), 2 ** 40)
+        self.assertEqual(self.call(-2 ** 40), -2 ** 40)
+
+    def test_unboxing(self):
+        Integer = autoclass('java.lang.Integer')
+        Long = autoclass('java.lang.Long')
+        Double = autoclass('java.lang.Double')
+        Boolean = autoclass('java.lang.Boolean')
+        self.assertEqual(Integer.valueOf(42), 42)
+        self.assertEqual(Long.valueOf('12345678901'), 12345678901)
+        self.assertEqual(Double.valueOf(1.5), 1.5)
+        self.assertEqual(Boolean.valueOf('true'), True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+import os
+import shutil
+import tempfile
+import unittest
+import warnings
+from jnius.cache import SpecCache, classpath_fingerprint
+from jnius.reflect import dump_spec, load_spec
+
+
+class SpecCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_roundtrip(self):
+        store = SpecCache(os.path.join(self.directory, 'specs'))
+        self.assertIsNone(store.get('java.util.Stack'))
+        store.put('java.util.Stack', dump_spec('java.util.Stack'))
+        Stack = load_spec(store.get('java.util.Stack'))
+        stack = Stack()
+        stack.push('hello')
+        self.assertEqual(stack.pop(), 'hello')
+        # one file per class, no temporary file left behind
+        self.assertEqual(os.listdir(store.directory),
+                         [os.path.basename(store.path('java.util.Stack'))])
+
+    def test_slashed_name(self):
+        store = SpecCache(self.directory)
+        store.put('java/util/Stack', dump_spec('java.util.Stack'))
+        self.assertIsNotNone(store.get('java.util.Stack'))
+        self.assertIsNotNone(store.get('java/util/Stack'))
+        self.assertEqual(os.listdir(store.directory),
+                         [os.path.basename(store.path('java.util.Stack'))])
+
+    def test_invalid_file(self):
+        store = SpecCache(self.directory)
+        with open(store.path('java.util.Stack'), 'wb') as fd:
+            fd.write(b'garbage')
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            self.assertIsNone(store.get('java.util.Stack'))
+        self.assertEqual(len(w), 1)
+
+    def test_fingerprint(self):
+        jar = os.path.join(self.directory, 'a.jar')
+        with open(jar, 'wb') as fd:
+            fd.write(b'a')
+        before = classpath_fingerprint([jar], '')
+        self.assertEqual(before, classpath_fingerprint([jar], ''))
+        with open(jar, 'wb') as fd:
+            fd.write(b'ab')
+        self.assertNotEqual(before, classpath_fingerprint([jar], ''))
+
+    def test_directory_classes(self):
+        classes = os.path.join(self.directory, 'classes')
+        package = os.path.join(classes, 'org', 'example')
+        os.makedirs(package)
+        with open(os.path.join(package, 'A$B.class'), 'wb') as fd:
+            fd.write(b'a')
+        # the classes of the directories are not cached
+        store = SpecCache(os.path.join(self.directory, 'specs'), [classes])
+        spec = dump_spec('java.util.Stack')
+        store.put('org.example.A$B', spec)
+        self.assertIsNone(store.get('org.example.A$B'))
+        store.put('java.util.Stack', spec)
+        self.assertIsNotNone(store.get('java.util.Stack'))
+        # the fingerprint doesn't depend on their content
+        before = classpath_fingerprint([classes], '')
+        with open(os.path.join(package, 'A$B.class'), 'wb') as fd:
+            fd.write(b'ab')
+        self.assertEqual(before, classpath_fingerprint([classes], ''))
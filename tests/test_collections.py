@@ -0,0 +1,104 @@
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+import unittest
+from jnius.reflect import autoclass
+
+
+class CollectionsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.helper = autoclass('org.jnius.CollectionsTest')
+
+    def test_list(self):
+        ints = self.helper.ints(1000)
+        self.assertEqual(len(ints), 1000)
+        self.assertEqual(ints[10], 10)
+        self.assertEqual(ints.tolist(), list(range(1000)))
+        self.assertEqual(list(ints), list(range(1000)))
+        self.assertEqual(self.helper.mixed().tolist(),
+                         ['text', 1, None, 2.5])
+        self.assertEqual(self.helper.ints(0).tolist(), [])
+
+    def test_set(self):
+        longs = self.helper.longs()
+        self.assertEqual(len(longs), 2)
+        self.assertEqual(list(longs), [2 ** 40, -1])
+        HashSet = autoclass('java.util.HashSet')
+        words = HashSet()
+        words.add('hello')
+        words.add('world')
+        self.assertEqual(sorted(words), ['hello', 'world'])
+
+    def test_iterator(self):
+        it = self.helper.ints(5).iterator()
+        it.next()
+        self.assertEqual(it.tolist(), [1, 2, 3, 4])
+        self.assertEqual(list(self.helper.ints(3).iterator()), [0, 1, 2])
+        self.assertEqual(list(self.helper.ints(3000).iterator()),
+                         list(range(3000)))
+
+    def test_lazy_iteration(self):
+        # iterating does not read the whole iterator, which can be unbounded
+        counter = self.helper.counter()
+        for value in counter:
+            if value == 2:
+                break
+        self.assertLessEqual(counter.next(), 6)
+        for value in self.helper.counter():
+            if value == 5000:
+                break
+        for key in self.helper.doubles(10):
+            break
+
+    def test_map(self):
+        doubles = self.helper.doubles(50000)
+        self.assertEqual(len(doubles), 50000)
+        d = doubles.todict()
+        self.assertEqual(len(d), 50000)
+        self.assertEqual(d['key3'], 1.5)
+        self.assertEqual(sorted(doubles)[:2], ['key0', 'key1'])
+
+        HashMap = autoclass('java.util.HashMap')
+        m = HashMap()
+        m.put('one', 'un')
+        m.put('two', HashMap())
+        d = m.todict()
+        self.assertEqual(d['one'], 'un')
+        self.assertEqual(d['two'].todict(), {})
+
+
+    def test_arguments(self):
+        # the Python collections are given as HashMap, HashSet or ArrayList
+        HashMap = autoclass('java.util.HashMap')
+        HashSet = autoclass('java.util.HashSet')
+        ArrayList = autoclass('java.util.ArrayList')
+        self.assertEqual(ArrayList([1, 2, 2 ** 40]).tolist(), [1, 2, 2 ** 40])
+        self.assertEqual(ArrayList(('a', None)).tolist(), ['a', None])
+        self.assertEqual(ArrayList([]).size(), 0)
+        # the ints of mixed magnitudes are all boxed as Longs
+        self.assertEqual(self.helper.sum([1, 2 ** 40]), 2 ** 40 + 1)
+        self.assertEqual(self.helper.sumValues({'a': 2 ** 40, 'b': -1}),
+                         2 ** 40 - 1)
+        self.assertEqual(HashSet(set([0.5, 1.5])).size(), 2)
+        self.assertTrue(HashSet(set(['a', 'b'])).contains('a'))
+        self.assertEqual(sorted(HashSet(frozenset([True, False]))),
+                         [False, True])
+
+        values = dict(('key{0}'.format(i), i / 2.0) for i in range(10000))
+        self.assertEqual(HashMap(values).todict(), values)
+
+        mixed = HashMap({'a': 1, 'b': 'text', 'c': 2.5, 'd': True,
+                         'e': None, 'f': {'g': [1, 2]}})
+        self.assertIn('d=true', mixed.toString())
+        mixed = mixed.todict()
+        self.assertEqual(mixed['a'], 1)
+        self.assertEqual(mixed['b'], 'text')
+        self.assertEqual(mixed['c'], 2.5)
+        self.assertEqual(mixed['d'], True)
+        self.assertIsNone(mixed['e'])
+        self.assertEqual(list(mixed['f'].todict()['g']), [1, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+import unittest
+from jnius import JavaException, batch
+from jnius.reflect import autoclass
+
+
+class CommandBatchTest(unittest.TestCase):
+
+    def test_pipeline(self):
+        StringBuilder = autoclass('java.lang.StringBuilder')
+        with batch() as b:
+            sb = b(StringBuilder)('hello')
+            sb.append(' world')
+            sb.append(42)
+            length = sb.length()
+            text = sb.toString()
+            self.assertRaises(JavaException, getattr, text, 'value')
+        self.assertEqual(len(b), 5)
+        self.assertEqual(length.value, 13)
+        self.assertEqual(text.value, 'hello world42')
+        self.assertEqual(sb.value.toString(), 'hello world42')
+        # the batch is done once
+        self.assertRaises(JavaException, b(StringBuilder))
+
+    def test_results_as_arguments(self):
+        ArrayList = autoclass('java.util.ArrayList')
+        Math = autoclass('java.lang.Math')
+        StringBuilder = autoclass('java.lang.StringBuilder')
+        l = ArrayList()
+        with batch() as b:
+            sb = b(StringBuilder)('abc')
+            text = sb.toString()
+            b(l).add(text)
+            b(l).add(sb)
+            size = b(l).size()
+            # an int result selects the int signatures
+            absolute = b(Math).abs(size)
+            sb.append(size)
+            copy = b(StringBuilder)(text)
+        self.assertEqual(size.value, 2)
+        self.assertEqual(absolute.value, 2)
+        self.assertEqual(l.get(0), 'abc')
+        self.assertEqual(l.get(1).toString(), 'abc2')
+        self.assertEqual(copy.value.toString(), 'abc')
+
+    def test_exception(self):
+        ArrayList = autoclass('java.util.ArrayList')
+        l = ArrayList()
+        with self.assertRaises(JavaException) as cm:
+            with batch() as b:
+                b(l).add('a')
+                b(l).get(5)
+                b(l).add('b')
+        self.assertEqual(cm.exception.step, 1)
+        self.assertIn('Batch step 1', str(cm.exception))
+        self.assertEqual(cm.exception.classname,
+                         'java.lang.IndexOutOfBoundsException')
+        # the steps after the failing one are not done
+        self.assertEqual(l.size(), 1)
+
+        # a null result can't be called
+        with self.assertRaises(JavaException) as cm:
+            with batch() as b:
+                b(l).add(None)
+                b(l).get(1).hashCode()
+        self.assertEqual(cm.exception.step, 2)
+
+    def test_invalid_argument(self):
+        # a step with an invalid argument releases the ones converted before
+        # it, and no step is done
+        ArrayList = autoclass('java.util.ArrayList')
+        l = ArrayList()
+        crc = autoclass('java.util.zip.CRC32')()
+        values = [1, 2, 3]
+        with self.assertRaises(OverflowError):
+            with batch() as b:
+                b(l).add('a')
+                b(crc).update(values, 0, 2 ** 40)
+        self.assertEqual(values, [1, 2, 3])
+        self.assertEqual(l.size(), 0)
+
+    def test_not_run(self):
+        ArrayList = autoclass('java.util.ArrayList')
+        l = ArrayList()
+        try:
+            with batch() as b:
+                b(l).add('a')
+                raise ValueError()
+        except ValueError:
+            pass
+        self.assertEqual(l.size(), 0)
+
+    def test_invalid(self):
+        ArrayList = autoclass('java.util.ArrayList')
+        with batch() as b:
+            self.assertRaises(JavaException, b, 'abc')
+            self.assertRaises(JavaException, b(ArrayList).size)
+            size = b(ArrayList)().size()
+            # an int result can't be given as an object
+            self.assertRaises(JavaException, b(ArrayList)().add, size)
+            with batch() as other:
+                self.assertRaises(JavaException, other(ArrayList), size)
@@ -0,0 +1,86 @@
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+import sys
+import unittest
+import weakref
+from array import array
+from jnius import as_direct_buffer, release_direct_buffer
+from jnius.reflect import autoclass
+
+
+class DirectBufferTest(unittest.TestCase):
+
+    def test_as_direct_buffer(self):
+        data = bytearray(b'hello')
+        bb = as_direct_buffer(data)
+        self.assertTrue(bb.isDirect())
+        self.assertEqual(bb.capacity(), 5)
+        self.assertEqual(bb.get(1), ord('e'))
+        bb.put(0, ord('j'))
+        self.assertEqual(data, b'jello')
+        # only the writable buffers are shared
+        self.assertRaises((BufferError, TypeError), as_direct_buffer, b'abc')
+
+    def test_returned_direct_buffer(self):
+        ByteBuffer = autoclass('java.nio.ByteBuffer')
+        Charset = autoclass('java.nio.charset.Charset')
+        bb = ByteBuffer.allocateDirect(3)
+        self.assertTrue(bb.isDirect())
+        view = bb.memoryview()
+        self.assertIsInstance(view, memoryview)
+        self.assertEqual(len(view), 3)
+        view[0:3] = b'abc'
+        self.assertEqual(bb.get(1), ord('b'))
+        # the memoryview is given back as the ByteBuffer
+        charset = Charset.forName('US-ASCII')
+        self.assertEqual(charset.decode(view).toString(), 'abc')
+
+        readonly = as_direct_buffer(bytearray(2)).asReadOnlyBuffer()
+        self.assertTrue(readonly.memoryview().readonly)
+
+        # the heap buffers have no memory to share
+        self.assertRaises(ValueError, ByteBuffer.allocate(2).memoryview)
+
+    def test_chaining(self):
+        data = bytearray(8)
+        bb = as_direct_buffer(data).putInt(7).putInt(8)
+        self.assertEqual(bb.position(), 8)
+        self.assertEqual(bytes(data), b'\0\0\0\x07\0\0\0\x08')
+        self.assertEqual(bb.flip().memoryview().tobytes(), bytes(data))
+
+    @unittest.skipIf(sys.version_info < (3, ), 'array.array buffers')
+    def test_lifetime(self):
+        System = autoclass('java.lang.System')
+        data = array('b', b'abcd')
+        ref = weakref.ref(data)
+        bb = as_direct_buffer(data)
+        del data
+        self.assertIsNotNone(ref())
+        self.assertEqual(bb.get(3), ord('d'))
+        # the buffer is released once Java collected the ByteBuffer
+        del bb
+        for i in range(50):
+            System.gc()
+            release_direct_buffer()
+            if ref() is None:
+                break
+        self.assertIsNone(ref())
+
+    def test_release(self):
+        data = bytearray(b'abc')
+        bb = as_direct_buffer(data)
+        self.assertRaises(BufferError, data.append, 100)
+        release_direct_buffer(bb.duplicate())
+        data.append(100)
+        self.assertEqual(data, b'abcd')
+        self.assertRaises(ValueError, release_direct_buffer, bb)
+        ByteBuffer = autoclass('java.nio.ByteBuffer')
+        self.assertRaises(ValueError, release_direct_buffer,
+                          ByteBuffer.allocate(2))
+        self.assertRaises(ValueError, release_direct_buffer,
+                          ByteBuffer.allocateDirect(2))
+
+
+if __name__ == '__main__':
+    unittest.main()
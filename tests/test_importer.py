@@ -0,0 +1,48 @@
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+import sys
+import unittest
+from jnius import importer
+from jnius.reflect import autoclass
+
+
+class ImporterTest(unittest.TestCase):
+
+    def test_import_class(self):
+        from jnius.java.util import Stack
+        self.assertIs(Stack, autoclass('java.util.Stack'))
+        import jnius.java.lang
+        self.assertEqual(jnius.java.lang.String('hello').length(), 5)
+
+    def test_missing_class(self):
+        with self.assertRaises(ImportError):
+            from jnius.java.util import NotAClass
+        with self.assertRaises(ImportError):
+            import jnius.not_a_package
+        # the packages outside of the runtime ones don't index the classpath
+        finder = importer.JavaPackageFinder(
+            'jnius', packages=importer.RUNTIME_PACKAGES)
+        self.assertIsNone(finder.java_package('jnius.not_a_package'))
+        self.assertIsNone(finder.java_package('jnius.org.jnius'))
+        self.assertIsNone(finder._index)
+
+    def test_classpath_packages(self):
+        importer.install('jnius_packages_test')
+        try:
+            # org.jnius is in the classpath index: fails without any JNI call
+            from jnius_packages_test.org.jnius import BasicsTest
+            self.assertTrue(BasicsTest().methodZ())
+            with self.assertRaises(ImportError):
+                from jnius_packages_test.org.jnius import NotAClass
+        finally:
+            importer.uninstall('jnius_packages_test')
+
+    def test_custom_root(self):
+        importer.install('jnius_packages_test')
+        try:
+            from jnius_packages_test.java.util import Stack
+            self.assertIs(Stack, autoclass('java.util.Stack'))
+        finally:
+            importer.uninstall('jnius_packages_test')
+        self.assertNotIn('jnius_packages_test.java.util', sys.modules)
@@ -0,0 +1,50 @@
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+import shutil
+import tempfile
+import unittest
+import jnius_config
+from jnius.cache import get_spec_cache
+from jnius.reflect import autoclass, dump_spec
+
+
+class LazyTest(unittest.TestCase):
+
+    def test_instance_members(self):
+        LinkedList = autoclass('java.util.LinkedList', cached=False, lazy=True)
+        self.assertNotIn('add', LinkedList.__dict__)
+        l = LinkedList()
+        l.add('hello')
+        l.add(0, 'world')
+        self.assertIn('add', LinkedList.__dict__)
+        self.assertNotIn('clear', LinkedList.__dict__)
+        self.assertEqual(l.size(), 2)
+        self.assertEqual(len(l), 2)
+        self.assertEqual(l[0], 'world')
+        self.assertFalse(l.empty)
+        self.assertRaises(AttributeError, getattr, l, 'notAMethod')
+        self.assertFalse(hasattr(l, 'notAMethod'))
+
+    def test_static_members(self):
+        Math = autoclass('java.lang.Math', cached=False, lazy=True)
+        self.assertAlmostEqual(Math.PI, 3.14159, places=5)
+        self.assertEqual(Math.max(3, 4), 4)
+        self.assertEqual(Math.abs(-2.5), 2.5)
+        self.assertRaises(AttributeError, getattr, Math, 'notAField')
+
+    def test_cached_spec(self):
+        directory = tempfile.mkdtemp()
+        try:
+            jnius_config.set_cache_dir(directory)
+            get_spec_cache().put('java.util.TreeMap',
+                                 dump_spec('java.util.TreeMap'))
+            TreeMap = autoclass('java.util.TreeMap', lazy=True)
+            self.assertNotIn('put', TreeMap.__dict__)
+            m = TreeMap()
+            m.put('a', 'b')
+            self.assertEqual(m.get('a'), 'b')
+            self.assertIn('put', TreeMap.__dict__)
+        finally:
+            jnius_config.set_cache_dir(None)
+            shutil.rmtree(directory)
@@ -47,3 +47,26 @@ class MultipleSignature(unittest.TestCase):
     def test_multiple_methods_two_args_and_varargs(self):
         MultipleMethods = autoclass('org.jnius.MultipleMethods')
         self.assertEqual(MultipleMethods.resolve('one', 'two', 1, 2, 3), 'resolved two args and varargs')
+
+    def test_multiple_methods_cached_resolution(self):
+        # the signature chosen is cached by argument types, calls with other
+        # types must still resolve their own signature
+        MultipleMethods = autoclass('org.jnius.MultipleMethods')
+        for i in range(3):
+            self.assertEqual(MultipleMethods.resolve('one', 'two', 1),
+                             'resolved two string and an integer')
+            self.assertEqual(MultipleMethods.resolve(1, 2, 3),
+                             'resolved varargs')
+            self.assertEqual(MultipleMethods.resolve('one', 'two', 1, 2, 3),
+                             'resolved two args and varargs')
+        StringBuilder = autoclass('java.lang.StringBuilder')
+        sb = StringBuilder()
+        for value in ('ab', 'c', 'de', 1, True, 'f'):
+            sb.append(value)
+        self.assertEqual(sb.toString(), 'abcde1truef')
+
+    def test_multiple_constructors_cached_resolution(self):
+        String = autoclass('java.lang.String')
+        for i in range(3):
+            self.assertEqual(String('Hello').length(), 5)
+            self.assertEqual(String(list('Hello World'), 3, 5).length(), 5)
@@ -0,0 +1,67 @@
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+import unittest
+from jnius import JavaObjectArray, set_lazy_object_arrays
+from jnius.reflect import autoclass
+
+
+class ObjectArrayTest(unittest.TestCase):
+
+    def setUp(self):
+        set_lazy_object_arrays()
+
+    def tearDown(self):
+        set_lazy_object_arrays(False)
+
+    def test_view(self):
+        String = autoclass('java.lang.String')
+        words = String('a b c d e').split(' ')
+        self.assertIsInstance(words, JavaObjectArray)
+        self.assertEqual(len(words), 5)
+        self.assertEqual(words[0], 'a')
+        self.assertEqual(words[-1], 'e')
+        self.assertRaises(IndexError, words.__getitem__, 5)
+        self.assertEqual(list(words), ['a', 'b', 'c', 'd', 'e'])
+        self.assertEqual(words, ['a', 'b', 'c', 'd', 'e'])
+
+        # the slices are views of the same array
+        odd = words[::2]
+        self.assertIsInstance(odd, JavaObjectArray)
+        self.assertEqual(odd, ['a', 'c', 'e'])
+        self.assertEqual(odd[1:], ['c', 'e'])
+        self.assertEqual(words[3:1:-1], ['d', 'c'])
+        self.assertEqual(len(words[5:]), 0)
+
+    def test_objects(self):
+        Class = autoclass('java.lang.Class')
+        methods = Class.forName('java.lang.String').getMethods()
+        self.assertIsInstance(methods, JavaObjectArray)
+        self.assertIn('length', [method.getName() for method in methods])
+
+    def test_arguments(self):
+        Arrays = autoclass('java.util.Arrays')
+        String = autoclass('java.lang.String')
+        words = String('b a c').split(' ')
+        # a whole view is given as the Java array itself
+        Arrays.sort(words)
+        self.assertEqual(words, ['a', 'b', 'c'])
+        self.assertEqual(Arrays.toString(words), '[a, b, c]')
+        # the other views as lists
+        self.assertEqual(Arrays.toString(words[::-1]), '[c, b, a]')
+        # and the arrays given for an Object are released
+        Array = autoclass('java.lang.reflect.Array')
+        for i in range(1000):
+            self.assertEqual(Array.getLength(words), 3)
+            self.assertEqual(Array.getLength(('a', 'b')), 2)
+            self.assertEqual(Array.getLength([1]), 1)
+
+    def test_disabled(self):
+        set_lazy_object_arrays(False)
+        String = autoclass('java.lang.String')
+        self.assertEqual(String('a b').split(' '), ['a', 'b'])
+        self.assertIsInstance(String('a b').split(' '), list)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+import os
+import runpy
+import shutil
+import sys
+import tempfile
+import unittest
+from jnius.classpath import ClasspathIndex
+from jnius.pregen import generate, render_module, render_cython_module
+from jnius.reflect import dump_spec
+
+
+class PregenTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_generate(self):
+        written = generate(['java.util.LinkedHashMap'], self.directory)
+        filename = os.path.join(self.directory, 'java', 'util', '__init__.py')
+        self.assertEqual(written, [filename])
+        self.assertTrue(os.path.exists(
+            os.path.join(self.directory, 'java', '__init__.py')))
+
+        namespace = runpy.run_path(filename)
+        LinkedHashMap = namespace['LinkedHashMap']
+        m = LinkedHashMap()
+        m.put('hello', 'world')
+        self.assertEqual(m.get('hello'), 'world')
+        self.assertEqual(m.size(), 1)
+        self.assertFalse(m.empty)
+        # with the Python protocols given by autoclass()
+        self.assertEqual(len(m), 1)
+        self.assertEqual(list(m), ['hello'])
+        self.assertEqual(m.todict(), {'hello': 'world'})
+        values = m.values()
+        self.assertEqual(list(values), ['world'])
+        self.assertEqual(values.tolist(), ['world'])
+
+    def test_keyword_members(self):
+        # PrintStream.print is a keyword in Python 2
+        source = render_module([dump_spec('java.io.PrintStream', packed=False)])
+        self.assertIn("locals()['print'] = JavaMultipleMethod([", source)
+        namespace = {}
+        exec(compile(source.encode('utf-8'), '<pregen>', 'exec'), namespace)
+        self.assertIn('print', namespace['PrintStream'].__dict__)
+
+    def test_wildcards(self):
+        root = os.path.join(self.directory, 'classes')
+        for name in ('a/b/C.class', 'a/b/C$Inner.class', 'a/b/c/D.class',
+                     'a/b/package-info.class', 'a/b/E.txt'):
+            path = os.path.join(root, *name.split('/'))
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            open(path, 'w').close()
+
+        index = ClasspathIndex([root])
+        self.assertEqual(index.expand('a.b.*'), ['a.b.C', 'a.b.C$Inner'])
+        self.assertEqual(index.expand('a.b.**'),
+                         ['a.b.C', 'a.b.C$Inner', 'a.b.c.D'])
+        self.assertEqual(index.expand('a.b.C'), ['a.b.C'])
+        self.assertTrue(index.has_package('a'))
+        self.assertTrue(index.has_class('a.b.c.D'))
+        self.assertFalse(index.has_class('a.b.D'))
+
+    def test_cython(self):
+        source = render_cython_module(
+            [dump_spec('org.jnius.BasicsTest', packed=False)])
+        # primitive arguments and results are converted inline
+        self.assertIn('j_args[2].c = ord(a2)', source)
+        self.assertIn('j_ret = j_env[0].CallBooleanMethodA(', source)
+        # the type codes of the other arguments are computed once
+        self.assertIn("cdef tuple d_", source)
+        self.assertNotIn("capi.convert_arg(j_env, '", source)
+        self.assertIn('j_ret = j_env[0].CallStaticIntMethodA(', source)
+        self.assertIn('    def methodParamsZBCSIJFD('
+                      'self, a0, a1, a2, a3, a4, a5, a6, a7):', source)
+        # fields and constructors are the ones of the Python bindings
+        self.assertIn("    fieldStaticZ = JavaStaticField('Z')", source)
+        self.assertIn("        ('(B)V', False),", source)
+        self.assertNotIn("methodZ = JavaMethod", source)
+
+        written = generate(['org.jnius.BasicsTest'], self.directory,
+                           cython=True)
+        self.assertEqual(sorted([os.path.basename(f) for f in written]),
+                         ['jni.pxi', 'jnius_capi.pxi', 'org_jnius.pyx'])
+
+    def test_cython_build(self):
+        # the generated extension compiles, and its methods call Java
+        try:
+            from Cython.Build import cythonize
+            from setuptools import Distribution, Extension
+        except ImportError:
+            self.skipTest('Cython is not available')
+        java_home = os.environ.get('JAVA_HOME', '')
+        include_dirs = []
+        for home in (java_home, os.path.dirname(java_home)):
+            include = os.path.join(home, 'include')
+            if os.path.exists(os.path.join(include, 'jni.h')):
+                include_dirs = [include]
+                include_dirs.extend(
+                    os.path.join(include, name) for name in os.listdir(include)
+                    if os.path.isdir(os.path.join(include, name)))
+                break
+        if not include_dirs:
+            self.skipTest('the JNI headers are not found from JAVA_HOME')
+
+        generate(['org.jnius.BasicsTest'], self.directory, cython=True)
+        extension = Extension(
+            'org_jnius', [os.path.join(self.directory, 'org_jnius.pyx')],
+            include_dirs=include_dirs)
+        distribution = Distribution({'ext_modules': cythonize(
+            [extension], quiet=True,
+            build_dir=os.path.join(self.directory, 'cython'))})
+        command = distribution.get_command_obj('build_ext')
+        command.build_lib = self.directory
+        command.build_temp = os.path.join(self.directory, 'build')
+        distribution.run_command('build_ext')
+
+        sys.path.insert(0, self.directory)
+        try:
+            module = __import__('org_jnius')
+        finally:
+            sys.path.remove(self.directory)
+            sys.modules.pop('org_jnius', None)
+        test = module.BasicsTest()
+        self.assertEqual(test.methodI(), 2147483467)
+        self.assertEqual(module.BasicsTest.methodStaticI(), 2147483467)
+        self.assertTrue(test.methodParamsZBCSIJFD(
+            True, 127, 'k', 32767, 2147483467, 9223372036854775807,
+            1.23456789, 1.23456789))
+        self.assertEqual(test.methodC(), 'k')
+        self.assertEqual(module.BasicsTest.methodStaticNonAsciiC(), u'\xe9')
+        self.assertTrue(test.methodParamsString('helloworld'))
+        self.assertTrue(test.methodParamsArrayString(['hello', 'world']))
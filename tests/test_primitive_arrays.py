@@ -0,0 +1,185 @@
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+import sys
+import unittest
+import zlib
+from array import array
+from jnius import (JavaException, PrimitiveArray, BooleanArray, ByteArray,
+                   CharArray, ShortArray, IntArray, LongArray, FloatArray,
+                   DoubleArray)
+from jnius.reflect import autoclass
+
+
+class PrimitiveArrayTest(unittest.TestCase):
+
+    def test_types(self):
+        test = autoclass('org.jnius.BasicsTest')()
+        for method, cls, fmt in (
+                (test.methodArrayZ, BooleanArray, '?'),
+                (test.methodArrayB, ByteArray, 'B'),
+                (test.methodArrayC, CharArray, 'H'),
+                (test.methodArrayS, ShortArray, 'h'),
+                (test.methodArrayI, IntArray, 'i'),
+                (test.methodArrayJ, LongArray, 'q'),
+                (test.methodArrayF, FloatArray, 'f'),
+                (test.methodArrayD, DoubleArray, 'd')):
+            arr = method()
+            self.assertIsInstance(arr, cls)
+            self.assertIsInstance(arr, PrimitiveArray)
+            self.assertEqual(len(arr), 3)
+            if sys.version_info >= (3, ):
+                view = memoryview(arr)
+                self.assertEqual(view.format, fmt)
+                self.assertEqual(view.shape, (3, ))
+                view.release()
+
+    def test_sequence(self):
+        test = autoclass('org.jnius.BasicsTest')()
+        arr = test.methodArrayI()
+        self.assertEqual(arr[-1], 2147483467)
+        self.assertEqual(arr[1:], [2147483467] * 2)
+        self.assertRaises(IndexError, arr.__getitem__, 3)
+        arr[0] = 1
+        arr[1:] = [2, 3]
+        self.assertEqual(arr.tolist(), [1, 2, 3])
+        self.assertRaises(ValueError, arr.__setitem__, slice(0, 3), [1])
+        self.assertEqual(test.methodArrayC()[0], 'k')
+
+    @unittest.skipIf(sys.version_info < (3, ), 'typed memoryviews')
+    def test_buffer_writes(self):
+        test = autoclass('org.jnius.BasicsTest')()
+        arr = test.methodArrayI()
+        view = memoryview(arr)
+        view[0] = 1
+        view[1] = 2
+        view[2] = 3
+        self.assertEqual(arr, [1, 2, 3])
+        # the array can't go away while the buffer is used
+        self.assertRaises(BufferError, arr.release)
+        view.release()
+        self.assertEqual(memoryview(arr).tolist(), [1, 2, 3])
+        self.assertTrue(test.methodParamsArrayI(arr))
+
+    def test_java_array(self):
+        Arrays = autoclass('java.util.Arrays')
+        test = autoclass('org.jnius.BasicsTest')()
+        arr = test.methodArrayI()
+        arr[0] = 5
+        # the view is given as the Java array, and shows the changes of Java
+        Arrays.fill(arr, 7)
+        self.assertEqual(arr, [7, 7, 7])
+        self.assertEqual(Arrays.toString(arr), '[7, 7, 7]')
+        self.assertRaises(JavaException, test.methodParamsArrayByte, arr)
+
+        arr = test.methodArrayB()
+        test.fillByteArray(arr)
+        self.assertEqual(arr, [127, 1, 129])
+        self.assertEqual(arr.tostring(), b'\x7f\x01\x81')
+        # the bytes are read unsigned, and written signed or unsigned
+        arr[2] = arr[2]
+        arr[0] = -1
+        self.assertEqual(arr, [255, 1, 129])
+        self.assertRaises(OverflowError, arr.__setitem__, 0, 256)
+        self.assertRaises(OverflowError, arr.__setitem__, 0, -129)
+
+    def test_release(self):
+        Arrays = autoclass('java.util.Arrays')
+        test = autoclass('org.jnius.BasicsTest')()
+        arr = test.methodArrayI()
+        arr.commit()
+        arr[0] = 1
+        arr.abort()
+        self.assertEqual(len(arr), 0)
+        self.assertRaises(JavaException, Arrays.toString, arr)
+        arr = test.methodArrayD()
+        arr.release()
+        arr.release()
+        self.assertEqual(arr, [])
+
+
+    def test_java_owned(self):
+        # a view only read from Python keeps the changes done later by Java
+        IntBuffer = autoclass('java.nio.IntBuffer')
+        ib = IntBuffer.allocate(3)
+        arr = ib.array()
+        self.assertEqual(arr, [0, 0, 0])
+        ib.put(0, 5)
+        del arr
+        self.assertEqual(ib.get(0), 5)
+        # and the changes done from Python are written back
+        arr = ib.array()
+        arr[1] = 6
+        del arr
+        self.assertEqual(ib.get(0), 5)
+        self.assertEqual(ib.get(1), 6)
+
+    def test_object_argument(self):
+        # a view given for an Object sees the changes done by Java
+        System = autoclass('java.lang.System')
+        src = autoclass('java.nio.IntBuffer').allocate(2).array()
+        dst = autoclass('java.nio.IntBuffer').allocate(2).array()
+        src[0] = 7
+        dst[1] = 8
+        System.arraycopy(src, 0, dst, 0, 1)
+        self.assertEqual(dst, [7, 8])
+        dst.commit()
+        self.assertEqual(dst, [7, 8])
+
+class ArrayArgumentTest(unittest.TestCase):
+
+    @unittest.skipIf(sys.version_info < (3, ), 'array.array buffers')
+    def test_buffers(self):
+        Arrays = autoclass('java.util.Arrays')
+        test = autoclass('org.jnius.BasicsTest')()
+        self.assertTrue(test.methodParamsArrayI(array('i', [1, 2, 3])))
+        self.assertTrue(test.methodParamsArrayByte(b'\x7f\x7f\x7f'))
+        self.assertTrue(test.methodParamsArrayByte(
+            memoryview(bytearray(b'\x7f\x7f\x7f'))))
+        # the format of the buffer selects the signature
+        self.assertEqual(Arrays.toString(array('d', [1.5, 2])), '[1.5, 2.0]')
+        self.assertEqual(Arrays.toString(array('h', [1, -2])), '[1, -2]')
+        self.assertEqual(Arrays.toString(array('b', [1, -2])), '[1, -2]')
+
+    @unittest.skipIf(sys.version_info < (3, ), 'array.array buffers')
+    def test_converted_buffers(self):
+        test = autoclass('org.jnius.BasicsTest')()
+        # buffers of other item types are converted item by item
+        self.assertTrue(test.methodParamsArrayI(array('h', [1, 2, 3])))
+        self.assertTrue(test.methodParamsArrayI(array('q', [1, 2, 3])))
+        self.assertTrue(test.methodParamsArrayI(array('B', [1, 2, 3])))
+
+    def test_sequences(self):
+        test = autoclass('org.jnius.BasicsTest')()
+        self.assertTrue(test.methodParamsArrayI((1, 2, 3)))
+        values = [i % 256 for i in range(100000)]
+        crc = autoclass('java.util.zip.CRC32')()
+        crc.update(values, 0, len(values))
+        self.assertEqual(crc.getValue(),
+                         zlib.crc32(bytes(bytearray(values))) & 0xffffffff)
+        self.assertRaises(TypeError, test.methodParamsArrayI, [1, 2, 'a'])
+
+    @unittest.skipIf(sys.version_info < (3, ), 'array.array buffers')
+    def test_write_back(self):
+        Arrays = autoclass('java.util.Arrays')
+        # the changes of Java are given back to the writable buffers
+        values = array('i', [3, 1, 2])
+        Arrays.sort(values)
+        self.assertEqual(values.tolist(), [1, 2, 3])
+        values = array('d', [2.5, -1])
+        Arrays.sort(values)
+        self.assertEqual(values.tolist(), [-1, 2.5])
+        values = bytearray(b'\x03\x01\x02')
+        Arrays.sort(values)
+        self.assertEqual(values, bytearray(b'\x01\x02\x03'))
+        # and to the lists, but not to the read-only buffers
+        values = [3, 1, 2]
+        Arrays.sort(values)
+        self.assertEqual(values, [1, 2, 3])
+        values = b'\x03\x01\x02'
+        Arrays.sort(values)
+        self.assertEqual(values, b'\x03\x01\x02')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,7 +2,8 @@ from __future__ import print_function
 from __future__ import division
 from __future__ import absolute_import
 import unittest
-from jnius.reflect import autoclass
+from jnius.reflect import autoclass, get_introspect, parse_description, reflect_spec
+from jnius import find_javaclass
 
 class ReflectTest(unittest.TestCase):
 
@@ -14,3 +15,29 @@ class ReflectTest(unittest.TestCase):
         stack.push('world')
         self.assertEqual(stack.pop(), 'world')
         self.assertEqual(stack.pop(), 'hello')
+
+    def test_list_interface(self):
+        # Stack implements java.util.List through Vector
+        Stack = autoclass('java.util.Stack')
+        stack = Stack()
+        stack.push('hello')
+        stack.push('world')
+        self.assertEqual(len(stack), 2)
+        self.assertEqual(stack[1], 'world')
+
+    def test_bean_property(self):
+        ArrayList = autoclass('java.util.ArrayList')
+        self.assertTrue(ArrayList().empty)
+
+    def test_introspect_matches_reflection(self):
+        clsname = 'java.util.ArrayList'
+        c = find_javaclass(clsname)
+        self.assertIsNotNone(get_introspect())
+        fast = parse_description(clsname, get_introspect().describe(c))
+        slow = reflect_spec(c, clsname)
+        self.assertEqual(fast['modifiers'], slow['modifiers'])
+        self.assertEqual(fast['constructors'], slow['constructors'])
+        self.assertEqual(fast['methods'], slow['methods'])
+        self.assertEqual(fast['fields'], slow['fields'])
+        self.assertEqual(set(fast['interfaces']), set(slow['interfaces']))
+        self.assertIn('java.util.Collection', fast['interfaces'])
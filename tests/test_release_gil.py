@@ -0,0 +1,57 @@
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+import unittest
+from jnius import JavaClass, MetaJavaClass, JavaMethod
+from jnius.reflect import autoclass, JavaMultipleMethod
+from six import with_metaclass
+
+
+class ReleaseGilTest(unittest.TestCase):
+
+    def test_declared(self):
+        class CopyOnWriteArrayList(with_metaclass(MetaJavaClass, JavaClass)):
+            __javaclass__ = 'java/util/concurrent/CopyOnWriteArrayList'
+            __release_gil__ = ('addAll', 'contains')
+            size = JavaMethod('()I')
+            add = JavaMultipleMethod([('(Ljava/lang/Object;)Z', False, False),
+                                      ('(ILjava/lang/Object;)V', False, False)])
+            contains = JavaMethod('(Ljava/lang/Object;)Z', release_gil=False)
+            isEmpty = JavaMethod('()Z', release_gil=True)
+
+        self.assertFalse(CopyOnWriteArrayList.size.release_gil)
+        self.assertFalse(CopyOnWriteArrayList.add.release_gil)
+        # the method's own setting wins over the class
+        self.assertFalse(CopyOnWriteArrayList.contains.release_gil)
+        self.assertTrue(CopyOnWriteArrayList.isEmpty.release_gil)
+
+        a = CopyOnWriteArrayList()
+        a.add('hello')
+        a.add(0, 'world')
+        self.assertEqual(a.size(), 2)
+        self.assertTrue(a.contains('hello'))
+        self.assertFalse(a.isEmpty())
+        # the batched calls follow the same setting
+        self.assertEqual(a.contains.map(['hello', 'other']), [True, False])
+        self.assertEqual(a.isEmpty.starmap([()]), [False])
+
+    def test_autoclass(self):
+        Stack = autoclass('java.util.Stack', release_gil=['push'])
+        try:
+            self.assertTrue(Stack.push.release_gil)
+            self.assertFalse(Stack.size.release_gil)
+            stack = Stack()
+            stack.push('hello')
+            self.assertEqual(stack.size(), 1)
+        finally:
+            autoclass('java.util.Stack', release_gil=True)
+        self.assertTrue(Stack.size.release_gil)
+
+    def test_lazy(self):
+        Collections = autoclass('java.util.Collections', lazy=True,
+                                release_gil=False)
+        try:
+            self.assertFalse(Collections.emptyList.release_gil)
+            self.assertEqual(Collections.emptyList().size(), 0)
+        finally:
+            autoclass('java.util.Collections', release_gil=True)
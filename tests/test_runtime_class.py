@@ -0,0 +1,37 @@
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+import unittest
+from jnius.reflect import autoclass
+
+CLASSES = (
+    'java.util.ArrayList', 'java.util.HashMap', 'java.util.HashSet',
+    'java.util.LinkedList', 'java.util.TreeMap', 'java.util.TreeSet',
+    'java.util.Stack', 'java.util.Vector', 'java.lang.StringBuilder',
+    'java.lang.Object', 'java.util.Random', 'java.util.Date',
+    'java.util.BitSet', 'java.util.ArrayDeque', 'java.util.LinkedHashMap',
+    'java.util.LinkedHashSet', 'java.util.Hashtable',
+    'java.util.PriorityQueue', 'java.util.IdentityHashMap',
+    'java.util.WeakHashMap')
+
+
+class RuntimeClassTest(unittest.TestCase):
+
+    def test_object_returns(self):
+        # the objects returned as java.lang.Object get the class of their
+        # runtime class, more classes than the classes remembered
+        ArrayList = autoclass('java.util.ArrayList')
+        values = ArrayList()
+        for name in CLASSES:
+            values.add(autoclass(name)())
+        for indexes in (range(len(CLASSES)), [0, 0, 5, 0, 19, 5, 1],
+                        reversed(range(len(CLASSES)))):
+            for index in indexes:
+                obj = values.get(index)
+                self.assertEqual(obj.__javaclass__,
+                                 CLASSES[index].replace('.', '/'))
+                self.assertEqual(obj.getClass().getName(), CLASSES[index])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import sys
+import unittest
+from jnius import set_string_cache
+from jnius.reflect import autoclass
+
+
+def native(text):
+    # the strings are returned as UTF-8 bytes on Python 2
+    if sys.version_info < (3, ):
+        return text.encode('utf-8')
+    return text
+
+
+class StringTest(unittest.TestCase):
+
+    def test_roundtrip(self):
+        StringBuilder = autoclass('java.lang.StringBuilder')
+        for text in ('', 'hello', 'caf\xe9', '€ uro', 'a\U0001f600b',
+                     'nul\x00char', 'x' * 1000, '\xe9' * 1000,
+                     '€' * 1000, '\U0001f600' * 1000):
+            s = StringBuilder(text)
+            self.assertEqual(s.toString(), native(text))
+            # the characters outside of the BMP are surrogate pairs in Java
+            self.assertEqual(s.length(), len(text.encode('utf-16-le')) // 2)
+
+    def test_string_arrays(self):
+        Arrays = autoclass('java.util.Arrays')
+        values = ['caf\xe9', '\U0001f600']
+        self.assertEqual(Arrays.toString(values),
+                         native('[caf\xe9, \U0001f600]'))
+
+    def test_cache(self):
+        System = autoclass('java.lang.System')
+        String = autoclass('java.lang.String')
+        set_string_cache(2, max_length=8)
+        try:
+            # the same Java string is given for the same Python string
+            self.assertEqual(System.identityHashCode('key'),
+                             System.identityHashCode('key'))
+            # and the same Python string for the same Java string
+            self.assertIs(String('name').toString(),
+                          String('name').toString())
+            # the long strings are not cached
+            self.assertIsNot(String('long string').toString(),
+                             String('long string').toString())
+            # the least recently used strings are dropped
+            first = System.identityHashCode('aa')
+            System.identityHashCode('bb')
+            System.identityHashCode('cc')
+            self.assertNotEqual(System.identityHashCode('aa'), first)
+        finally:
+            set_string_cache(0)
+        self.assertNotEqual(System.identityHashCode('key'),
+                            System.identityHashCode('key'))
+        self.assertRaises(ValueError, set_string_cache, -1)
+
+
+if __name__ == '__main__':
+    unittest.main()